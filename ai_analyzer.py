@@ -1,122 +1,185 @@
 import streamlit as st
-import google.generativeai as genai
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+import hashlib
 import json
 import os
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-import numpy as np  # Adicionado para uso em _convert_to_serializable
+import numpy as np
+from utils.response_cache import CacheRespostas, cache_respostas, hash_contexto
+from utils.question_index import indice_perguntas
+from config.settings import AppConfig
+from utils import rate_limiter
+from utils.llm_backend import criar_backend
+from utils.instrumentation import obter_logger
+from utils.prompt_context import ORCAMENTO_CONTEXTO, compactar_contexto, json_compacto, metricas_prompt, serializar
+from utils import prompt_templates
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
+log = obter_logger("ai_analyzer")
+
+def _notificar(progresso, etapa, detalhe=None, fracao=None):
+    """Repassa a etapa ao callback de progresso, se houver"""
+    if progresso is not None:
+        progresso(etapa, detalhe, fracao)
+
+
+def _ao_esperar(progresso):
+    """Adapta o callback de progresso às esperas do limitador de taxa"""
+    if progresso is None:
+        return None
+    return lambda segundos, motivo: progresso(motivo, f"(~{segundos:.0f}s)", None)
+
+
+class ProgressoIA:
+    """
+    Indicador de progresso do Streamlit dirigido pelas etapas reais da chamada à IA.
+    
+    Uso: passar a instância como `progresso=` aos métodos do AIAnalyzer e chamar
+    limpar() ao final. A barra nunca retrocede.
+    """
+    
+    ETAPAS = {
+        'contexto': ("🔍 Preparando contexto dos dados...", 0.1),
+        'prompt': ("📝 Montando o prompt...", 0.2),
+        'requisicao': ("🤖 IA processando a requisição...", 0.3),
+        'espera': ("⏳ Aguardando o limite de requisições da API...", None),
+        'retentativa': ("🔁 API sobrecarregada, tentando novamente...", None),
+        'streaming': ("✍️ Recebendo resposta da IA...", None),
+        'consolidacao': ("🧩 Consolidando as análises parciais...", 0.85),
+        'cache': ("⚡ Resposta encontrada no cache", 0.95),
+    }
+    
+    def __init__(self):
+        self._status = st.empty()
+        self._barra = st.progress(0)
+        self._fracao = 0.0
+    
+    def __call__(self, etapa, detalhe=None, fracao=None):
+        mensagem, padrao = self.ETAPAS.get(etapa, (etapa, None))
+        fracao = padrao if fracao is None else fracao
+        if fracao is not None:
+            self._fracao = max(self._fracao, min(fracao, 1.0))
+        self._status.info(f"{mensagem} {detalhe}" if detalhe else mensagem)
+        self._barra.progress(self._fracao)
+    
+    def limpar(self):
+        self._status.empty()
+        self._barra.empty()
+
+
 class AIAnalyzer:
     """
-    Classe para análise de dados usando Google Gemini AI
+    Classe para análise de dados usando Google Gemini AI (ou outro backend, ver LLM_BACKEND)
     """
     
+    MENSAGEM_FORA_DO_ESCOPO = (
+        "A pergunta não está relacionada à análise financeira. Por favor, faça uma pergunta "
+        "sobre métricas financeiras, indicadores contábeis ou análise empresarial."
+    )
+    
+    # Requisições simultâneas na fase "map" de analyze_all_charts
+    MAX_PARALELO = 4
+    
     def __init__(self):
         """
         Inicializa o analisador de IA
         """
         self.api_key = os.getenv('GOOGLE_GEMINI_API_KEY')
-        self.model_name = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
         self.max_tokens = int(os.getenv('MAX_TOKENS', 4096))
         self.temperature = float(os.getenv('TEMPERATURE', 0.7))
         self.detail_level = os.getenv('LLM_DETAIL_LEVEL', 'balanced').lower()
         
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel(
-                model_name=self.model_name,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=self.max_tokens,
-                    temperature=self.temperature
-                )
-            )
-        else:
-            self.model = None
+        self.backend = criar_backend(
+            os.getenv('LLM_BACKEND', 'gemini'),
+            modelo=os.getenv('GEMINI_MODEL', 'gemini-1.5-flash'),
+            max_tokens=self.max_tokens,
+            temperatura=self.temperature,
+            api_key=self.api_key
+        )
+        self.model_name = self.backend.modelo
+        
+        if not self.backend.disponivel():
             st.warning("⚠️ API Key do Google Gemini não configurada. Configure a variável GOOGLE_GEMINI_API_KEY no arquivo .env")
     
     def is_available(self):
         """
         Verifica se a IA está disponível
         """
-        return self.model is not None
+        return self.backend.disponivel()
+    
+    def _chave_cache(self, prompt, contexto=None):
+        parametros = {'temperature': self.temperature, 'max_tokens': self.max_tokens}
+        return CacheRespostas.chave(self.model_name, parametros, prompt, contexto)
+    
+    def _generate(self, prompt, contexto=None, progresso=None, origem='ia'):
+        """
+        Gera a resposta do modelo, reaproveitando respostas idênticas do cache persistente.
+        A chamada à API passa pelo limitador de taxa do processo, com retentativas em
+        erros transitórios (utils.rate_limiter).
+        
+        Args:
+            prompt: Prompt completo enviado ao modelo
+            contexto: Contexto serializado usado no prompt (entra na chave do cache)
+            progresso: Callback opcional progresso(etapa, detalhe=None, fracao=None)
+            origem: Nome da chamada nas métricas de tamanho de prompt
+        
+        Returns:
+            Texto da resposta
+        """
+        chave = self._chave_cache(prompt, contexto)
+        resposta = cache_respostas.obter(chave)
+        metricas_prompt.registrar(origem, prompt, cache=resposta is not None)
+        if resposta is not None:
+            _notificar(progresso, 'cache')
+            return resposta
+        _notificar(progresso, 'requisicao')
+        resposta = rate_limiter.executar(lambda: self.backend.gerar(prompt),
+                                         ao_esperar=_ao_esperar(progresso))
+        cache_respostas.gravar(chave, self.model_name, resposta)
+        return resposta
     
-    def _convert_to_serializable(self, obj):
+    def _generate_stream(self, prompt, contexto=None, progresso=None, origem='ia'):
         """
-        Converte objetos para formatos JSON-serializáveis
+        Como _generate, mas produz a resposta em partes à medida que o modelo as envia.
+        
+        Uma resposta em cache é emitida de uma vez; a resposta nova só é gravada no
+        cache depois que o stream termina por completo.
         """
-        import pandas as pd
-        import numpy as np
-        from datetime import datetime, date
+        chave = self._chave_cache(prompt, contexto)
+        resposta = cache_respostas.obter(chave)
+        metricas_prompt.registrar(origem, prompt, cache=resposta is not None)
+        if resposta is not None:
+            _notificar(progresso, 'cache')
+            yield resposta
+            return
+        _notificar(progresso, 'requisicao')
+        partes = []
+        recebidos = 0
+        # Estimativa de ~4 caracteres por token para avançar a barra durante o stream
+        esperado = self.max_tokens * 4
         
-        # Para DataFrames, converter diretamente sem verificar isna
-        if isinstance(obj, pd.DataFrame):
-            return self._convert_to_serializable(obj.to_dict('records'))
-            
-        # Para Series, converter diretamente sem verificar isna
-        if isinstance(obj, pd.Series):
-            return self._convert_to_serializable(obj.to_dict())
+        def iniciar():
+            # Retentativas só até o primeiro chunk: depois disso o texto já foi exibido
+            partes_stream = iter(self.backend.gerar_stream(prompt))
+            return next(partes_stream, None), partes_stream
         
-        # Verifica se é NaN ou None para outros tipos
-        if obj is None:
-            return None
-            
-        # Para tipos escalares, verificar se é NaN
-        try:
-            if pd.isna(obj):
-                return None
-        except (TypeError, ValueError):
-            # Se pd.isna falhar, continuar com outros testes
-            pass
-            
-        # Pandas Timestamp
-        if isinstance(obj, pd.Timestamp):
-            return obj.strftime('%d/%m/%Y')
-            
-        # Pandas Period (para dados mensais)
-        if hasattr(obj, 'strftime') and hasattr(obj, 'freq'):
-            return obj.strftime('%m/%Y')
-            
-        # Numpy datetime64
-        if isinstance(obj, np.datetime64):
-            return pd.Timestamp(obj).strftime('%d/%m/%Y')
-            
-        # Datetime python nativo
-        if isinstance(obj, (datetime, date)):
-            return obj.strftime('%d/%m/%Y')
-            
-        # Numpy types
-        if isinstance(obj, (np.integer, np.floating)):
-            return float(obj)
-            
-        # Dictionary
-        if isinstance(obj, dict):
-            return {k: self._convert_to_serializable(v) for k, v in obj.items()}
-            
-        # List or tuple
-        elif isinstance(obj, (list, tuple)):
-            return [self._convert_to_serializable(item) for item in obj]
-            
-        # Tipos básicos
-        elif isinstance(obj, (int, float, str, bool)):
-            return obj
-            
-        # Outros objetos com método to_dict
-        elif hasattr(obj, 'to_dict'):
-            return self._convert_to_serializable(obj.to_dict())
-            
-        # Outros objetos com método tolist
-        elif hasattr(obj, 'tolist'):
-            return self._convert_to_serializable(obj.tolist())
-            
-        # Converter para string como último recurso
-        else:
-            return str(obj)
+        primeiro, partes_stream = rate_limiter.executar(iniciar, ao_esperar=_ao_esperar(progresso))
+        for texto in chain([primeiro] if primeiro is not None else [], partes_stream):
+            partes.append(texto)
+            recebidos += len(texto)
+            _notificar(progresso, 'streaming', fracao=0.4 + 0.55 * min(1.0, recebidos / esperado))
+            yield texto
+        resposta = "".join(partes)
+        # Stream sem conteúdo (ex.: resposta bloqueada) não vai para o cache
+        if resposta.strip():
+            cache_respostas.gravar(chave, self.model_name, resposta)
     
     def _prepare_temporal_analysis(self, df_filtrado):
         """
@@ -394,8 +457,8 @@ class AIAnalyzer:
             dados_gerais = {
                 "total_registros": int(len(df)),
                 "registros_filtrados": int(len(df_filtrado)),
-                "periodo_inicio": self._convert_to_serializable(df['Data'].min()),
-                "periodo_fim": self._convert_to_serializable(df['Data'].max()),
+                "periodo_inicio": serializar(df['Data'].min()),
+                "periodo_fim": serializar(df['Data'].max()),
                 "categorias_receitas": df[df['Tipo'] == 'Receita']['Categoria'].unique().tolist(),
                 "categorias_despesas": df[df['Tipo'] == 'Despesa']['Categoria'].unique().tolist()
             }
@@ -423,7 +486,7 @@ class AIAnalyzer:
                 # Converter apenas as colunas numéricas
                 for col in desc.columns:
                     if col == 'Valor':  # Apenas a coluna de valor nos interessa
-                        resumo_estatistico[col] = self._convert_to_serializable(desc[col].to_dict())
+                        resumo_estatistico[col] = serializar(desc[col])
             except Exception as e:
                 resumo_estatistico = {"erro": f"Não foi possível gerar estatísticas: {str(e)}"}
             
@@ -433,11 +496,11 @@ class AIAnalyzer:
                 receitas_top = df_filtrado[df_filtrado['Tipo'] == 'Receita'].nlargest(5, 'Valor')
                 for _, row in receitas_top.iterrows():
                     top_receitas.append({
-                        'Data': self._convert_to_serializable(row['Data']),
+                        'Data': serializar(row['Data']),
                         'Descrição': str(row['Descrição']),
                         'Categoria': str(row['Categoria']),
                         'Valor': float(row['Valor']),
-                        'Mes_Ano': self._convert_to_serializable(row['Data'].strftime('%m/%Y'))
+                        'Mes_Ano': serializar(row['Data'].strftime('%m/%Y'))
                     })
             except Exception as e:
                 top_receitas = [{"erro": f"Não foi possível obter top receitas: {str(e)}"}]
@@ -448,11 +511,11 @@ class AIAnalyzer:
                 despesas_top = df_filtrado[df_filtrado['Tipo'] == 'Despesa'].nlargest(5, 'Valor')
                 for _, row in despesas_top.iterrows():
                     top_despesas.append({
-                        'Data': self._convert_to_serializable(row['Data']),
+                        'Data': serializar(row['Data']),
                         'Descrição': str(row['Descrição']),
                         'Categoria': str(row['Categoria']),
                         'Valor': float(row['Valor']),
-                        'Mes_Ano': self._convert_to_serializable(row['Data'].strftime('%m/%Y'))
+                        'Mes_Ano': serializar(row['Data'].strftime('%m/%Y'))
                     })
             except Exception as e:
                 top_despesas = [{"erro": f"Não foi possível obter top despesas: {str(e)}"}]
@@ -501,15 +564,20 @@ class AIAnalyzer:
                 }
             }
     
-    def generate_insights(self, df, df_filtrado, kpis, user_question=None):
+    def generate_insights(self, df, df_filtrado, kpis, user_question=None, progresso=None):
         """
         Gera insights usando a IA do Google Gemini
+        
+        Args:
+            progresso: Callback opcional progresso(etapa, detalhe=None, fracao=None), chamado
+                a cada etapa real (contexto, prompt, requisição)
         """
         if not self.is_available():
             return "IA não disponível. Configure a API key do Google Gemini."
         
         try:
             # Preparar contexto dos dados
+            _notificar(progresso, 'contexto')
             context = self.prepare_data_context(df, df_filtrado, kpis)
             
             # Verificar se houve erro na preparação do contexto
@@ -517,111 +585,39 @@ class AIAnalyzer:
                 return f"Erro na preparação dos dados: {context.get('erro', 'Erro desconhecido')}"
             
             # Construir prompt
+            _notificar(progresso, 'prompt')
             if user_question:
                 prompt = self._build_question_prompt(context, user_question)
             else:
                 prompt = self._build_insights_prompt(context)
             
-            # Gerar resposta
-            response = self.model.generate_content(prompt)
-            
-            return response.text
+            # Gerar resposta (ou reaproveitar do cache)
+            return self._generate(prompt, contexto=context, progresso=progresso, origem='insights')
             
         except Exception as e:
             return f"Erro ao gerar insights: {str(e)}"
     
     # ===================== PROMPT TEMPLATES REFACTORED =====================
     def _select_detail_config(self):
-        mapping = {
-            'curto': {'bullets_destaques': 3, 'bullets_riscos': 2, 'bullets_acoes': 2, 'max_sections': 5},
-            'balanced': {'bullets_destaques': 5, 'bullets_riscos': 3, 'bullets_acoes': 3, 'max_sections': 6},
-            'detalhado': {'bullets_destaques': 8, 'bullets_riscos': 5, 'bullets_acoes': 5, 'max_sections': 7}
-        }
-        return mapping.get(self.detail_level, mapping['balanced'])
+        return prompt_templates.detalhes_nivel(self.detail_level)
 
     def _format_context_compact(self, context: dict):
-        """Reduz o contexto antes de enviar ao LLM (remove listas muito grandes)."""
-        import copy
-        ctx = copy.deepcopy(context)
-        # Limitar top listas
-        def trim_list(lst, n=10):
-            return lst[:n] if isinstance(lst, list) and len(lst) > n else lst
-        # Exemplos de cortes
-        if isinstance(ctx.get('dados_filtrados'), dict):
-            dfilt = ctx['dados_filtrados']
-            for k in ['top_receitas','top_despesas','ranking_mensal']:
-                if k in dfilt:
-                    dfilt[k] = trim_list(dfilt[k], 5)
+        """Reduz o contexto ao orçamento de tokens do nível de detalhe (campos de menor valor saem primeiro)."""
+        orcamento = ORCAMENTO_CONTEXTO.get(self.detail_level, ORCAMENTO_CONTEXTO['balanced'])
+        ctx, info = compactar_contexto(context, orcamento)
+        if info['resumidos'] or info['removidos']:
+            log.debug("Contexto compactado: %d -> %d tokens (resumidos: %s; removidos: %s)",
+                      info['tokens_original'], info['tokens'], info['resumidos'], info['removidos'])
         return ctx
 
     def _build_insights_prompt(self, context):
-        cfg = self._select_detail_config()
         ctx_compact = self._format_context_compact(context)
-        prompt = f"""
-Você é um analista financeiro sênior. Gere análise EXECUTIVA com profundidade equilibrada.
-LÍNGUA: Português brasileiro.
-FORMATO: Markdown estruturado.
-NÍVEL DE DETALHE: {self.detail_level}.
-
-DADOS (JSON resumido):
-{json.dumps(ctx_compact, indent=2, ensure_ascii=False)}
-
-INSTRUÇÕES GERAIS:
-1. Se existirem executive_alerts, iniciar explicando-os em ordem de criticidade.
-2. Usar executive_narrative como base, mas expandir com números objetivos (não inventar).
-3. Citar métricas com valores e variações (pp ou %), sempre indicar unidade (% / vezes / R$ se aplicável).
-4. Não repetir exatamente o mesmo valor em seções diferentes sem nova interpretação.
-5. Se algum dado essencial estiver ausente, declarar 'dado não disponível'.
-6. Evitar floreios; foco em implicações.
-
-ESTRUTURA (não adicionar seções extras):
-## 📌 Resumo Executivo (3-4 frases)
-## 🔔 Alertas Críticos (se houver)
-## 📊 Destaques Quantitativos (até {cfg['bullets_destaques']} bullets)
-## ⚠️ Riscos / Pressões (até {cfg['bullets_riscos']} bullets)
-## 🚀 Oportunidades / Eficiências (2-3 bullets)
-## 🎯 Ações Prioritárias (até {cfg['bullets_acoes']} bullets com verbo inicial)
-## 🧪 Observações / Limitações (1-2 bullets se necessário)
-
-REGRAS DE NUMERAIS:
-- Percentuais: 1 casa (ex: 12,3%).
-- Diferença percentual absoluta: usar 'pp' quando for diferença de margens/ROE.
-- Valores monetários: se houver (R$), sem casas decimais, milhar com ponto.
-
-RESPONDA APENAS COM A ANÁLISE.
-"""
-        return prompt
+        return prompt_templates.renderizar('insights', self.detail_level, dados=json_compacto(ctx_compact))
 
     def _build_question_prompt(self, context, question):
-        cfg = self._select_detail_config()
         ctx_compact = self._format_context_compact(context)
-        prompt = f"""
-Você é um analista financeiro sênior. Responda a PERGUNTA específica de forma objetiva porém com substância.
-LÍNGUA: Português brasileiro.
-NÍVEL DE DETALHE: {self.detail_level}.
-
-PERGUNTA:
-{question}
-
-DADOS (JSON resumido):
-{json.dumps(ctx_compact, indent=2, ensure_ascii=False)}
-
-INSTRUÇÕES:
-1. Se a pergunta se relacionar a métricas presentes em executive_alerts, priorize riscos primeiro.
-2. Limitar a resposta a 3-5 parágrafos curtos OU uma combinação de parágrafos + lista (máx {cfg['bullets_destaques']} bullets totais).
-3. Sempre que citar variação, qualificar (ex: 'ROE caiu 3,2 pp vs ano anterior').
-4. Se a pergunta pedir comparação temporal e só houver 2 anos, explicitar limitação.
-5. Encerrar (última linha) com '➡️ Próximo passo:' e uma recomendação acionável.
-6. Não inventar métricas inexistentes; se não encontrado, dizer explicitamente.
-
-FORMATO:
-- Parágrafo inicial direto respondendo.
-- Lista (se pertinente) com evidências numéricas.
-- Conclusão estratégica + próximo passo.
-
-RESPONDA APENAS COM O CONTEÚDO SOLICITADO.
-"""
-        return prompt
+        return prompt_templates.renderizar('pergunta', self.detail_level, pergunta=question,
+                                           dados=json_compacto(ctx_compact))
     
     def _convert_alerts_to_text(self, alerts):
         """
@@ -789,78 +785,30 @@ RESPONDA APENAS COM O CONTEÚDO SOLICITADO.
         if not self.is_available():
             return "IA não disponível. Configure a API key."
         try:
-            serial_chart = self._convert_to_serializable(chart_data)
+            serial_chart = serializar(chart_data)
             alerts, narrativa = ([], None)
             if isinstance(df_filtrado, pd.DataFrame) and not df_filtrado.empty:
                 alerts, narrativa = self._build_executive_alerts_and_narrative(df_filtrado)
             alerts_texto = "; ".join([f"[{a['nivel'].upper()}] {a['mensagem']}" for a in alerts]) if alerts else "Nenhum alerta relevante."
-            base_context_json = json.dumps({
+            base_context_json = json_compacto({
                 "chart_type": chart_type,
                 "chart_data": serial_chart,
                 "executive_alerts": alerts,
                 "executive_narrative": narrativa
-            }, indent=2, ensure_ascii=False)
+            })
             if custom_question:
                 # Validação básica se a pergunta é relacionada a finanças
-                finance_keywords = [
-                    'financeira', 'contábil', 'receita', 'lucro', 'prejuízo', 'ativo', 'passivo', 'patrimônio',
-                    'liquidez', 'rentabilidade', 'endividamento', 'roa', 'roe', 'margem', 'giro', 'ciclo',
-                    'capital', 'investimento', 'fluxo', 'caixa', 'despesa', 'custo', 'resultado', 'balanço',
-                    'dre', 'indicador', 'índice', 'ratio', 'análise', 'performance', 'desempenho', 'benchmark',
-                    'métrica', 'alavancagem', 'solvência', 'imobilizado', 'circulante', 'estoque', 'fornecedor',
-                    'cliente', 'prazo', 'pmre', 'pmrv', 'pmpc', 'dupont', 'ebitda', 'variação', 'crescimento',
-                    'queda', 'aumento', 'diminuição', 'evolução', 'tendência', 'risco', 'oportunidade', 'gráfico',
-                    'visualização', 'dados', 'valores', 'comparação'
-                ]
-                
-                question_lower = custom_question.lower()
-                is_finance_related = any(keyword in question_lower for keyword in finance_keywords)
-                
-                if not is_finance_related:
-                    return "A pergunta não está relacionada à análise financeira. Por favor, faça uma pergunta sobre métricas financeiras, indicadores contábeis ou análise empresarial."
+                if not prompt_templates.pergunta_financeira(custom_question, visualizacao=True):
+                    return self.MENSAGEM_FORA_DO_ESCOPO
                 
-                prompt = f"""
-Você é um ANALISTA FINANCEIRO ESPECIALISTA. Responda APENAS perguntas relacionadas à análise financeira, métricas contábeis e indicadores empresariais.
-
-CONTEXTO DA VISUALIZAÇÃO: {chart_type}
-ALERTAS EXECUTIVOS: {alerts_texto}
-DADOS DA VISUALIZAÇÃO:
-{base_context_json}
-
-PERGUNTA DO USUÁRIO: {custom_question}
-
-FORMATO DE RESPOSTA:
-
-## 📊 ANÁLISE DOS DADOS
-[Análise baseada nos dados da visualização]
-
-## 📈 INTERPRETAÇÃO TÉCNICA  
-[Significado dos indicadores no contexto empresarial]
-
-## ⚠️ ALERTAS E RECOMENDAÇÕES
-[Principais achados e ações recomendadas]
-
-Seja preciso, use números específicos dos dados, e mantenha foco exclusivamente em análise financeira.
-"""
+                prompt = prompt_templates.renderizar('grafico_pergunta', self.detail_level, tipo=chart_type,
+                                                     alertas=alerts_texto, dados=base_context_json,
+                                                     pergunta=custom_question)
             else:
-                prompt = f"""
-Você é um analista financeiro sênior. Gere uma análise executiva da visualização.
-
-TIPO DE VISUALIZAÇÃO: {chart_type}
-ALERTAS EXECUTIVOS: {alerts_texto}
-NARRATIVA EXECUTIVA (se houver): {narrativa if narrativa else 'N/A'}
-DADOS DA VISUALIZAÇÃO (JSON):
-{base_context_json}
-
-Produza:
-- Resumo objetivo (1 frase)
-- 2-4 destaques quantitativos
-- Riscos / atenções (se houver)
-- Próxima ação recomendada
-Responda em português brasileiro.
-"""
-            response = self.model.generate_content(prompt)
-            return response.text
+                prompt = prompt_templates.renderizar('grafico_analise', self.detail_level, tipo=chart_type,
+                                                     alertas=alerts_texto, narrativa=narrativa if narrativa else 'N/A',
+                                                     dados=base_context_json)
+            return self._generate(prompt, contexto=base_context_json, origem='grafico')
         except Exception as e:
             return f"Erro na análise do gráfico: {e}"
     
@@ -876,133 +824,139 @@ Responda em português brasileiro.
         if not self.is_available():
             return "IA não disponível. Configure a API key."
         try:
-            serial_metric = self._convert_to_serializable(metric_data)
-            
-            # Gerar contexto executivo se DataFrame disponível
-            alerts, narrativa = ([], None)
-            if isinstance(df_filtrado, pd.DataFrame) and not df_filtrado.empty:
-                alerts, narrativa = self._build_executive_alerts_and_narrative(df_filtrado)
-            
-            alerts_texto = "; ".join([f"[{a['nivel'].upper()}] {a['mensagem']}" for a in alerts]) if alerts else "Nenhum alerta relevante."
-            
-            base_context_json = json.dumps({
-                "metric_id": metric_id,
-                "metric_data": serial_metric,
-                "executive_alerts": alerts,
-                "executive_narrative": narrativa
-            }, indent=2, ensure_ascii=False)
-            
-            if custom_question:
-                # Validação básica se a pergunta é relacionada a finanças
-                finance_keywords = [
-                    'financeira', 'contábil', 'receita', 'lucro', 'prejuízo', 'ativo', 'passivo', 'patrimônio',
-                    'liquidez', 'rentabilidade', 'endividamento', 'roa', 'roe', 'margem', 'giro', 'ciclo',
-                    'capital', 'investimento', 'fluxo', 'caixa', 'despesa', 'custo', 'resultado', 'balanço',
-                    'dre', 'indicador', 'índice', 'ratio', 'análise', 'performance', 'desempenho', 'benchmark',
-                    'métrica', 'alavancagem', 'solvência', 'imobilizado', 'circulante', 'estoque', 'fornecedor',
-                    'cliente', 'prazo', 'pmre', 'pmrv', 'pmpc', 'dupont', 'ebitda', 'variação', 'crescimento',
-                    'queda', 'aumento', 'diminuição', 'evolução', 'tendência', 'risco', 'oportunidade'
-                ]
-                
-                question_lower = custom_question.lower()
-                is_finance_related = any(keyword in question_lower for keyword in finance_keywords)
-                
-                if not is_finance_related:
-                    return "A pergunta não está relacionada à análise financeira. Por favor, faça uma pergunta sobre métricas financeiras, indicadores contábeis ou análise empresarial."
-                
-                prompt = f"""
-Você é um ANALISTA FINANCEIRO ESPECIALISTA. Responda APENAS perguntas relacionadas à análise financeira, métricas contábeis e indicadores empresariais.
-
-CONTEXTO DA MÉTRICA:
-• Nome: {metric_data.get('métrica', metric_id)}
-• Categoria: {metric_data.get('categoria', 'N/A')}
-• Valores: {metric_data.get('estatísticas', {})}
-
-ALERTAS EXECUTIVOS: {alerts_texto}
-DADOS COMPLETOS:
-```json
-{base_context_json}
-```
-
-PERGUNTA DO USUÁRIO: {custom_question}
-
-FORMATO DE RESPOSTA:
-
-## 📊 ANÁLISE DA MÉTRICA
-[Análise dos valores e evolução baseada nos dados fornecidos]
-
-## 📈 INTERPRETAÇÃO TÉCNICA  
-[Significado dos números no contexto empresarial]
-
-## 🎯 BENCHMARKS E COMPARAÇÃO
-[Comparação com padrões de mercado e situação da empresa]
-
-## ⚠️ INSIGHTS E RECOMENDAÇÕES
-[Principais achados e ações recomendadas]
-
-Seja preciso, use números específicos dos dados, e mantenha foco exclusivamente em análise financeira.
-"""
-            else:
-                prompt = f"""
-Você é um ANALISTA FINANCEIRO ESPECIALISTA. Forneça uma análise executiva estruturada desta métrica financeira.
-
-CONTEXTO DA MÉTRICA:
-• Nome: {metric_data.get('métrica', metric_id)}
-• Categoria: {metric_data.get('categoria', 'N/A')}
-• Valor Atual: {metric_data.get('estatísticas', {}).get('valor_atual', 'N/A')}
-• Valor Anterior: {metric_data.get('estatísticas', {}).get('valor_anterior', 'N/A')}
-• Tendência: {metric_data.get('estatísticas', {}).get('tendência', 'N/A')}
-• Variação %: {metric_data.get('estatísticas', {}).get('variacao_percentual', 'N/A')}%
-
-ALERTAS EXECUTIVOS: {alerts_texto}
-
-DADOS COMPLETOS:
-```json
-{base_context_json}
-```
-
-FORNEÇA ANÁLISE NO FORMATO:
-
-## 📊 SITUAÇÃO ATUAL DA MÉTRICA
-• **Valor Atual:** [valor] ([variação] vs período anterior)
-• **Classificação:** [Excelente/Bom/Adequado/Preocupante/Crítico]
-• **Tendência:** [crescente/decrescente/estável] - [explicação]
-
-## 📈 INTERPRETAÇÃO EXECUTIVA
-• **Significado:** [o que esta métrica representa para o negócio]
-• **Contexto Setorial:** [comparação com benchmarks de mercado]
-• **Impacto no Desempenho:** [como afeta outros indicadores]
-
-## 🎯 ANÁLISE COMPARATIVA
-• **vs Período Anterior:** [análise da evolução]
-• **vs Benchmarks:** [posicionamento em relação ao mercado]
-• **Contexto Histórico:** [padrões identificados nos dados]
-
-## ⚠️ RISCOS E OPORTUNIDADES
-• **Riscos Identificados:** [pontos de atenção baseados nos dados]
-• **Oportunidades:** [potenciais melhorias]
-• **Ações Recomendadas:** [próximos passos específicos]
-
-## 💡 RESUMO EXECUTIVO
-[Conclusão de 2-3 frases sobre a situação desta métrica e próximos passos]
-
-Use APENAS os dados fornecidos. Seja específico com números e percentuais.
-"""
-            
-            response = self.model.generate_content(prompt)
-            return response.text
+            prompt, contexto = self._build_metric_prompt(metric_data, metric_id, df_filtrado, custom_question)
+            if prompt is None:
+                return self.MENSAGEM_FORA_DO_ESCOPO
+            semelhante = self._resposta_semelhante(metric_id, contexto, custom_question)
+            if semelhante is not None:
+                return semelhante
+            resposta = self._generate(prompt, contexto=contexto, origem='metrica')
+            self._registrar_resposta(metric_id, contexto, custom_question, resposta)
+            return resposta
         except Exception as e:
             return f"Erro na análise da métrica: {e}"
     
-    def analyze_all_charts(self, df, df_filtrado, kpis):
+    def cached_metric_insights(self, metric_data, metric_id, df_filtrado=None):
+        """Análise padrão da métrica já presente no cache de respostas, sem chamar o modelo (ou None)."""
+        try:
+            prompt, contexto = self._build_metric_prompt(metric_data, metric_id, df_filtrado)
+        except Exception:
+            return None
+        return cache_respostas.obter(self._chave_cache(prompt, contexto))
+    
+    def generate_metric_insights_stream(self, metric_data, metric_id, df_filtrado=None, custom_question=None,
+                                        progresso=None):
+        """Versão em streaming de generate_metric_insights: gera a resposta em partes.
+
+        Os argumentos são os mesmos de generate_metric_insights, mais o callback opcional
+        de progresso. Mensagens de erro ou de pergunta fora do escopo são emitidas como
+        uma única parte.
+        """
+        if not self.is_available():
+            yield "IA não disponível. Configure a API key."
+            return
+        try:
+            _notificar(progresso, 'prompt')
+            prompt, contexto = self._build_metric_prompt(metric_data, metric_id, df_filtrado, custom_question)
+        except Exception as e:
+            yield f"Erro na análise da métrica: {e}"
+            return
+        if prompt is None:
+            yield self.MENSAGEM_FORA_DO_ESCOPO
+            return
+        semelhante = self._resposta_semelhante(metric_id, contexto, custom_question)
+        if semelhante is not None:
+            _notificar(progresso, 'cache')
+            yield semelhante
+            return
+        partes = []
+        try:
+            for parte in self._generate_stream(prompt, contexto=contexto, progresso=progresso, origem='metrica'):
+                partes.append(parte)
+                yield parte
+        except Exception as e:
+            yield f"\n\nErro na análise da métrica: {e}"
+            return
+        self._registrar_resposta(metric_id, contexto, custom_question, "".join(partes))
+    
+    def _escopo_reuso(self, metric_id, contexto):
+        """Escopo do reaproveitamento: mesmo modelo, nível de detalhe, métrica e dados"""
+        return (self.model_name, self.detail_level, metric_id, hash_contexto(contexto))
+    
+    def _resposta_semelhante(self, metric_id, contexto, pergunta):
+        """Resposta já dada a uma pergunta quase igual sobre os mesmos dados, ou None"""
+        if not pergunta:
+            return None
+        semelhante = indice_perguntas.buscar(self._escopo_reuso(metric_id, contexto), pergunta)
+        if semelhante is None:
+            return None
+        original, resposta, _ = semelhante
+        if original.strip().lower() == pergunta.strip().lower():
+            return resposta
+        return f"♻️ *Resposta reaproveitada da pergunta semelhante \"{original}\".*\n\n{resposta}"
+    
+    def _registrar_resposta(self, metric_id, contexto, pergunta, resposta):
+        if pergunta and resposta:
+            indice_perguntas.registrar(self._escopo_reuso(metric_id, contexto), pergunta, resposta)
+    
+    def _build_metric_prompt(self, metric_data, metric_id, df_filtrado=None, custom_question=None):
+        """Monta o prompt da métrica; retorna (prompt, contexto) ou (None, None) se a pergunta estiver fora do escopo."""
+        serial_metric = serializar(metric_data)
+        
+        # Gerar contexto executivo se DataFrame disponível
+        alerts, narrativa = ([], None)
+        if isinstance(df_filtrado, pd.DataFrame) and not df_filtrado.empty:
+            alerts, narrativa = self._build_executive_alerts_and_narrative(df_filtrado)
+        
+        alerts_texto = "; ".join([f"[{a['nivel'].upper()}] {a['mensagem']}" for a in alerts]) if alerts else "Nenhum alerta relevante."
+        
+        base_context_json = json_compacto({
+            "metric_id": metric_id,
+            "metric_data": serial_metric,
+            "executive_alerts": alerts,
+            "executive_narrative": narrativa
+        })
+        
+        nome = metric_data.get('métrica', metric_id)
+        categoria = metric_data.get('categoria', 'N/A')
+        estatisticas = metric_data.get('estatísticas', {})
+        
+        if custom_question:
+            # Validação básica se a pergunta é relacionada a finanças
+            if not prompt_templates.pergunta_financeira(custom_question):
+                return None, None
+            
+            prompt = prompt_templates.renderizar('metrica_pergunta', self.detail_level, nome=nome,
+                                                 categoria=categoria, estatisticas=estatisticas,
+                                                 alertas=alerts_texto, dados=base_context_json,
+                                                 pergunta=custom_question)
+        else:
+            prompt = prompt_templates.renderizar('metrica_analise', self.detail_level, nome=nome,
+                                                 categoria=categoria,
+                                                 valor_atual=estatisticas.get('valor_atual', 'N/A'),
+                                                 valor_anterior=estatisticas.get('valor_anterior', 'N/A'),
+                                                 tendencia=estatisticas.get('tendência', 'N/A'),
+                                                 variacao=estatisticas.get('variacao_percentual', 'N/A'),
+                                                 alertas=alerts_texto, dados=base_context_json)
+        
+        return prompt, base_context_json
+    
+    def analyze_all_charts(self, df, df_filtrado, kpis, map_reduce=True, progresso=None):
         """
         Analisa todos os gráficos de uma vez e fornece insights integrados
+        
+        Args:
+            map_reduce: Se True, cada gráfico é analisado em uma requisição paralela e uma
+                chamada final curta consolida as análises parciais; se False, envia um
+                único prompt com todos os dados
+            progresso: Callback opcional progresso(etapa, detalhe=None, fracao=None)
         """
         if not self.is_available():
             return "IA não disponível."
         
         try:
             # Preparar dados para cada tipo de gráfico
+            _notificar(progresso, 'contexto')
             evolucao_data = self._prepare_evolution_data(df_filtrado)
             despesas_data = self._prepare_expenses_data(df_filtrado)
             distribuicao_data = self._prepare_distribution_data(df_filtrado)
@@ -1010,22 +964,31 @@ Use APENAS os dados fornecidos. Seja específico com números e percentuais.
             # Preparar contexto completo
             full_context = self.prepare_data_context(df, df_filtrado, kpis)
             
+            if map_reduce:
+                secoes = [
+                    ("GRÁFICO DE EVOLUÇÃO TEMPORAL", "melhor e pior mês em receitas, tendências de crescimento ou declínio e sazonalidade", evolucao_data),
+                    ("GRÁFICO DE DESPESAS POR CATEGORIA", "categorias com maior impacto, oportunidades de otimização e gastos elevados", despesas_data),
+                    ("GRÁFICO DE DISTRIBUIÇÃO PERCENTUAL", "concentração e participação de cada categoria", distribuicao_data),
+                    ("CONTEXTO GERAL E KPIs", "desempenho geral, alertas e riscos", self._format_context_compact(full_context)),
+                ]
+                return self._analyze_sections_map_reduce(secoes, progresso)
+            
             prompt = f"""
             Você é um consultor financeiro sênior. Analise todos os gráficos do dashboard e forneça uma análise integrada e estratégica.
 
             DADOS DOS GRÁFICOS:
             
             1. GRÁFICO DE EVOLUÇÃO TEMPORAL:
-            {json.dumps(evolucao_data, indent=2, ensure_ascii=False)}
+            {json_compacto(evolucao_data)}
             
             2. GRÁFICO DE DESPESAS POR CATEGORIA:
-            {json.dumps(despesas_data, indent=2, ensure_ascii=False)}
+            {json_compacto(despesas_data)}
             
             3. GRÁFICO DE DISTRIBUIÇÃO PERCENTUAL:
-            {json.dumps(distribuicao_data, indent=2, ensure_ascii=False)}
+            {json_compacto(distribuicao_data)}
             
             CONTEXTO COMPLETO:
-            {json.dumps(full_context, indent=2, ensure_ascii=False)}
+            {json_compacto(self._format_context_compact(full_context))}
 
             Forneça uma análise executiva estruturada contendo:
 
@@ -1056,12 +1019,72 @@ Use APENAS os dados fornecidos. Seja específico com números e percentuais.
             Seja específico, use números dos dados e forneça insights acionáveis em português brasileiro.
             """
             
-            response = self.model.generate_content(prompt)
-            return response.text
+            _notificar(progresso, 'prompt')
+            return self._generate(prompt, contexto=full_context, progresso=progresso, origem='analise_integrada')
             
         except Exception as e:
             return f"Erro na análise integrada: {str(e)}"
     
+    def _analyze_sections_map_reduce(self, secoes, progresso=None):
+        """
+        Map-reduce da análise integrada: um prompt curto por seção, em paralelo, e uma
+        chamada final que consolida as análises parciais no relatório executivo.
+        
+        Args:
+            secoes: Lista de (título, foco da análise, dados JSON-serializáveis)
+        """
+        def analisar_secao(secao):
+            titulo, foco, dados = secao
+            dados_json = json_compacto(serializar(dados))
+            prompt = f"""
+Você é um consultor financeiro sênior. Analise apenas a seção abaixo do dashboard.
+
+SEÇÃO: {titulo}
+FOCO: {foco}
+DADOS (JSON):
+{dados_json}
+
+Responda com no máximo 6 tópicos curtos, com números específicos dos dados, em português brasileiro.
+"""
+            return self._generate(prompt, contexto=dados_json, origem='analise_integrada.secao')
+        
+        _notificar(progresso, 'requisicao', f"(0/{len(secoes)} seções)")
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=min(self.MAX_PARALELO, len(secoes))) as executor:
+            futuros = {executor.submit(analisar_secao, secao): secao[0] for secao in secoes}
+            # O progresso é reportado nesta thread: as threads do pool não têm contexto do Streamlit
+            for concluidas, futuro in enumerate(as_completed(futuros), 1):
+                titulo = futuros[futuro]
+                try:
+                    resultados[titulo] = futuro.result()
+                except Exception as e:
+                    resultados[titulo] = f"(análise indisponível: {e})"
+                _notificar(progresso, 'requisicao', f"({concluidas}/{len(secoes)} seções)",
+                           fracao=0.3 + 0.5 * concluidas / len(secoes))
+        parciais = [(titulo, resultados[titulo]) for titulo, _, _ in secoes]
+        
+        if all(texto.startswith("(análise indisponível") for _, texto in parciais):
+            return f"Erro na análise integrada: {parciais[0][1]}"
+        
+        analises = "\n\n".join(f"### {titulo}\n{texto}" for titulo, texto in parciais)
+        prompt = f"""
+Você é um consultor financeiro sênior. Consolide as análises parciais do dashboard abaixo em uma análise integrada e estratégica.
+
+ANÁLISES PARCIAIS:
+{analises}
+
+Forneça uma análise executiva estruturada contendo:
+## 📊 RESUMO EXECUTIVO
+## 📈 ANÁLISE TEMPORAL DETALHADA
+## 💸 ANÁLISE DE DESPESAS
+## 🎯 INSIGHTS ESTRATÉGICOS
+## 📋 PLANO DE AÇÃO (3 ações prioritárias, métricas para acompanhar e próximos passos)
+
+Use apenas os números presentes nas análises parciais e responda em português brasileiro.
+"""
+        _notificar(progresso, 'consolidacao')
+        return self._generate(prompt, origem='analise_integrada.consolidacao')
+    
     def _prepare_evolution_data(self, df_filtrado):
         """Prepara dados do gráfico de evolução"""
         try:
@@ -1124,7 +1147,7 @@ Use APENAS os dados fornecidos. Seja específico com números e percentuais.
         except Exception as e:
             return {"erro": f"Erro ao preparar dados de distribuição: {str(e)}"}
     
-    def suggest_questions(self, context):
+    def suggest_questions(self, context, progresso=None):
         """
         Sugere perguntas relevantes baseadas nos dados
         """
@@ -1133,13 +1156,13 @@ Use APENAS os dados fornecidos. Seja específico com números e percentuais.
         
         try:
             # O contexto já deve estar serializável, mas vamos garantir
-            serializable_context = self._convert_to_serializable(context)
+            serializable_context = serializar(context)
             
             prompt = f"""
             Com base nos dados fornecidos, sugira 5 perguntas relevantes que um usuário poderia fazer para obter insights valiosos.
 
             CONTEXTO DOS DADOS:
-            {json.dumps(serializable_context, indent=2, ensure_ascii=False)}
+            {json_compacto(self._format_context_compact(serializable_context))}
 
             Sugira perguntas que:
             1. Explorem tendências temporais
@@ -1151,13 +1174,36 @@ Use APENAS os dados fornecidos. Seja específico com números e percentuais.
             Retorne apenas as perguntas, uma por linha, em português brasileiro.
             """
             
-            response = self.model.generate_content(prompt)
-            questions = [q.strip() for q in response.text.split('\n') if q.strip()]
+            _notificar(progresso, 'prompt')
+            resposta = self._generate(prompt, contexto=serializable_context, progresso=progresso, origem='sugestoes')
+            questions = [q.strip() for q in resposta.split('\n') if q.strip()]
             return questions[:5]  # Limitar a 5 perguntas
             
         except Exception as e:
             return [f"Erro ao gerar sugestões: {str(e)}"]
 
+# Variáveis de ambiente que definem o cliente do modelo: mudou alguma, novo cliente
+_VARIAVEIS_CLIENTE = ('LLM_BACKEND', 'GEMINI_MODEL', 'GOOGLE_GEMINI_API_KEY', 'MAX_TOKENS',
+                      'TEMPERATURE', 'LLM_DETAIL_LEVEL')
+
+
+@st.cache_resource(show_spinner=False,
+                   ttl=AppConfig.IA_CONFIG["cliente_ttl_horas"] * 3600,
+                   max_entries=AppConfig.IA_CONFIG["max_clientes"])
+def _ai_analyzer_compartilhado(configuracao):
+    return AIAnalyzer()
+
+
+def obter_ai_analyzer():
+    """
+    AIAnalyzer único por processo e por configuração, compartilhado por sessões e reruns.
+    
+    O cliente do modelo (configuração da API, GenerativeModel e suas conexões) é criado
+    uma vez e reaproveitado; o AIAnalyzer não guarda estado de sessão.
+    """
+    configuracao = "\0".join(os.getenv(nome, '') for nome in _VARIAVEIS_CLIENTE)
+    return _ai_analyzer_compartilhado(hashlib.sha256(configuracao.encode('utf-8')).hexdigest())
+
 # Função para criar interface de IA no Streamlit
 def create_ai_interface(df, df_filtrado, kpis):
     """
@@ -1166,8 +1212,8 @@ def create_ai_interface(df, df_filtrado, kpis):
     st.markdown("---")
     st.subheader("🤖 Análise Inteligente com IA")
     
-    # Inicializar analisador de IA
-    analyzer = AIAnalyzer()
+    # Analisador de IA compartilhado pelo processo
+    analyzer = obter_ai_analyzer()
     
     if not analyzer.is_available():
         st.error("❌ API do Google Gemini não configurada!")
@@ -1185,32 +1231,11 @@ def create_ai_interface(df, df_filtrado, kpis):
     with tab1:
         st.write("**Análise automática dos dados atuais:**")
         if st.button("🔍 Gerar Insights Automáticos", type="primary"):
-            import time
-            
-            # Criar placeholder para animação
-            status_placeholder = st.empty()
-            progress_bar = st.progress(0)
-            
-            # Animação de carregamento
-            for i in range(100):
-                if i < 30:
-                    status_placeholder.info("🔍 Analisando dados...")
-                elif i < 60:
-                    status_placeholder.info("🤖 IA processando informações...")
-                elif i < 90:
-                    status_placeholder.info("📊 Gerando insights...")
-                else:
-                    status_placeholder.info("✨ Finalizando análise...")
-                
-                progress_bar.progress(i + 1)
-                time.sleep(0.025)  # 2.5 segundos total
+            progresso = ProgressoIA()
             
             # Gerar insights
-            insights = analyzer.generate_insights(df, df_filtrado, kpis)
-            
-            # Limpar animação
-            status_placeholder.empty()
-            progress_bar.empty()
+            insights = analyzer.generate_insights(df, df_filtrado, kpis, progresso=progresso)
+            progresso.limpar()
             
             # Mostrar resultado em expander organizado
             with st.expander("📈 **Insights Gerados pela IA** - Clique para expandir", expanded=True):
@@ -1233,32 +1258,11 @@ def create_ai_interface(df, df_filtrado, kpis):
         )
         
         if st.button("🤖 Perguntar para IA", type="primary") and user_question:
-            import time
-            
-            # Criar placeholder para animação
-            status_placeholder = st.empty()
-            progress_bar = st.progress(0)
-            
-            # Animação de carregamento personalizada para perguntas
-            for i in range(100):
-                if i < 25:
-                    status_placeholder.info("� Processando sua pergunta...")
-                elif i < 50:
-                    status_placeholder.info("🔍 Analisando dados relacionados...")
-                elif i < 75:
-                    status_placeholder.info("🤖 IA formulando resposta...")
-                else:
-                    status_placeholder.info("✨ Finalizando análise...")
-                
-                progress_bar.progress(i + 1)
-                time.sleep(0.025)  # 2.5 segundos total
+            progresso = ProgressoIA()
             
             # Gerar resposta
-            answer = analyzer.generate_insights(df, df_filtrado, kpis, user_question)
-            
-            # Limpar animação
-            status_placeholder.empty()
-            progress_bar.empty()
+            answer = analyzer.generate_insights(df, df_filtrado, kpis, user_question, progresso=progresso)
+            progresso.limpar()
             
             # Mostrar resultado em container dedicado
             st.markdown("---")
@@ -1319,33 +1323,13 @@ def create_ai_interface(df, df_filtrado, kpis):
         st.write("**Perguntas sugeridas pela IA:**")
         
         if st.button("💡 Gerar Sugestões", type="secondary"):
-            import time
-            
-            # Criar placeholder para animação
-            status_placeholder = st.empty()
-            progress_bar = st.progress(0)
-            
-            # Animação de carregamento para sugestões
-            for i in range(100):
-                if i < 25:
-                    status_placeholder.info("� IA analisando contexto...")
-                elif i < 50:
-                    status_placeholder.info("💡 Gerando perguntas relevantes...")
-                elif i < 75:
-                    status_placeholder.info("🎯 Refinando sugestões...")
-                else:
-                    status_placeholder.info("✨ Preparando lista...")
-                
-                progress_bar.progress(i + 1)
-                time.sleep(0.025)  # 2.5 segundos total
+            progresso = ProgressoIA()
             
             # Gerar sugestões
+            progresso('contexto')
             context = analyzer.prepare_data_context(df, df_filtrado, kpis)
-            suggestions = analyzer.suggest_questions(context)
-            
-            # Limpar animação
-            status_placeholder.empty()
-            progress_bar.empty()
+            suggestions = analyzer.suggest_questions(context, progresso=progresso)
+            progresso.limpar()
             
             # Mostrar resultado em expander organizado
             with st.expander("🎯 **Perguntas Sugeridas pela IA** - Clique para expandir", expanded=True):
@@ -1371,34 +1355,11 @@ def create_ai_interface(df, df_filtrado, kpis):
         st.info("🎯 Esta análise combina todos os gráficos para fornecer insights estratégicos completos")
         
         if st.button("🔍 Analisar Todos os Gráficos", type="primary"):
-            import time
-            
-            # Criar placeholder para animação
-            status_placeholder = st.empty()
-            progress_bar = st.progress(0)
-            
-            # Animação de carregamento específica para análise integrada
-            for i in range(100):
-                if i < 20:
-                    status_placeholder.info("📊 Coletando dados dos gráficos...")
-                elif i < 40:
-                    status_placeholder.info("📈 Analisando evolução temporal...")
-                elif i < 60:
-                    status_placeholder.info("💸 Examinando despesas por categoria...")
-                elif i < 80:
-                    status_placeholder.info("🔍 Identificando padrões e tendências...")
-                else:
-                    status_placeholder.info("🎯 Gerando insights estratégicos...")
-                
-                progress_bar.progress(i + 1)
-                time.sleep(0.025)  # 2.5 segundos total
+            progresso = ProgressoIA()
             
             # Gerar análise integrada
-            integrated_analysis = analyzer.analyze_all_charts(df, df_filtrado, kpis)
-            
-            # Limpar animação
-            status_placeholder.empty()
-            progress_bar.empty()
+            integrated_analysis = analyzer.analyze_all_charts(df, df_filtrado, kpis, progresso=progresso)
+            progresso.limpar()
             
             # Mostrar resultado em seção dedicada
             with st.expander("🎯 **Análise Estratégica Integrada** - Clique para expandir", expanded=True):
@@ -1452,7 +1413,7 @@ def analyze_chart_with_ai(chart_data, chart_type, chart_title):
     """
     Analisa um gráfico específico com IA
     """
-    analyzer = AIAnalyzer()
+    analyzer = obter_ai_analyzer()
     
     if not analyzer.is_available():
         st.error("❌ IA não disponível para análise de gráficos")
@@ -0,0 +1,126 @@
+"""
+Análise em lote de todas as métricas do Chat com IA (fechamento mensal)
+
+Os dados de todas as métricas são preparados em uma passada sobre o DataFrame.
+Métricas cujos dados não mudaram já têm a análise padrão no cache de respostas da
+IA (inclusive a gerada pelo Chat com IA ou pelo pré-carregamento) e são puladas;
+as demais são enviadas ao modelo em paralelo, com concorrência limitada e passando
+pelo limitador de taxa do processo. O resultado é um único relatório em markdown.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from config.settings import AppConfig
+from pages.chat_ia import construir_registro_metricas, preparar_dados_metricas
+from utils.instrumentation import obter_logger, span
+
+log = obter_logger("ai_batch")
+
+
+def analisar_metricas(ia, df, registro=None, concorrencia=None, ao_concluir=None, estatisticas=None):
+    """
+    Gera a análise padrão de todas as métricas e monta o relatório
+
+    Args:
+        ia: AIAnalyzer
+        df: DataFrame já filtrado (o mesmo do Chat com IA, para reaproveitar o cache)
+        registro: Registro de métricas (padrão: construído a partir do df)
+        concorrencia: Chamadas simultâneas ao modelo (padrão: IA_CONFIG["lote_concorrencia"])
+        ao_concluir: Callback opcional ao_concluir(concluidas, total, metric_id), chamado
+            na thread de quem chamou a cada métrica finalizada
+        estatisticas: Tabela de FinancialAnalyzer.get_estatisticas_metricas (opcional)
+
+    Returns:
+        dict com markdown, total, cache, geradas, falhas e segundos
+    """
+    registro = registro if registro is not None else construir_registro_metricas(df)
+    concorrencia = max(1, concorrencia or AppConfig.IA_CONFIG["lote_concorrencia"])
+    inicio = time.perf_counter()
+    analises, situacao, pendentes = {}, {}, []
+    total = len(registro)
+
+    with span(log, "lote_metricas", metricas=total):
+        dados = preparar_dados_metricas(df, registro, estatisticas=estatisticas)
+        for metric_id, metric_data in dados.items():
+            if "erro" in metric_data:
+                analises[metric_id] = f"Dados indisponíveis: {metric_data['erro']}"
+                situacao[metric_id] = "falha"
+                continue
+            em_cache = ia.cached_metric_insights(metric_data, metric_id, df_filtrado=df)
+            if em_cache is None:
+                pendentes.append(metric_id)
+                continue
+            analises[metric_id] = em_cache
+            situacao[metric_id] = "cache"
+        concluidas = total - len(pendentes)
+        if ao_concluir is not None:
+            ao_concluir(concluidas, total, None)
+
+        if pendentes:
+            with ThreadPoolExecutor(max_workers=min(concorrencia, len(pendentes)),
+                                    thread_name_prefix="ia-lote") as executor:
+                futuros = {
+                    executor.submit(ia.generate_metric_insights, dados[metric_id], metric_id, df_filtrado=df): metric_id
+                    for metric_id in pendentes
+                }
+                for futuro in as_completed(futuros):
+                    metric_id = futuros[futuro]
+                    try:
+                        resposta = futuro.result()
+                    except Exception as e:
+                        resposta = f"Erro na análise da métrica: {e}"
+                    # Os métodos do AIAnalyzer devolvem a falha como texto em vez de lançar
+                    analises[metric_id] = resposta
+                    situacao[metric_id] = "falha" if resposta.startswith("Erro") else "gerada"
+                    concluidas += 1
+                    if ao_concluir is not None:
+                        ao_concluir(concluidas, total, metric_id)
+
+    situacoes = list(situacao.values())
+    resultado = {
+        "total": total,
+        "cache": situacoes.count("cache"),
+        "geradas": situacoes.count("gerada"),
+        "falhas": situacoes.count("falha"),
+        "segundos": time.perf_counter() - inicio,
+    }
+    resultado["markdown"] = montar_relatorio(registro, dados, analises, resultado, ia.model_name)
+    log.info("Análise em lote: %d métricas (%d do cache, %d geradas, %d falhas) em %.1fs",
+             total, resultado["cache"], resultado["geradas"], resultado["falhas"], resultado["segundos"])
+    return resultado
+
+
+def _numero(valor):
+    if valor is None:
+        return "N/A"
+    return f"{valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def montar_relatorio(registro, dados, analises, resumo, modelo):
+    """Relatório em markdown: métricas agrupadas por categoria, na ordem do catálogo"""
+    lines = [
+        "# Relatório de Métricas Financeiras (análise em lote)\n",
+        f"_Gerado em {datetime.now().strftime('%d/%m/%Y %H:%M')} • modelo {modelo} • "
+        f"{resumo['total']} métricas: {resumo['geradas']} geradas, {resumo['cache']} do cache, "
+        f"{resumo['falhas']} com falha_\n",
+    ]
+    categoria_atual = None
+    for metric_id, meta in registro.items():
+        if meta["categoria"] != categoria_atual:
+            categoria_atual = meta["categoria"]
+            lines.append(f"## {categoria_atual}\n")
+        lines.append(f"### {meta['nome']}")
+        estatisticas = dados.get(metric_id, {}).get("estatísticas")
+        if estatisticas:
+            variacao = estatisticas.get("variacao_percentual")
+            lines.append(
+                f"**Atual:** {_numero(estatisticas.get('valor_atual'))} | "
+                f"**Anterior:** {_numero(estatisticas.get('valor_anterior'))} | "
+                f"**Variação:** {_numero(variacao) + '%' if variacao is not None else 'N/A'} | "
+                f"**Tendência:** {estatisticas.get('tendência', 'N/A')}\n"
+            )
+        lines.append(analises.get(metric_id, "Análise não disponível."))
+        lines.append("\n---\n")
+    return "\n".join(lines)
@@ -0,0 +1,114 @@
+"""
+Pré-carregamento das respostas padrão da IA em segundo plano
+
+Quando os dados são carregados ou o filtro muda (e, no Chat com IA, quando a métrica
+muda), agenda para o recorte (versão do dataset, filtro, métrica) a análise padrão da
+métrica e as perguntas sugeridas. Recortes que falharam podem ser agendados de novo.
+As respostas vão para o cache persistente da IA (utils.response_cache), então o
+primeiro clique no Chat com IA já encontra a resposta pronta.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_analyzer import obter_ai_analyzer
+from config.settings import AppConfig
+from pages.chat_ia import construir_registro_metricas, preparar_dados_metrica
+from utils import rate_limiter
+from utils.instrumentation import obter_logger, span
+
+log = obter_logger("ai_prefetch")
+
+_executor = ThreadPoolExecutor(
+    max_workers=AppConfig.IA_CONFIG["prefetch_threads"],
+    thread_name_prefix="ia-prefetch"
+)
+_lock = threading.Lock()
+# Recortes já agendados (LRU limitado): chave -> Future
+_agendados = OrderedDict()
+_estatisticas = {"agendados": 0, "concluidos": 0, "falhas": 0, "ignorados": 0}
+
+
+def agendar(analyzer, metric_id=None):
+    """
+    Agenda o pré-carregamento da métrica no recorte do analyzer (no máximo uma vez)
+
+    Args:
+        analyzer: FinancialAnalyzer já filtrado (o mesmo passado às páginas)
+        metric_id: Métrica do Chat com IA; padrão é a primeira do catálogo
+
+    Returns:
+        True se um novo pré-carregamento foi agendado
+    """
+    if not AppConfig.IA_CONFIG["prefetch"] or analyzer.versao is None:
+        return False
+    ia = obter_ai_analyzer()
+    if not ia.is_available():
+        return False
+
+    filtro = analyzer.chave_filtro()
+    # Rerun de um recorte já agendado: sai antes de montar o registro de métricas
+    if metric_id is not None:
+        with _lock:
+            if _ja_agendado((analyzer.versao, filtro, metric_id, ia.model_name)):
+                return False
+
+    df = analyzer.df
+    registro = construir_registro_metricas(df)
+    metric_id = metric_id if metric_id in registro else next(iter(registro), None)
+    if metric_id is None:
+        return False
+
+    chave = (analyzer.versao, filtro, metric_id, ia.model_name)
+    with _lock:
+        if _ja_agendado(chave):
+            return False
+        # Com requisições de usuários aguardando cota, o pré-carregamento não entra na fila
+        if rate_limiter.limitador_gemini.estatisticas()["aguardando"] > 0:
+            _estatisticas["ignorados"] += 1
+            return False
+        _agendados[chave] = _executor.submit(_preencher, chave, ia, df, metric_id, registro,
+                                             analyzer.get_estatisticas_metricas())
+        while len(_agendados) > AppConfig.IA_CONFIG["prefetch_max_chaves"]:
+            _agendados.popitem(last=False)
+        _estatisticas["agendados"] += 1
+    return True
+
+
+def _ja_agendado(chave):
+    """Se o recorte já está agendado, marca-o como recente no LRU (chamar com _lock)"""
+    if chave not in _agendados:
+        return False
+    _agendados.move_to_end(chave)
+    return True
+
+
+def _preencher(chave, ia, df, metric_id, registro, estatisticas):
+    """
+    Executa as chamadas padrão da métrica; as respostas ficam no cache da IA.
+    Em caso de falha a chave sai de _agendados, para ser agendada de novo no próximo rerun.
+    """
+    try:
+        with span(log, "prefetch", metrica=metric_id):
+            metric_data = preparar_dados_metrica(df, metric_id, registro, estatisticas)
+            if "erro" in metric_data:
+                return
+            # Mesmos argumentos usados pelo Chat com IA, para gerar a mesma chave de cache
+            analise = ia.generate_metric_insights(metric_data, metric_id, df_filtrado=df)
+            sugestoes = ia.suggest_questions(metric_data)
+        # Os métodos do AIAnalyzer devolvem a falha como texto em vez de lançar
+        falhou = analise.startswith("Erro") or any(s.startswith("Erro") for s in sugestoes)
+    except Exception as e:
+        falhou = True
+        log.warning("⚠️ Falha no pré-carregamento da métrica %s: %s", metric_id, e)
+    with _lock:
+        _estatisticas["falhas" if falhou else "concluidos"] += 1
+        if falhou:
+            _agendados.pop(chave, None)
+
+
+def estatisticas():
+    """Contadores do pré-carregamento (agendados, concluídos, falhas, ignorados)"""
+    with _lock:
+        return dict(_estatisticas, pendentes=sum(not futuro.done() for futuro in _agendados.values()))
@@ -6,10 +6,16 @@ Restauração completa após corrupção do arquivo.
 
 import streamlit as st
 from config.settings import AppConfig
-from utils.data_loader import carregar_dados
+from utils.data_loader import carregar_dados, ler_dados_financeiros
+from utils.data_cache import versao_dados
 from financial_analyzer import FinancialAnalyzer
 from pages.page_manager import PageManager
-from datetime import datetime
+from utils import profiler
+from utils.instrumentation import obter_logger
+from utils.question_index import indice_perguntas
+import ai_prefetch
+
+log = obter_logger("app")
 
 # --------------------------------------------------
 # Configuração inicial da página
@@ -61,15 +67,24 @@ def _calc_delta(atual, anterior):
 
 
 def criar_sidebar(df, analyzer):
-    """Cria sidebar apenas com filtros, resumo e exportação (sem KPIs)."""
+    """Cria sidebar apenas com filtros, resumo e exportação (sem KPIs).
+
+    Retorna a view do analyzer para a empresa e os anos selecionados e a lista de anos.
+    """
     st.sidebar.title("🏢 Análise Financeira")
 
     if df is None or df.empty:
         st.sidebar.error("❌ Nenhum dado disponível")
-        return df, []
+        return analyzer, []
 
     # Filtros
     with st.sidebar.expander("🎛️ Filtros", expanded=True):
+        # Painel com várias empresas: as páginas trabalham sobre a série da empresa escolhida
+        empresas = analyzer.get_empresas()
+        if len(empresas) > 1:
+            empresa_sel = st.selectbox("Empresa", empresas)
+            analyzer = analyzer.para_empresa(empresa_sel)
+            df = analyzer.df
         anos_disponiveis = sorted(df['Ano'].unique(), reverse=True) if 'Ano' in df.columns else []
         anos_sel = st.multiselect(
             "Anos", anos_disponiveis,
@@ -81,11 +96,9 @@ def criar_sidebar(df, analyzer):
             st.session_state.pop('anos_sel', None)
             st.rerun()
 
-    # Filtragem por ano
-    if anos_sel:
-        df_filtrado = df[df['Ano'].isin(anos_sel)].copy()
-    else:
-        df_filtrado = df.copy()
+    # Filtragem por ano: view memoizada do analyzer (sem copiar nem reprocessar dados)
+    analyzer_filtrado = analyzer.view(anos_sel)
+    df_filtrado = analyzer_filtrado.df
 
     # Resumo filtros
     st.sidebar.markdown("---")
@@ -93,26 +106,83 @@ def criar_sidebar(df, analyzer):
         f"🧾 Registros: {len(df_filtrado)} | Anos: {', '.join(map(str, sorted(df_filtrado['Ano'].unique())))}"
     )
 
-    return df_filtrado, anos_sel
+    return analyzer_filtrado, anos_sel
 
 # --------------------------------------------------
 # Função Principal
 # --------------------------------------------------
 
-def main():
-    # Carregar dados base (uma vez)
-    if 'df_original' not in st.session_state:
+@st.cache_resource(show_spinner="Carregando dados...", max_entries=2)
+def obter_analyzer_compartilhado(versao):
+    """FinancialAnalyzer somente leitura, único por processo e por versão do dataset.
+
+    Todas as sessões recebem a mesma instância; páginas não devem alterar `analyzer.df`.
+    Erros de leitura são propagados: o Streamlit não guarda em cache uma chamada que
+    falhou, e os dados de exemplo nunca ficam presos à versão do CSV real.
+    """
+    with profiler.etapa("carregar_dados"):
+        df = ler_dados_financeiros()
+    if df.empty:
+        raise ValueError("arquivo de dados sem linhas")
+    with profiler.etapa("construir_analyzer"):
+        return FinancialAnalyzer(
+            df,
+            recalcular_indicadores=AppConfig.DATA_CONFIG["recalcular_indicadores"],
+            versao=versao
+        )
+
+
+def obter_analyzer(versao):
+    """Analyzer compartilhado; se a leitura falhar, dados de exemplo só nesta sessão (sem cache)"""
+    if versao != "sem-arquivo":
         try:
-            df = carregar_dados()
-            st.session_state.df_original = df
-            st.session_state.financial_analyzer = FinancialAnalyzer(df.copy())
-            st.session_state.last_update = datetime.now()
+            return obter_analyzer_compartilhado(versao)
         except Exception as e:
-            st.error(f"Erro ao carregar dados: {e}")
-            st.stop()
+            log.warning("⚠️ Falha ao carregar os dados (versão %s): %s", versao, e)
+    with profiler.etapa("carregar_dados"):
+        df = carregar_dados()
+    # Sem dados reais não há versão estável: os caches por versão ficam desabilitados
+    return FinancialAnalyzer(df, recalcular_indicadores=AppConfig.DATA_CONFIG["recalcular_indicadores"])
+
 
-    df = st.session_state.df_original
-    base_analyzer = st.session_state.financial_analyzer
+def _versao_dataset():
+    try:
+        return versao_dados()
+    except OSError:
+        # CSV ausente: carregar_dados usa dados de exemplo
+        return "sem-arquivo"
+
+
+def _painel_desempenho():
+    """Painel de debug com p50/p95 das etapas por página (somente com PROFILER=1)."""
+    with st.sidebar.expander("🩺 Desempenho (debug)"):
+        resumo = profiler.resumo_por_pagina()
+        if resumo.empty:
+            st.caption("Nenhum rerun registrado ainda.")
+        else:
+            st.dataframe(resumo, use_container_width=True, hide_index=True)
+        reuso = indice_perguntas.estatisticas()
+        st.caption(f"♻️ Respostas da IA reaproveitadas: {reuso['acertos']}/{reuso['consultas']} "
+                   f"({reuso['taxa_acerto']:.0%}) • {reuso['perguntas']} perguntas indexadas")
+        if st.button("💾 Exportar traces"):
+            total = profiler.exportar_traces()
+            st.success(f"{total} reruns gravados em {AppConfig.PROFILER_CONFIG['arquivo_traces']}")
+
+
+def main():
+    profiler.iniciar_rerun()
+
+    # Analyzer base compartilhado entre sessões (carregado uma vez por versão do dataset)
+    with profiler.etapa("versao_dados"):
+        versao = _versao_dataset()
+    try:
+        with profiler.etapa("obter_analyzer"):
+            base_analyzer = obter_analyzer(versao)
+    except Exception as e:
+        st.error(f"Erro ao carregar dados: {e}")
+        st.stop()
+    st.session_state.dataset_version = versao
+    df = base_analyzer.df
 
     # Navegação
     st.sidebar.title("🧭 Navegação")
@@ -120,18 +190,25 @@ def main():
     label_selecionada = st.sidebar.radio("Selecione a análise:", list(paginas.keys()))
     page_key = paginas[label_selecionada]
 
-    # Sidebar (retorna df filtrado e anos)
-    df_filtrado, anos_sel = criar_sidebar(df, base_analyzer)
-
-    # Analyzer filtrado (sem perder original) para páginas
-    if 'Ano' in df_filtrado.columns and 0 < len(df_filtrado['Ano'].unique()) < len(df['Ano'].unique()):
-        analyzer_page = FinancialAnalyzer(df_filtrado.copy())
-    else:
-        analyzer_page = base_analyzer
+    # Sidebar (retorna view filtrada do analyzer e anos)
+    with profiler.etapa("criar_sidebar"):
+        analyzer_page, anos_sel = criar_sidebar(df, base_analyzer)
 
     # Renderização
-    manager = PageManager()
-    manager.render_page(page_key, df_filtrado if analyzer_page != base_analyzer else df, analyzer_page)
+    with profiler.etapa("render_page"):
+        manager = PageManager()
+        manager.render_page(page_key, analyzer_page.df, analyzer_page)
+
+    # Respostas padrão da IA pré-carregadas em segundo plano: no Chat com IA para a métrica
+    # selecionada; nas demais páginas só quando os dados ou o filtro mudam
+    recorte = (versao, analyzer_page.chave_filtro())
+    if page_key == "ai_chat" or st.session_state.get("prefetch_recorte") != recorte:
+        st.session_state.prefetch_recorte = recorte
+        with profiler.etapa("prefetch_ia"):
+            ai_prefetch.agendar(analyzer_page, st.session_state.get("selected_metric_id"))
+
+    if profiler.finalizar_rerun(page_key) is not None:
+        _painel_desempenho()
 
 # --------------------------------------------------
 # Execução
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de desempenho do dashboard
+
+Uso:
+    python benchmark.py [linhas]
+"""
+
+import io
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import converter_numeros_br
+from indicator_engine import IndicatorEngine, CONTAS_BASE
+from financial_analyzer import FinancialAnalyzer, estatisticas_colunas
+from utils.prompt_context import serializar
+from utils import prompt_templates
+
+# Colunas no mesmo formato do contab_ia.csv (valores absolutos e índices)
+_COLUNAS_VALORES = [
+    'Ativo Total', 'Imobilizado', 'Passivo Circulante', 'Passivo Não Circulante',
+    'Lucro Líquido', 'Receita Líquida', 'Patrimônio Líquido', 'Estoques'
+]
+_COLUNAS_INDICES = [
+    'Endividamento Geral (EG)', 'Liquidez Corrente (LC) ', 'Liquidez Seca (LS)',
+    'Margem Líquida (ML)', 'Rentabilidade do Patrimônio Líquido (ROE) ', 'Giro do Ativo (GA)'
+]
+
+
+def gerar_dados_br(linhas, seed=42):
+    """
+    Gera DataFrame sintético com números em texto no formato brasileiro
+    """
+    rng = np.random.default_rng(seed)
+    dados = {}
+    for col in _COLUNAS_VALORES:
+        valores = rng.integers(1_000, 5_000_000, size=linhas)
+        dados[col] = [f"{v:,}".replace(',', '.') for v in valores]
+    for col in _COLUNAS_INDICES:
+        valores = rng.random(linhas) * 3
+        dados[col] = [f"{v:.6f}".replace('.', ',') for v in valores]
+    # Algumas células vazias, como no CSV real
+    dados[_COLUNAS_INDICES[-1]][::97] = [''] * len(dados[_COLUNAS_INDICES[-1]][::97])
+    dados['Ano'] = rng.integers(2015, 2025, size=linhas)
+    return pd.DataFrame(dados)
+
+
+def _converter_por_coluna(df):
+    """
+    Implementação anterior de FinancialAnalyzer.prepare_data (uma coluna por vez)
+    """
+    df = df.copy()
+    for col in df.columns[:-1]:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = (df[col].astype(str)
+                       .str.strip()
+                       .str.replace('.', '', regex=False)
+                       .str.replace(',', '.', regex=False)
+                       .replace(['', 'nan', 'NaN', 'None'], '0')
+                       .astype(float))
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    return df
+
+
+def _serializar_recursivo(obj):
+    """
+    Implementação anterior de AIAnalyzer._convert_to_serializable (recursiva, célula a célula)
+    """
+    from datetime import datetime, date
+    if isinstance(obj, pd.DataFrame):
+        return _serializar_recursivo(obj.to_dict('records'))
+    if isinstance(obj, pd.Series):
+        return _serializar_recursivo(obj.to_dict())
+    if obj is None:
+        return None
+    try:
+        if pd.isna(obj):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(obj, pd.Timestamp):
+        return obj.strftime('%d/%m/%Y')
+    if hasattr(obj, 'strftime') and hasattr(obj, 'freq'):
+        return obj.strftime('%m/%Y')
+    if isinstance(obj, np.datetime64):
+        return pd.Timestamp(obj).strftime('%d/%m/%Y')
+    if isinstance(obj, (datetime, date)):
+        return obj.strftime('%d/%m/%Y')
+    if isinstance(obj, (np.integer, np.floating)):
+        return float(obj)
+    if isinstance(obj, dict):
+        return {k: _serializar_recursivo(v) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [_serializar_recursivo(item) for item in obj]
+    elif isinstance(obj, (int, float, str, bool)):
+        return obj
+    elif hasattr(obj, 'to_dict'):
+        return _serializar_recursivo(obj.to_dict())
+    elif hasattr(obj, 'tolist'):
+        return _serializar_recursivo(obj.tolist())
+    else:
+        return str(obj)
+
+
+def _pergunta_financeira_lista(pergunta, visualizacao=False):
+    """
+    Implementação anterior do filtro is_finance_related (lista recriada e percorrida a cada chamada)
+    """
+    finance_keywords = list(prompt_templates.PALAVRAS_FINANCEIRAS)
+    if visualizacao:
+        finance_keywords += list(prompt_templates.PALAVRAS_VISUALIZACAO)
+    question_lower = pergunta.lower()
+    return any(keyword in question_lower for keyword in finance_keywords)
+
+
+def _cronometrar(funcao, *args, repeticoes=3):
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def bench_parser(linhas):
+    """
+    Compara o parser vetorizado com o loop por coluna
+    """
+    print(f"\n🔢 Parser de números BR ({linhas:,} linhas x {len(_COLUNAS_VALORES) + len(_COLUNAS_INDICES)} colunas)")
+    df = gerar_dados_br(linhas)
+
+    t_loop, esperado = _cronometrar(_converter_por_coluna, df)
+    t_vetor, obtido = _cronometrar(converter_numeros_br, df)
+
+    pd.testing.assert_frame_equal(esperado, obtido, check_dtype=False)
+    print(f"   Loop por coluna:     {t_loop * 1000:8.1f} ms")
+    print(f"   Passada única:       {t_vetor * 1000:8.1f} ms")
+    print(f"   ✅ Resultados idênticos | speedup {t_loop / t_vetor:.1f}x")
+
+
+def bench_indicadores(empresas, anos=10, seed=42):
+    """
+    Calcula todos os índices a partir das contas base para um painel empresas × anos
+    """
+    print(f"\n📐 Motor de indicadores ({empresas:,} empresas x {anos} anos)")
+    rng = np.random.default_rng(seed)
+    linhas = empresas * anos
+    df = pd.DataFrame({conta: rng.uniform(1_000, 1_000_000, size=linhas) for conta in CONTAS_BASE})
+    df['Empresa'] = np.repeat(np.arange(empresas), anos)
+    df['Ano'] = np.tile(np.arange(2025 - anos, 2025), empresas)
+
+    engine = IndicatorEngine()
+    t_calc, resultado = _cronometrar(engine.calcular, df)
+    novos = len(resultado.columns) - len(df.columns)
+    print(f"   {novos} índices calculados em {t_calc * 1000:.1f} ms ({linhas:,} linhas)")
+
+
+def bench_tabela(empresas=500, anos=10, seed=42):
+    """
+    Tabela consolidada (variações, CAGR e deltas) para todas as empresas do painel
+    """
+    print(f"\n📋 Tabela de indicadores ({empresas:,} empresas x {anos} anos)")
+    rng = np.random.default_rng(seed)
+    linhas = empresas * anos
+    df = pd.DataFrame({conta: rng.uniform(1_000, 1_000_000, size=linhas) for conta in CONTAS_BASE})
+    df['Empresa'] = np.repeat([f"E{i:05d}" for i in range(empresas)], anos)
+    df['Ano'] = np.tile(np.arange(2025 - anos, 2025), empresas)
+    with redirect_stdout(io.StringIO()):
+        analyzer = FinancialAnalyzer(df)
+
+    for periodos in (2, anos):
+        t_tab, tabela = _cronometrar(analyzer.get_indicadores_tabela, periodos, True)
+        print(f"   {periodos:2d} períodos: {len(tabela):,} linhas x {len(tabela.columns)} colunas em {t_tab * 1000:.1f} ms")
+
+
+def bench_graficos(repeticoes=20):
+    """
+    Tempo de st.plotly_chart por gráfico: figura montada do zero, dict vindo do JSON
+    (revalidado pelo Streamlit) e go.Figure do cache de figuras
+    """
+    import streamlit as st
+    from utils.data_loader import carregar_dados_financeiros
+    from utils.figure_cache import cache_figuras
+
+    analyzer = FinancialAnalyzer(carregar_dados_financeiros(), versao="bench")
+    cache_figuras.limpar()
+
+    def plotar(figura):
+        st.plotly_chart(figura, use_container_width=True)
+
+    print(f"\n📈 st.plotly_chart por gráfico (contab_ia.csv, média de {repeticoes} reruns)")
+    print(f"   {'Gráfico':22s} {'do zero':>9s} {'dict JSON':>10s} {'cache':>8s}")
+    # Fora de `streamlit run` cada elemento avisa que falta o ScriptRunContext
+    logging.disable(logging.WARNING)
+    for grafico, metodo in FinancialAnalyzer.GRAFICOS.items():
+        construtor = getattr(analyzer, metodo)
+        json_figura = construtor().to_json()
+        tempos = [
+            _microssegundos(lambda: plotar(construtor()), repeticoes),
+            _microssegundos(lambda: plotar(json.loads(json_figura)), repeticoes),
+            _microssegundos(lambda: plotar(analyzer.get_figura(grafico)), repeticoes),
+        ]
+        print(f"   {grafico:22s} " + " ".join(f"{t / 1000:7.1f}ms" for t in tempos)
+              + f"  ({tempos[0] / tempos[2]:.1f}x)")
+    logging.disable(logging.NOTSET)
+    print(f"   Cache: {cache_figuras.estatisticas()}")
+
+
+def bench_serializacao(empresas=500, anos=10, seed=42):
+    """
+    Serialização do painel ano x métrica para os prompts: por coluna vs recursiva
+    """
+    print(f"\n🧾 Serialização para prompts ({empresas:,} empresas x {anos} anos)")
+    rng = np.random.default_rng(seed)
+    linhas = empresas * anos
+    df = pd.DataFrame({conta: rng.uniform(1_000, 1_000_000, size=linhas) for conta in CONTAS_BASE})
+    df.iloc[::13, 0] = np.nan
+    df['Empresa'] = np.repeat([f"E{i:05d}" for i in range(empresas)], anos)
+    df['Ano'] = np.tile(np.arange(2025 - anos, 2025), empresas)
+    df['Data'] = pd.to_datetime(df['Ano'].astype(str) + '-12-31')
+
+    t_antigo, antigo = _cronometrar(_serializar_recursivo, df)
+    t_novo, novo = _cronometrar(serializar, df)
+    print(f"   Recursiva: {t_antigo * 1000:.1f} ms")
+    print(f"   Por coluna: {t_novo * 1000:.1f} ms ({t_antigo / t_novo:.1f}x mais rápido)")
+    print(f"   Resultados iguais: {antigo == novo}")
+
+
+def _microssegundos(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def bench_prompts(repeticoes=2000, empresas=20, anos=10, seed=42):
+    """
+    Tempo de montagem do prompt por tipo de chamada (sem chamar o modelo)
+
+    Mede o builder completo (contexto, alertas e template) e, à parte, o template
+    pré-compilado contra a recompilação a cada chamada e o filtro de perguntas
+    financeiras por regex contra a lista de palavras.
+    """
+    os.environ["LLM_BACKEND"] = "fake"
+    from ai_analyzer import AIAnalyzer
+    from pages.chat_ia import construir_registro_metricas, preparar_dados_metrica
+
+    print(f"\n📝 Montagem de prompts ({repeticoes:,} repetições por tipo)")
+    rng = np.random.default_rng(seed)
+    linhas = empresas * anos
+    painel = pd.DataFrame({conta: rng.uniform(1_000, 1_000_000, size=linhas) for conta in CONTAS_BASE})
+    painel['Empresa'] = np.repeat([f"E{i:05d}" for i in range(empresas)], anos)
+    painel['Ano'] = np.tile(np.arange(2025 - anos, 2025), empresas)
+    with redirect_stdout(io.StringIO()):
+        analyzer = FinancialAnalyzer(painel)
+    df = analyzer.df
+    registro = construir_registro_metricas(df)
+    metric_id = next(iter(registro))
+    metric_data = preparar_dados_metrica(df, metric_id, registro)
+
+    ia = AIAnalyzer()
+    # generate_chart_insights monta o prompt internamente: devolve o prompt em vez de chamar o modelo
+    ia._generate = lambda prompt, **_: prompt
+    contexto = {'kpis': {'receita_total': 1.0}, 'executive_alerts': [], 'dados': serializar(df.head(50))}
+    pergunta = "Como evoluiu a margem líquida nos últimos anos?"
+    chamadas = {
+        'insights': lambda: ia._build_insights_prompt(contexto),
+        'pergunta': lambda: ia._build_question_prompt(contexto, pergunta),
+        'metrica': lambda: ia._build_metric_prompt(metric_data, metric_id),
+        'metrica + pergunta': lambda: ia._build_metric_prompt(metric_data, metric_id, custom_question=pergunta),
+        'grafico': lambda: ia.generate_chart_insights(metric_data, metric_id),
+        'grafico + pergunta': lambda: ia.generate_chart_insights(metric_data, metric_id, custom_question=pergunta),
+    }
+    for nome, funcao in chamadas.items():
+        print(f"   {nome:<20} {_microssegundos(funcao, repeticoes):8.1f} µs/chamada")
+
+    template = 'metrica_analise'
+    fixos = dict(prompt_templates.detalhes_nivel(ia.detail_level), nivel=ia.detail_level)
+    valores = dict(nome=metric_id, categoria='N/A', valor_atual=1, valor_anterior=2, tendencia='N/A',
+                   variacao=3, alertas='Nenhum alerta relevante.', dados=json.dumps(metric_data, default=str))
+    t_recompilado = _microssegundos(lambda: prompt_templates.TemplatePrompt(
+        template, prompt_templates.TEMPLATES[template], fixos).renderizar(**valores), repeticoes)
+    t_compilado = _microssegundos(lambda: prompt_templates.renderizar(template, ia.detail_level, **valores), repeticoes)
+    print(f"   Template recompilado: {t_recompilado:6.1f} µs | pré-compilado: {t_compilado:6.1f} µs "
+          f"({t_recompilado / t_compilado:.1f}x)")
+
+    for rotulo, texto in (("com termo financeiro", pergunta), ("sem termo financeiro", "Vai chover amanhã em São Paulo?")):
+        assert _pergunta_financeira_lista(texto) == prompt_templates.pergunta_financeira(texto)
+        t_lista = _microssegundos(lambda: _pergunta_financeira_lista(texto), repeticoes)
+        t_regex = _microssegundos(lambda: prompt_templates.pergunta_financeira(texto), repeticoes)
+        print(f"   Filtro {rotulo}: lista {t_lista:5.2f} µs | regex {t_regex:5.2f} µs")
+
+
+def _vazao(nome, funcao, requisicoes, concorrencia):
+    """Executa funcao(i) para cada requisição com `concorrencia` threads e resume latência/vazão"""
+    def medir(i):
+        # Os métodos do AIAnalyzer devolvem a falha como texto ("Erro ...") em vez de lançar
+        inicio = time.perf_counter()
+        try:
+            texto = funcao(i)
+            falhou = isinstance(texto, str) and re.search(r"(^|\n)Erro ", texto) is not None
+            return time.perf_counter() - inicio, falhou
+        except Exception:
+            return time.perf_counter() - inicio, True
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        resultados = list(executor.map(medir, range(requisicoes)))
+    total = time.perf_counter() - inicio
+    latencias = np.array([duracao for duracao, _ in resultados]) * 1000
+    erros = sum(falhou for _, falhou in resultados)
+    p50, p95 = np.percentile(latencias, [50, 95])
+    print(f"   {nome}: {requisicoes / total:.1f} req/s | p50 {p50:.0f} ms | p95 {p95:.0f} ms | erros {erros}/{requisicoes}")
+
+
+def bench_ia(requisicoes=40, concorrencia=8, empresas=20, anos=10, seed=42):
+    """
+    Vazão dos caminhos de IA com o backend local (LLM_BACKEND=fake), sem rede
+
+    Latência, velocidade e erros do modelo simulado vêm das variáveis LLM_FAKE_*.
+    O limitador de taxa é desativado e as respostas usam um cache temporário, para
+    medir apenas o custo do app (contexto, prompt, serialização) e do modelo simulado.
+    """
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ.setdefault("LLM_FAKE_LATENCIA_MS", "50")
+    os.environ.setdefault("LLM_FAKE_TOKENS_POR_SEGUNDO", "2000")
+    from ai_analyzer import AIAnalyzer
+    from pages.chat_ia import ChatIAPage
+    from utils import rate_limiter
+    from utils.response_cache import cache_respostas
+
+    rate_limiter.limitador_gemini = rate_limiter.LimitadorTaxa(0)
+    cache_respostas.caminho = Path(tempfile.mkdtemp()) / "respostas_ia.sqlite"
+
+    print(f"\n🤖 Vazão da IA com backend fake ({requisicoes} requisições, {concorrencia} simultâneas)")
+    rng = np.random.default_rng(seed)
+    linhas = empresas * anos
+    painel = pd.DataFrame({conta: rng.uniform(1_000, 1_000_000, size=linhas) for conta in CONTAS_BASE})
+    painel['Empresa'] = np.repeat([f"E{i:05d}" for i in range(empresas)], anos)
+    painel['Ano'] = np.tile(np.arange(2025 - anos, 2025), empresas)
+    with redirect_stdout(io.StringIO()):
+        analyzer = FinancialAnalyzer(painel)
+        pagina = ChatIAPage(analyzer.df, analyzer)
+    metricas = list(pagina.metrics_registry)
+
+    def turno_chat(i):
+        # Mesmo caminho do botão "Analisar" do ChatIAPage: dados da métrica + resposta em stream
+        metric_id = metricas[i % len(metricas)]
+        metric_data = pagina._prepare_metric_data(metric_id)
+        return "".join(pagina.ai_analyzer.generate_metric_insights_stream(
+            metric_data, metric_id, df_filtrado=pagina.processed_df,
+            custom_question=f"Como evoluiu o indicador financeiro? ({i})"))
+
+    ia = AIAnalyzer()
+
+    def insights_metrica(i):
+        metric_id = metricas[i % len(metricas)]
+        return ia.generate_metric_insights(pagina._prepare_metric_data(metric_id), metric_id,
+                                    custom_question=f"Qual a tendência da margem? ({i})")
+
+    transacoes = pd.DataFrame({
+        'Data': pd.date_range('2022-01-01', periods=900, freq='D'),
+        'Tipo': rng.choice(['Receita', 'Despesa'], 900),
+        'Categoria': rng.choice([f'Cat{i}' for i in range(30)], 900),
+        'Descrição': [f'Transação {i}' for i in range(900)],
+        'Valor': rng.uniform(10, 1000, 900),
+    })
+
+    def analise_integrada(i):
+        kpis = {'receita_total': float(i), 'despesa_total': 1.0, 'saldo': float(i) - 1}
+        return ia.analyze_all_charts(transacoes, transacoes, kpis)
+
+    _vazao("ChatIAPage (stream)", turno_chat, requisicoes, concorrencia)
+    _vazao("generate_metric_insights", insights_metrica, requisicoes, concorrencia)
+    _vazao("analyze_all_charts (map-reduce)", analise_integrada, max(requisicoes // 4, 1), concorrencia)
+
+    import ai_batch
+    from pages.chat_ia import preparar_dados_metrica, preparar_dados_metricas
+    df = pagina.processed_df
+    t_uma, _ = _cronometrar(lambda: [preparar_dados_metrica(df, m, pagina.metrics_registry) for m in metricas])
+    t_lote, _ = _cronometrar(preparar_dados_metricas, df, pagina.metrics_registry)
+    t_tabela, estatisticas = _cronometrar(estatisticas_colunas, df)
+    t_pronta, _ = _cronometrar(preparar_dados_metricas, df, pagina.metrics_registry, None, estatisticas)
+    print(f"   Dados de {len(metricas)} métricas: uma a uma {t_uma * 1000:.1f} ms | uma passada {t_lote * 1000:.1f} ms "
+          f"| com a tabela de estatísticas pronta {t_pronta * 1000:.1f} ms (tabela: {t_tabela * 1000:.1f} ms)")
+    for rodada in ("frio", "quente"):
+        relatorio = ai_batch.analisar_metricas(ia, df, pagina.metrics_registry, estatisticas=estatisticas)
+        print(f"   Análise em lote ({rodada}): {relatorio['segundos']:.2f} s | {relatorio['geradas']} geradas, "
+              f"{relatorio['cache']} do cache, {relatorio['falhas']} falhas")
+    backends = (ia.backend, pagina.ai_analyzer.backend)
+    if any(backend.erros for backend in backends):
+        erros = sum(backend.erros for backend in backends)
+        chamadas = sum(backend.chamadas for backend in backends)
+        print(f"   Falhas injetadas pelo backend: {erros}/{chamadas} chamadas")
+
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print("=" * 60)
+    print("⏱️ Benchmarks do Dashboard")
+    print("=" * 60)
+    bench_parser(linhas)
+    bench_indicadores(max(linhas // 10, 1))
+    bench_tabela()
+    bench_graficos()
+    bench_serializacao()
+    bench_prompts()
+    bench_ia()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,56 @@ class AppConfig:
     DATA_CONFIG = {
         "csv_file": "contab_ia.csv",
         "separator": ";",
-        "decimal": ","
+        "decimal": ",",
+        "thousands": ".",
+        # True: recalcula todos os índices a partir das contas base (ignora os da planilha)
+        "recalcular_indicadores": False
+    }
+    
+    # Cache em disco dos dados já limpos (compartilhado entre sessões e processos)
+    CACHE_CONFIG = {
+        "diretorio": ".cache",
+        "max_arquivos_dados": 3,
+        # Figuras Plotly montadas, em memória (por processo)
+        "figuras_max_mb": 64,
+        "figuras_max_itens": 512,
+        # Respostas da IA em SQLite (.cache/respostas_ia.sqlite), compartilhadas entre sessões
+        "respostas_ia_ttl_horas": 24,
+        "respostas_ia_max_itens": 2000,
+        "respostas_ia_max_mb": 50
+    }
+    
+    # Cliente do modelo de IA, compartilhado pelo processo (ver obter_ai_analyzer)
+    IA_CONFIG = {
+        # Recria o cliente periodicamente (conexões longas podem ficar obsoletas)
+        "cliente_ttl_horas": 12,
+        # Configurações distintas (modelo, backend, chave) mantidas ao mesmo tempo
+        "max_clientes": 2,
+        # Pré-carrega em segundo plano a análise padrão e as perguntas sugeridas da
+        # métrica selecionada (ai_prefetch.py), direto no cache de respostas
+        "prefetch": True,
+        "prefetch_threads": 1,
+        # Recortes (versão, filtro, métrica) lembrados para não repetir o pré-carregamento
+        "prefetch_max_chaves": 256,
+        # Histórico do Chat com IA (SQLite append-only) e entradas por página
+        "historico_arquivo": ".cache/historico_chat.sqlite",
+        "historico_por_pagina": 10,
+        # Dias até apagar entradas de sessões sem login e entradas ocultas por "Limpar histórico"
+        "historico_retencao_dias": 30,
+        # Reaproveita a resposta de pergunta quase igual (mesma métrica e dados) acima
+        # desta similaridade TF-IDF (0 a 1); perguntas guardadas por escopo
+        "reuso_similaridade_min": 0.85,
+        "reuso_max_por_metrica": 200,
+        # Análise em lote de todas as métricas (ai_batch.py): chamadas simultâneas ao modelo
+        "lote_concorrencia": 4
+    }
+    
+    # Profiler dos reruns (ativado com PROFILER=1 no ambiente)
+    PROFILER_CONFIG = {
+        "max_reruns_por_pagina": 500,
+        "arquivo_traces": ".cache/traces.jsonl",
+        # True: anexa cada rerun ao arquivo; False: apenas pelo botão de exportação
+        "gravar_cada_rerun": False
     }
     
     # Navegação reorganizada para evidenciar o Chat com IA como funcionalidade central
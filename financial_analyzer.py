@@ -9,77 +9,391 @@ import plotly.graph_objects as go
 import plotly.figure_factory as ff
 from plotly.subplots import make_subplots
 import numpy as np
+import logging
+import threading
+from collections import OrderedDict
+from utils.data_loader import preparar_dados_financeiros
+from utils.figure_cache import cache_figuras
+from utils.instrumentation import obter_logger, span
+from indicator_engine import calcular_indicadores, INDICADORES, CONTAS_BASE
+
+log = obter_logger("financial_analyzer")
+
+
+def estatisticas_colunas(df, colunas=None):
+    """
+    Estatísticas de cada coluna numérica em uma única passada vetorizada.
+    
+    Valor atual e anterior são os dois últimos valores válidos (ano e valor preenchidos)
+    na ordem das linhas, que vêm ordenadas por ano.
+    
+    Args:
+        df: Série de uma entidade (uma linha por ano)
+        colunas: Colunas a resumir (padrão: todas as numéricas, exceto 'Ano')
+    
+    Returns:
+        DataFrame indexado pela coluna com registros, ano_atual, valor_atual, ano_anterior,
+        valor_anterior, media, minimo, maximo, variacao_percentual e tendencia
+    """
+    if colunas is None:
+        colunas = [col for col in df.select_dtypes(include='number').columns if col != 'Ano']
+    anos = pd.to_numeric(df['Ano'], errors='coerce').to_numpy(dtype=float)
+    valores = df[colunas].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    if not len(anos):
+        # Sem linhas: uma linha vazia mantém o formato (todas as estatísticas ficam vazias)
+        anos, valores = np.full(1, np.nan), np.full((1, len(colunas)), np.nan)
+    validos = ~np.isnan(valores) & ~np.isnan(anos)[:, None]
+    registros = validos.sum(axis=0)
+    indice = np.arange(len(colunas))
+    
+    # Última linha válida de cada coluna (argmax sobre as linhas invertidas); a penúltima
+    # é a última depois de desmarcar a primeira
+    linha_atual = len(anos) - 1 - np.argmax(validos[::-1], axis=0)
+    sem_atual = validos.copy()
+    sem_atual[linha_atual, indice] = False
+    linha_anterior = len(anos) - 1 - np.argmax(sem_atual[::-1], axis=0)
+    atual = np.where(registros > 0, valores[linha_atual, indice], np.nan)
+    anterior = np.where(registros > 1, valores[linha_anterior, indice], np.nan)
+    ano_atual = np.where(registros > 0, anos[linha_atual], np.nan)
+    ano_anterior = np.where(registros > 1, anos[linha_anterior], np.nan)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.where(validos, valores, 0.0).sum(axis=0) / registros
+        # Base |anterior|, como em get_variacoes_anuais e get_indicadores_tabela
+        variacao = np.where((registros > 1) & (anterior != 0),
+                            np.round((atual - anterior) / np.abs(anterior) * 100, 2), np.nan)
+    minimo = np.where(registros > 0, np.where(validos, valores, np.inf).min(axis=0), np.nan)
+    maximo = np.where(registros > 0, np.where(validos, valores, -np.inf).max(axis=0), np.nan)
+    tendencia = np.where(registros > 1, np.where(atual > anterior, 'crescente', 'decrescente'), 'estável')
+    
+    return pd.DataFrame({
+        'registros': registros,
+        'ano_atual': ano_atual,
+        'valor_atual': atual,
+        'ano_anterior': ano_anterior,
+        'valor_anterior': anterior,
+        'media': media,
+        'minimo': minimo,
+        'maximo': maximo,
+        'variacao_percentual': variacao,
+        'tendencia': tendencia,
+    }, index=pd.Index(colunas, name='coluna'))
+
 
 class FinancialAnalyzer:
-    def __init__(self, df):
+    # Máximo de views filtradas memoizadas por analyzer
+    MAX_VIEWS = 32
+    
+    # Chaves do painel (empresa, ano, período); ausentes no CSV recebem um valor padrão
+    COLUNA_EMPRESA = 'Empresa'
+    COLUNA_PERIODO = 'Periodo'
+    EMPRESA_PADRAO = 'Empresa'
+    PERIODO_PADRAO = 'Anual'
+    
+    # Categoria de cada coluna na tabela consolidada (índices do motor + contas base)
+    CATEGORIAS = {
+        **{conta: 'Performance / Base' for conta in CONTAS_BASE},
+        **{ind['coluna']: ind['categoria'] for ind in INDICADORES},
+    }
+    
+    # Gráficos disponíveis em get_figura: id -> método construtor
+    GRAFICOS = {
+        'rentabilidade': 'create_rentabilidade_chart',
+        'liquidez_radar': 'create_liquidez_radar',
+        'estrutura_capital': 'create_estrutura_capital',
+        'evolucao_patrimonial': 'create_evolucao_patrimonial',
+        'dupont': 'create_analise_dupont',
+        'ciclo_financeiro': 'create_ciclo_financeiro',
+        'heatmap_indicadores': 'create_heatmap_indicadores',
+    }
+    
+    def __init__(self, df, recalcular_indicadores=False, versao=None):
         """
         Inicializa o analisador financeiro com os dados
+        
+        Args:
+            df: DataFrame com contas base e/ou indicadores por 'Ano'. Pode ser um painel
+                com colunas 'Empresa' e/ou 'Periodo' (várias entidades)
+            recalcular_indicadores: Se True, recalcula todos os índices a partir das contas
+                base; caso contrário apenas os índices ausentes são derivados
+            versao: Versão do dataset (ver utils.data_cache.versao_dados); habilita o
+                cache de figuras compartilhado entre sessões
         """
         self.df = df
+        self.recalcular_indicadores = recalcular_indicadores
+        self.versao = versao
+        self._init_views()
         self.prepare_data()
+        
+        # self.dados guarda o painel completo; self.df é a série de uma única entidade,
+        # usada por todos os métodos de empresa única (KPIs, gráficos, tabela)
+        self.dados = self.df
+        self._entidades = self._indexar_entidades(self.dados)
+        self.entidade = next(iter(self._entidades), None)
+        self.df = self._fatiar_entidade(self.entidade)
+    
+    def _init_views(self):
+        self._views = OrderedDict()
+        self._views_lock = threading.Lock()
+        self._painel = None
+        self._estatisticas = None
+    
+    @classmethod
+    def _from_prepared(cls, dados, df, entidade=None, entidades=None, versao=None):
+        """
+        Cria um analyzer sobre dados já preparados, sem executar prepare_data
+        """
+        analyzer = cls.__new__(cls)
+        analyzer.versao = versao
+        analyzer.dados = dados
+        analyzer.df = df
+        analyzer.entidade = entidade
+        analyzer._entidades = entidades if entidades is not None else {}
+        analyzer.recalcular_indicadores = False
+        analyzer._init_views()
+        return analyzer
+    
+    def _chaves_painel(self, df):
+        return [col for col in (self.COLUNA_EMPRESA, self.COLUNA_PERIODO) if col in df.columns]
+    
+    def _indexar_entidades(self, dados):
+        """
+        Mapeia cada entidade (empresa, período) para seu intervalo contíguo de linhas.
+        
+        Os dados preparados vêm ordenados por empresa, período e ano, então cada série
+        é uma fatia [inicio, fim) do painel.
+        """
+        chaves = self._chaves_painel(dados)
+        if not chaves or dados.empty:
+            return {}
+        valores = [dados[col].to_numpy() for col in chaves]
+        mudou = np.zeros(len(dados), dtype=bool)
+        mudou[0] = True
+        for v in valores:
+            mudou[1:] |= v[1:] != v[:-1]
+        inicios = np.flatnonzero(mudou)
+        fins = np.append(inicios[1:], len(dados))
+        entidades = {}
+        for inicio, fim in zip(inicios.tolist(), fins.tolist()):
+            entidade = tuple(v[inicio] for v in valores)
+            entidades[entidade] = (inicio, fim)
+        return entidades
+    
+    def _fatiar_entidade(self, entidade):
+        """
+        Série de uma entidade como fatia do painel, sem as colunas de chave (sem cópia)
+        """
+        if entidade is None:
+            return self.dados
+        inicio, fim = self._entidades[entidade]
+        return self.dados.iloc[inicio:fim].drop(columns=self._chaves_painel(self.dados))
+    
+    def get_empresas(self):
+        """
+        Lista as empresas do painel (vazia para dados de empresa única)
+        """
+        if self.COLUNA_EMPRESA not in self.dados.columns:
+            return []
+        return list(dict.fromkeys(self.dados[self.COLUNA_EMPRESA].tolist()))
+    
+    def get_periodos(self, empresa=None):
+        """
+        Lista os períodos disponíveis (opcionalmente apenas os de uma empresa)
+        """
+        if self.COLUNA_PERIODO not in self.dados.columns:
+            return []
+        if empresa is None or self.COLUNA_EMPRESA not in self.dados.columns:
+            return list(dict.fromkeys(self.dados[self.COLUNA_PERIODO].tolist()))
+        return [entidade[-1] for entidade in self._entidades if entidade[0] == empresa]
+    
+    def para_empresa(self, empresa=None, periodo=None):
+        """
+        Retorna um FinancialAnalyzer com a série de uma empresa/período do painel.
+        
+        O DataFrame é uma fatia do painel (sem cópia) e o resultado é memoizado, então
+        todos os métodos de empresa única funcionam sobre qualquer entidade do portfólio.
+        """
+        if not self._entidades:
+            return self
+        chaves = self._chaves_painel(self.dados)
+        candidatas = [
+            entidade for entidade in self._entidades
+            if (empresa is None or self.COLUNA_EMPRESA not in chaves or entidade[0] == empresa)
+            and (periodo is None or self.COLUNA_PERIODO not in chaves or entidade[-1] == periodo)
+        ]
+        if not candidatas:
+            raise KeyError(f"Entidade não encontrada no painel: empresa={empresa!r}, periodo={periodo!r}")
+        entidade = candidatas[0]
+        if entidade == self.entidade:
+            return self
+        
+        chave = ('entidade', entidade)
+        with self._views_lock:
+            analyzer = self._views.get(chave)
+            if analyzer is not None:
+                self._views.move_to_end(chave)
+                return analyzer
+        
+        analyzer = FinancialAnalyzer._from_prepared(
+            self.dados, self._fatiar_entidade(entidade), entidade, self._entidades, self.versao
+        )
+        self._memoizar_view(chave, analyzer)
+        return analyzer
+    
+    def _memoizar_view(self, chave, view):
+        with self._views_lock:
+            self._views[chave] = view
+            while len(self._views) > self.MAX_VIEWS:
+                self._views.popitem(last=False)
+    
+    @staticmethod
+    def _filtrar_anos(df, anos):
+        posicoes = np.flatnonzero(np.isin(df['Ano'].to_numpy(), list(anos)))
+        if len(posicoes) and posicoes[-1] - posicoes[0] + 1 == len(posicoes):
+            return df.iloc[posicoes[0]:posicoes[-1] + 1]
+        return df.iloc[posicoes]
+    
+    def view(self, anos=None):
+        """
+        Retorna um FinancialAnalyzer restrito aos anos informados, sem reprocessar os dados.
+        
+        As colunas já tipadas são compartilhadas com este analyzer: anos contíguos viram
+        uma fatia do DataFrame (sem cópia). O resultado é memoizado por conjunto de anos,
+        então alternar o filtro não reprocessa nem copia nada. Sem anos, ou com todos
+        os anos disponíveis, retorna o próprio analyzer.
+        """
+        if anos is None or len(anos) == 0:
+            return self
+        chave = frozenset(int(ano) for ano in anos)
+        if chave.issuperset(self.dados['Ano'].to_numpy().tolist()):
+            return self
+        
+        with self._views_lock:
+            view = self._views.get(chave)
+            if view is not None:
+                self._views.move_to_end(chave)
+                return view
+        
+        df_view = self._filtrar_anos(self.df, chave)
+        dados_view = df_view if self.dados is self.df else self._filtrar_anos(self.dados, chave)
+        view = FinancialAnalyzer._from_prepared(
+            dados_view, df_view, self.entidade, self._indexar_entidades(dados_view), self.versao
+        )
+        self._memoizar_view(chave, view)
+        return view
+    
+    def get_figura(self, grafico):
+        """
+        Retorna a go.Figure do gráfico, memoizada por processo (somente leitura).
+        
+        A chave é (versão do dataset, entidade e anos deste analyzer, id do gráfico), então
+        reruns com os mesmos dados e filtros não montam a figura Plotly novamente.
+        Sem versão definida, a figura é sempre gerada.
+        
+        Args:
+            grafico: Id do gráfico (chave de GRAFICOS)
+        """
+        construtor = getattr(self, self.GRAFICOS[grafico])
+        if self.versao is None:
+            return construtor()
+        chave = (self.versao, self.chave_filtro(), grafico)
+        return cache_figuras.obter(chave, construtor)
+    
+    def chave_filtro(self):
+        """Identifica o recorte deste analyzer: (entidade, anos presentes em df)"""
+        anos = tuple(np.unique(self.df['Ano'].to_numpy()).tolist()) if 'Ano' in self.df.columns else ()
+        return (self.entidade, anos)
+    
+    def get_painel(self):
+        """
+        Painel completo indexado por (Empresa, Ano, Periodo).
+        
+        Dados de empresa única viram um painel com uma entidade; chaves ausentes recebem
+        EMPRESA_PADRAO/PERIODO_PADRAO. O índice é montado uma vez por analyzer.
+        """
+        if self._painel is None:
+            painel = self.dados
+            if self.COLUNA_EMPRESA not in painel.columns:
+                painel = painel.assign(**{self.COLUNA_EMPRESA: self.EMPRESA_PADRAO})
+            if self.COLUNA_PERIODO not in painel.columns:
+                painel = painel.assign(**{self.COLUNA_PERIODO: self.PERIODO_PADRAO})
+            self._painel = painel.set_index([self.COLUNA_EMPRESA, 'Ano', self.COLUNA_PERIODO])
+        return self._painel
+    
+    def get_estatisticas_metricas(self):
+        """
+        Estatísticas (atual, anterior, média, mínimo, máximo, variação, tendência) de todas as
+        colunas numéricas da série, calculadas uma vez por analyzer.
+        
+        Como os analyzers são compartilhados por versão do dataset e as views são memoizadas
+        por filtro de anos, a tabela é montada uma vez por versão e recorte.
+        """
+        if self._estatisticas is None:
+            with span(log, "estatisticas_metricas", linhas=len(self.df)):
+                self._estatisticas = estatisticas_colunas(self.df)
+        return self._estatisticas
+    
+    def get_variacoes_anuais(self, colunas=None):
+        """
+        Variações ano a ano de todas as entidades do painel de uma só vez (vetorizado).
+        
+        Cada linha é comparada com o mesmo período do ano imediatamente anterior da mesma
+        empresa; sem esse ano no painel, a variação fica NaN.
+        
+        Args:
+            colunas: Colunas numéricas a comparar (padrão: todas)
+        
+        Returns:
+            DataFrame indexado por (Empresa, Ano, Periodo) com colunas em dois níveis:
+            ('Valor' | 'Anterior' | 'Variação Abs' | 'Variação %', coluna)
+        """
+        painel = self.get_painel()
+        if colunas is None:
+            colunas = painel.select_dtypes(include='number').columns.tolist()
+        valores = painel[colunas]
+        
+        grupos = [self.COLUNA_EMPRESA, self.COLUNA_PERIODO]
+        anterior = valores.groupby(level=grupos, sort=False).shift(1)
+        anos = pd.Series(painel.index.get_level_values('Ano'), index=painel.index)
+        ano_anterior = anos.groupby(level=grupos, sort=False).shift(1)
+        consecutivo = (ano_anterior == anos - 1).to_numpy()
+        anterior.loc[~consecutivo] = np.nan
+        
+        variacao = valores - anterior
+        variacao_pct = variacao / anterior.abs().where(anterior != 0) * 100
+        return pd.concat(
+            {'Valor': valores, 'Anterior': anterior,
+             'Variação Abs': variacao, 'Variação %': variacao_pct},
+            axis=1
+        )
     
     def prepare_data(self):
         """
         Prepara e limpa os dados para análise
         """
-        print("Iniciando preparação dos dados...")
-        print(f"Dados originais - Shape: {self.df.shape}")
-        print(f"Colunas: {self.df.columns.tolist()}")
+        log.info("Iniciando preparação dos dados - shape %s", self.df.shape)
+        log.debug("Colunas: %s", self.df.columns.tolist())
         
-        # Converter valores numéricos brasileiros (1.234.567,89) para formato padrão
-        numeric_columns = self.df.columns[:-1]  # Todas exceto 'Ano'
+        # Converter valores numéricos brasileiros (1.234.567,89), 'Ano' para int e ordenar por
+        # entidade e ano. Dados vindos do cache em disco já estão limpos e passam por aqui sem custo relevante.
+        with span(log, "preparar_dados", linhas=len(self.df)):
+            self.df = preparar_dados_financeiros(self.df)
         
-        for col in numeric_columns:
-            print(f"Processando coluna: {col}")
-            print(f"Tipo atual: {self.df[col].dtype}")
-            print(f"Amostra de valores: {self.df[col].head(3).tolist()}")
-            
-            if self.df[col].dtype == 'object':
-                try:
-                    # Tratar formato brasileiro: remover pontos (separador de milhares) e trocar vírgula por ponto
-                    self.df[col] = (self.df[col].astype(str)
-                                   .str.strip()  # Remove espaços em branco
-                                   .str.replace('.', '', regex=False)  # Remove pontos (separador de milhares)
-                                   .str.replace(',', '.', regex=False)  # Troca vírgula por ponto (decimal)
-                                   .replace(['', 'nan', 'NaN', 'None'], '0')  # Substitui valores vazios por 0
-                                   .astype(float))
-                    print(f"✅ Coluna {col} convertida com sucesso")
-                except (ValueError, TypeError) as e:
-                    print(f"❌ Erro ao converter coluna {col}: {e}")
-                    # Se falhar, tentar conversão direta
-                    self.df[col] = pd.to_numeric(self.df[col], errors='coerce').fillna(0)
-            else:
-                # Se já é numérico, garantir que é float
-                self.df[col] = pd.to_numeric(self.df[col], errors='coerce').fillna(0)
-        
-        # Garantir que Ano seja inteiro
-        try:
-            self.df['Ano'] = self.df['Ano'].astype(int)
-            print(f"✅ Coluna 'Ano' convertida para int")
-        except:
-            # Se falhar, tentar limpeza primeiro
-            self.df['Ano'] = pd.to_numeric(self.df['Ano'], errors='coerce').fillna(2024).astype(int)
-            print(f"⚠️ Coluna 'Ano' convertida com fallback")
-        
-        # Ordenar por ano
-        self.df = self.df.sort_values('Ano')
-        
-        print("✅ Preparação dos dados concluída!")
-        print(f"Dados finais - Shape: {self.df.shape}")
-        print(f"Tipos de dados:")
-        for col in self.df.columns:
-            print(f"  {col}: {self.df[col].dtype}")
-        print("="*50)
+        # Derivar os índices das contas base (motor declarativo, vetorizado)
+        with span(log, "calcular_indicadores", linhas=len(self.df)):
+            self.df = calcular_indicadores(self.df, sobrescrever=self.recalcular_indicadores)
+        
+        log.info("✅ Preparação dos dados concluída - shape %s", self.df.shape)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Tipos de dados: %s", self.df.dtypes.astype(str).value_counts().to_dict())
     
     def get_kpis_principais(self):
         """
         Calcula e retorna os KPIs principais
         """
-        ano_atual = self.df['Ano'].max()
-        ano_anterior = self.df['Ano'].min()
-        
-        dados_atual = self.df[self.df['Ano'] == ano_atual].iloc[0]
-        dados_anterior = self.df[self.df['Ano'] == ano_anterior].iloc[0]
+        # self.df é a série de uma única entidade: uma linha por ano
+        dados_atual = self.df.loc[self.df['Ano'].idxmax()]
+        dados_anterior = self.df.loc[self.df['Ano'].idxmin()]
         
         def calcular_variacao(atual, anterior):
             if anterior != 0:
@@ -524,52 +838,77 @@ class FinancialAnalyzer:
                 'eficiencia': ['Giro do Ativo (GA)', 'Prazo Médio de Renovação dos Estoques (PMRE) ', 'Prazo Médio de Recebimento das Vendas (PMRV) ']
             }
         }
-    def get_indicadores_tabela(self):
-        """Gera tabela consolidada de indicadores com variações ano a ano.
-        Retorna DataFrame com colunas: Indicador, Categoria, Ano Atual, Ano Anterior, Variação Abs, Variação %.
-        Se menos de 2 anos, retorna DataFrame vazio.
+    def get_indicadores_tabela(self, periodos=2, painel=False):
+        """Gera tabela consolidada de indicadores com variações entre os últimos anos.
+        
+        Cálculo colunar: os valores são montados em um cubo (entidade × indicador × ano)
+        e todas as variações saem de operações numpy sobre ele, sem laço por coluna.
+        
+        Args:
+            periodos: Quantidade de anos mais recentes considerados (mínimo 2)
+            painel: Se True, gera a tabela para todas as entidades do painel, com as
+                colunas 'Empresa' e 'Periodo' à esquerda
+        
+        Returns:
+            DataFrame com Indicador, Categoria, Ano Anterior, Ano Atual, Variação Abs,
+            Variação % e CAGR % (do primeiro ao último ano da janela). Com mais de 2
+            períodos, inclui também 'Ano Inicial' e os deltas ano a ano ('Δ 2022→2023').
+            Se menos de 2 anos, retorna DataFrame vazio.
         """
-        import pandas as pd
-        if 'Ano' not in self.df.columns:
+        fonte = self.get_painel() if painel else self.df
+        if 'Ano' not in fonte.columns and 'Ano' not in fonte.index.names:
             return pd.DataFrame()
-        anos = sorted(self.df['Ano'].unique())
+        anos_fonte = fonte.index.get_level_values('Ano') if painel else fonte['Ano']
+        anos = sorted(pd.unique(anos_fonte))[-max(int(periodos), 2):]
         if len(anos) < 2:
             return pd.DataFrame()
-        ano_ant, ano_atual = anos[-2], anos[-1]
-        row_atual = self.df[self.df['Ano'] == ano_atual].iloc[0]
-        row_ant = self.df[self.df['Ano'] == ano_ant].iloc[0]
-        categorias = {
-            'Liquidez Geral (LG)': 'Liquidez', 'Liquidez Corrente (LC) ': 'Liquidez', 'Liquidez Seca (LS)': 'Liquidez', 'Liquidez Imediata (LI)': 'Liquidez',
-            'Rentabilidade do Patrimônio Líquido (ROE) ': 'Rentabilidade', 'Rentabilidade do Ativo (ROA ou ROI)': 'Rentabilidade', 'Margem Líquida (ML)': 'Rentabilidade', 'Giro do Ativo (GA)': 'Rentabilidade', 'Multiplicador de Alavancagem Financeira (MAF)': 'Rentabilidade', 'Análise do ROI (Método DuPont) ': 'Rentabilidade',
-            'Endividamento Geral (EG)': 'Estrutura/Endividamento', 'Participação de Capitais de Terceiros (PCT) – Grau de Endividamento': 'Estrutura/Endividamento', 'Composição do Endividamento (CE)': 'Estrutura/Endividamento', 'Grau de Imobilização do Patrimônio Líquido (ImPL)': 'Estrutura/Endividamento', 'Grau de Imobilização dos Recursos não Correntes (IRNC) ': 'Estrutura/Endividamento',
-            'Prazo Médio de Renovação dos Estoques (PMRE) ': 'Ciclo Operacional', 'Prazo Médio de Recebimento das Vendas (PMRV) ': 'Ciclo Operacional', 'Prazo Médio de Pagamento das Compras (PMPC) ': 'Ciclo Operacional', 'Ciclo Operacional e Ciclo Financeiro': 'Ciclo Operacional',
-            'Alavancagem Financeira (GAF)': 'Alavancagem', 'Alavancagem Operacional (GAO)': 'Alavancagem', 'Alavancagem Total (GAT) - Cálculo Possível': 'Alavancagem',
-            'Ativo Total': 'Performance / Base', 'Imobilizado': 'Performance / Base', 'Passivo Circulante': 'Performance / Base', 'Passivo Não Circulante': 'Performance / Base', 'Patrimônio Líquido': 'Performance / Base', 'Receita Líquida': 'Performance / Base', 'Lucro Líquido': 'Performance / Base', 'Lucro Operacional': 'Performance / Base', 'Lucro Antes dos Impostos': 'Performance / Base', 'Custo dos Produtos Vendidos (CPV)': 'Performance / Base', 'Caixa e Equivalentes de Caixa': 'Performance / Base', 'Estoques': 'Performance / Base', 'Contas a Receber (Circulante)': 'Performance / Base', 'Fornecedores': 'Performance / Base', 'Realizável a Longo Prazo': 'Performance / Base'
-        }
-        registros = []
-        for col in self.df.columns:
-            if col == 'Ano':
-                continue
-            try:
-                v_at = float(row_atual[col])
-                v_an = float(row_ant[col])
-                var_abs = v_at - v_an
-                var_pct = (var_abs / v_an * 100) if v_an not in (0, None) else None
-                registros.append({
-                    'Indicador': col,
-                    'Categoria': categorias.get(col, 'Outros'),
-                    'Ano Anterior': v_an,
-                    'Ano Atual': v_at,
-                    'Variação Abs': var_abs,
-                    'Variação %': var_pct
-                })
-            except Exception:
-                continue
-        df_out = pd.DataFrame(registros)
-        if df_out.empty:
-            return df_out
-        # Ordenação: categoria depois indicador
-        return df_out.sort_values(['Categoria', 'Indicador']).reset_index(drop=True)
+        colunas = [col for col in fonte.select_dtypes(include='number').columns
+                   if col not in ('Ano', self.COLUNA_EMPRESA, self.COLUNA_PERIODO)]
+        
+        if painel:
+            janela = fonte.loc[anos_fonte.isin(anos), colunas].unstack('Ano')
+            janela = janela.reindex(columns=pd.MultiIndex.from_product([colunas, anos]))
+            entidades = janela.index
+        else:
+            # self.df é a série de uma entidade: uma linha por ano
+            janela = fonte.set_index('Ano').reindex(anos)[colunas].T
+            entidades = None
+        cubo = janela.to_numpy(dtype=float).reshape(-1, len(colunas), len(anos))
+        
+        inicial, anterior, atual = cubo[..., 0], cubo[..., -2], cubo[..., -1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var_abs = atual - anterior
+            # Mesma base de get_variacoes_anuais: |anterior|, para o sinal seguir o da variação
+            var_pct = np.where(anterior != 0, var_abs / np.abs(anterior) * 100, np.nan)
+            n_anos = anos[-1] - anos[0]
+            positivos = (inicial > 0) & (atual > 0)
+            cagr = np.where(positivos, ((atual / inicial) ** (1 / n_anos) - 1) * 100, np.nan)
+        
+        n_entidades = cubo.shape[0]
+        tabela = {}
+        if entidades is not None:
+            for nivel in entidades.names:
+                tabela[nivel] = np.repeat(entidades.get_level_values(nivel).to_numpy(), len(colunas))
+        categorias = [self.CATEGORIAS.get(col, 'Outros') for col in colunas]
+        tabela['Indicador'] = np.tile(np.array(colunas, dtype=object), n_entidades)
+        tabela['Categoria'] = np.tile(np.array(categorias, dtype=object), n_entidades)
+        if len(anos) > 2:
+            tabela['Ano Inicial'] = inicial.ravel()
+        tabela['Ano Anterior'] = anterior.ravel()
+        tabela['Ano Atual'] = atual.ravel()
+        tabela['Variação Abs'] = var_abs.ravel()
+        tabela['Variação %'] = var_pct.ravel()
+        tabela['CAGR %'] = cagr.ravel()
+        if len(anos) > 2:
+            deltas = np.diff(cubo, axis=2)
+            for i in range(len(anos) - 1):
+                tabela[f'Δ {anos[i]}→{anos[i + 1]}'] = deltas[..., i].ravel()
+        
+        df_out = pd.DataFrame(tabela)
+        # Ordenação: entidade, categoria e depois indicador
+        ordem = list(entidades.names) if entidades is not None else []
+        return df_out.sort_values(ordem + ['Categoria', 'Indicador'], kind='stable').reset_index(drop=True)
+    
     # ---- LEGACY WRAPPERS (Backward Compatibility) ----
     # Alguns trechos antigos/fallback ainda chamam métodos removidos. 
     # Mantemos aliases para evitar quebras até completa remoção do código legado.
@@ -0,0 +1,224 @@
+"""
+Motor de Indicadores Financeiros
+Define cada índice como fórmula sobre as contas base e calcula todos de uma vez,
+com operações vetorizadas por coluna sobre N empresas × M períodos.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Contas base (balanço + DRE) a partir das quais os índices são derivados
+CONTAS_BASE = [
+    'Ativo Total', 'Ativo Circulante', 'Imobilizado', 'Realizável a Longo Prazo',
+    'Caixa e Equivalentes de Caixa', 'Estoques', 'Contas a Receber (Circulante)',
+    'Passivo Circulante', 'Passivo Não Circulante', 'Fornecedores', 'Patrimônio Líquido',
+    'Receita Líquida', 'Custo dos Produtos Vendidos (CPV)', 'Lucro Operacional',
+    'Lucro Antes dos Impostos', 'Lucro Líquido'
+]
+
+# Colunas que identificam a série; o período anterior é buscado dentro de cada uma.
+# Com 'Periodo' (ex.: T1..T4) a comparação é com o mesmo período do ano anterior.
+CHAVES_ENTIDADE = ['Empresa', 'Periodo']
+
+DIAS_ANO = 360
+
+
+def _dividir(numerador, denominador):
+    """Divisão vetorizada que devolve NaN (e não inf) quando o denominador é zero"""
+    return numerador / denominador.where(denominador != 0)
+
+
+class Contas:
+    """
+    Acesso às contas base (e aos índices já calculados) dentro de uma fórmula.
+
+    `c['Conta']` devolve o valor do período; `c.media`, `c.anterior` e `c.variacao`
+    olham o período anterior da mesma entidade, todos como operações de coluna inteira.
+    Só conta como anterior o ano imediatamente anterior: com lacuna na série (2021 → 2023)
+    o período fica sem anterior, como no primeiro ano.
+    """
+
+    def __init__(self, df, chaves):
+        self._df = df
+        self._chaves = [df[c] for c in chaves]
+        self._calculados = {}
+        anos = df['Ano']
+        ano_anterior = anos.groupby(self._chaves, sort=False).shift(1) if self._chaves else anos.shift(1)
+        self._consecutivo = (ano_anterior == anos - 1).to_numpy()
+
+    def __getitem__(self, nome):
+        if nome in self._calculados:
+            return self._calculados[nome]
+        return self._df[nome]
+
+    def __contains__(self, nome):
+        return nome in self._calculados or nome in self._df.columns
+
+    def _registrar(self, nome, serie):
+        self._calculados[nome] = serie
+
+    def anterior(self, nome):
+        """Valor da conta no ano anterior da mesma entidade (NaN no primeiro período ou após lacuna)"""
+        if not self._chaves:
+            anterior = self[nome].shift(1)
+        else:
+            anterior = self[nome].groupby(self._chaves, sort=False).shift(1)
+        return anterior.where(self._consecutivo)
+
+    def media(self, nome):
+        """Média entre o saldo do período e o do anterior; sem anterior usa o próprio saldo"""
+        atual = self[nome]
+        return (atual + self.anterior(nome).fillna(atual)) / 2
+
+    def variacao(self, nome):
+        """Variação relativa da conta frente ao período anterior"""
+        return _dividir(self[nome], self.anterior(nome)) - 1
+
+
+# Definição declarativa dos índices, na ordem de cálculo (um índice pode usar outro já definido)
+INDICADORES = [
+    # === ESTRUTURA / ENDIVIDAMENTO ===
+    {'coluna': 'Endividamento Geral (EG)', 'sigla': 'EG', 'categoria': 'Estrutura/Endividamento',
+     'contas': ['Passivo Circulante', 'Passivo Não Circulante', 'Ativo Total'],
+     'formula': lambda c: _dividir(c['Passivo Circulante'] + c['Passivo Não Circulante'], c['Ativo Total'])},
+    {'coluna': 'Participação de Capitais de Terceiros (PCT) – Grau de Endividamento', 'sigla': 'PCT',
+     'categoria': 'Estrutura/Endividamento',
+     'contas': ['Passivo Circulante', 'Passivo Não Circulante', 'Patrimônio Líquido'],
+     'formula': lambda c: _dividir(c['Passivo Circulante'] + c['Passivo Não Circulante'], c['Patrimônio Líquido'])},
+    {'coluna': 'Composição do Endividamento (CE)', 'sigla': 'CE', 'categoria': 'Estrutura/Endividamento',
+     'contas': ['Passivo Circulante', 'Passivo Não Circulante'],
+     'formula': lambda c: _dividir(c['Passivo Circulante'], c['Passivo Circulante'] + c['Passivo Não Circulante'])},
+    {'coluna': 'Grau de Imobilização do Patrimônio Líquido (ImPL)', 'sigla': 'ImPL',
+     'categoria': 'Estrutura/Endividamento',
+     'contas': ['Imobilizado', 'Patrimônio Líquido'],
+     'formula': lambda c: _dividir(c['Imobilizado'], c['Patrimônio Líquido'])},
+    {'coluna': 'Grau de Imobilização dos Recursos não Correntes (IRNC) ', 'sigla': 'IRNC',
+     'categoria': 'Estrutura/Endividamento',
+     'contas': ['Imobilizado', 'Patrimônio Líquido', 'Passivo Não Circulante'],
+     'formula': lambda c: _dividir(c['Imobilizado'], c['Patrimônio Líquido'] + c['Passivo Não Circulante'])},
+
+    # === LIQUIDEZ ===
+    {'coluna': 'Liquidez Geral (LG)', 'sigla': 'LG', 'categoria': 'Liquidez',
+     'contas': ['Ativo Circulante', 'Realizável a Longo Prazo', 'Passivo Circulante', 'Passivo Não Circulante'],
+     'formula': lambda c: _dividir(c['Ativo Circulante'] + c['Realizável a Longo Prazo'],
+                                   c['Passivo Circulante'] + c['Passivo Não Circulante'])},
+    {'coluna': 'Liquidez Corrente (LC) ', 'sigla': 'LC', 'categoria': 'Liquidez',
+     'contas': ['Ativo Circulante', 'Passivo Circulante'],
+     'formula': lambda c: _dividir(c['Ativo Circulante'], c['Passivo Circulante'])},
+    {'coluna': 'Liquidez Seca (LS)', 'sigla': 'LS', 'categoria': 'Liquidez',
+     'contas': ['Ativo Circulante', 'Estoques', 'Passivo Circulante'],
+     'formula': lambda c: _dividir(c['Ativo Circulante'] - c['Estoques'], c['Passivo Circulante'])},
+    {'coluna': 'Liquidez Imediata (LI)', 'sigla': 'LI', 'categoria': 'Liquidez',
+     'contas': ['Caixa e Equivalentes de Caixa', 'Passivo Circulante'],
+     'formula': lambda c: _dividir(c['Caixa e Equivalentes de Caixa'], c['Passivo Circulante'])},
+
+    # === RENTABILIDADE ===
+    {'coluna': 'Giro do Ativo (GA)', 'sigla': 'GA', 'categoria': 'Rentabilidade',
+     'contas': ['Receita Líquida', 'Ativo Total'],
+     'formula': lambda c: _dividir(c['Receita Líquida'], c.media('Ativo Total'))},
+    {'coluna': 'Margem Líquida (ML)', 'sigla': 'ML', 'categoria': 'Rentabilidade',
+     'contas': ['Lucro Líquido', 'Receita Líquida'],
+     'formula': lambda c: _dividir(c['Lucro Líquido'], c['Receita Líquida'])},
+    {'coluna': 'Rentabilidade do Ativo (ROA ou ROI)', 'sigla': 'ROA', 'categoria': 'Rentabilidade',
+     'contas': ['Lucro Líquido', 'Ativo Total'],
+     'formula': lambda c: _dividir(c['Lucro Líquido'], c['Ativo Total'])},
+    {'coluna': 'Rentabilidade do Patrimônio Líquido (ROE) ', 'sigla': 'ROE', 'categoria': 'Rentabilidade',
+     'contas': ['Lucro Líquido', 'Patrimônio Líquido'],
+     'formula': lambda c: _dividir(c['Lucro Líquido'], c['Patrimônio Líquido'])},
+    {'coluna': 'Multiplicador de Alavancagem Financeira (MAF)', 'sigla': 'MAF', 'categoria': 'Rentabilidade',
+     'contas': ['Ativo Total', 'Patrimônio Líquido'],
+     'formula': lambda c: _dividir(c.media('Ativo Total'), c.media('Patrimônio Líquido'))},
+    {'coluna': 'Análise do ROI (Método DuPont) ', 'sigla': 'DuPont', 'categoria': 'Rentabilidade',
+     'contas': ['Margem Líquida (ML)', 'Giro do Ativo (GA)'],
+     'formula': lambda c: c['Margem Líquida (ML)'] * c['Giro do Ativo (GA)']},
+
+    # === CICLO OPERACIONAL ===
+    {'coluna': 'Prazo Médio de Renovação dos Estoques (PMRE) ', 'sigla': 'PMRE', 'categoria': 'Ciclo Operacional',
+     'contas': ['Estoques', 'Custo dos Produtos Vendidos (CPV)'],
+     'formula': lambda c: _dividir(c.media('Estoques'), c['Custo dos Produtos Vendidos (CPV)']) * DIAS_ANO},
+    {'coluna': 'Prazo Médio de Recebimento das Vendas (PMRV) ', 'sigla': 'PMRV', 'categoria': 'Ciclo Operacional',
+     'contas': ['Contas a Receber (Circulante)', 'Receita Líquida'],
+     'formula': lambda c: _dividir(c.media('Contas a Receber (Circulante)'), c['Receita Líquida']) * DIAS_ANO},
+    {'coluna': 'Prazo Médio de Pagamento das Compras (PMPC) ', 'sigla': 'PMPC', 'categoria': 'Ciclo Operacional',
+     'contas': ['Fornecedores', 'Custo dos Produtos Vendidos (CPV)'],
+     'formula': lambda c: _dividir(c.media('Fornecedores'), c['Custo dos Produtos Vendidos (CPV)']) * DIAS_ANO},
+    {'coluna': 'Ciclo Operacional e Ciclo Financeiro', 'sigla': 'CF', 'categoria': 'Ciclo Operacional',
+     'contas': ['Prazo Médio de Renovação dos Estoques (PMRE) ', 'Prazo Médio de Recebimento das Vendas (PMRV) ',
+                'Prazo Médio de Pagamento das Compras (PMPC) '],
+     'formula': lambda c: (c['Prazo Médio de Renovação dos Estoques (PMRE) ']
+                           + c['Prazo Médio de Recebimento das Vendas (PMRV) ']
+                           - c['Prazo Médio de Pagamento das Compras (PMPC) '])},
+
+    # === ALAVANCAGEM ===
+    {'coluna': 'Alavancagem Financeira (GAF)', 'sigla': 'GAF', 'categoria': 'Alavancagem',
+     'contas': ['Lucro Antes dos Impostos', 'Lucro Operacional'],
+     'formula': lambda c: _dividir(c['Lucro Antes dos Impostos'], c['Lucro Operacional'])},
+    {'coluna': 'Alavancagem Operacional (GAO)', 'sigla': 'GAO', 'categoria': 'Alavancagem',
+     'contas': ['Lucro Operacional', 'Receita Líquida'],
+     'formula': lambda c: _dividir(c.variacao('Lucro Operacional'), c.variacao('Receita Líquida'))},
+    {'coluna': 'Alavancagem Total (GAT) - Cálculo Possível', 'sigla': 'GAT', 'categoria': 'Alavancagem',
+     'contas': ['Alavancagem Operacional (GAO)', 'Alavancagem Financeira (GAF)'],
+     'formula': lambda c: c['Alavancagem Operacional (GAO)'] * c['Alavancagem Financeira (GAF)']},
+]
+
+
+class IndicatorEngine:
+    """
+    Calcula os índices de INDICADORES a partir das contas base de um DataFrame.
+
+    Cada linha é uma entidade (CHAVES_ENTIDADE, se presentes) em um 'Ano'. Todas as
+    fórmulas são aplicadas como operações de coluna inteira, então o custo não depende
+    do número de empresas além do tamanho das colunas.
+    """
+
+    def __init__(self, indicadores=None):
+        self.indicadores = indicadores if indicadores is not None else INDICADORES
+
+    def calculaveis(self, df):
+        """Lista as colunas de índice cujas contas base estão disponíveis em `df`"""
+        disponiveis = set(df.columns)
+        colunas = []
+        for ind in self.indicadores:
+            if all(conta in disponiveis for conta in ind['contas']):
+                colunas.append(ind['coluna'])
+                disponiveis.add(ind['coluna'])
+        return colunas
+
+    def calcular(self, df, sobrescrever=False):
+        """
+        Retorna um novo DataFrame com os índices calculados.
+
+        Args:
+            df: DataFrame com contas base e 'Ano'
+            sobrescrever: Se False (padrão), índices já presentes em `df` são mantidos
+                e só os ausentes são derivados das contas base.
+        """
+        chaves = [c for c in CHAVES_ENTIDADE if c in df.columns]
+        # Ordenação estável por entidade/ano para que "período anterior" seja a linha anterior
+        ordem = np.lexsort([df['Ano'].to_numpy()] + [df[c].to_numpy() for c in reversed(chaves)])
+        ordenado = df.iloc[ordem]
+        contas = Contas(ordenado, chaves)
+
+        novos = {}
+        for ind in self.indicadores:
+            coluna = ind['coluna']
+            existente = coluna in df.columns
+            if existente and not sobrescrever:
+                continue
+            if not all(conta in contas for conta in ind['contas']):
+                continue
+            serie = ind['formula'](contas).astype(float)
+            contas._registrar(coluna, serie)
+            novos[coluna] = serie
+
+        if not novos:
+            return df
+        # Volta para a ordem original das linhas
+        inversa = np.empty_like(ordem)
+        inversa[ordem] = np.arange(len(ordem))
+        return df.assign(**{coluna: serie.to_numpy()[inversa] for coluna, serie in novos.items()})
+
+
+def calcular_indicadores(df, sobrescrever=False):
+    """Atalho para IndicatorEngine().calcular"""
+    return IndicatorEngine().calcular(df, sobrescrever=sobrescrever)
@@ -28,7 +28,6 @@ class AnaliseDupontPage(BasePage):
 
     def _render_main_chart(self):
         try:
-            fig = self.analyzer.create_analise_dupont()
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_chart('dupont')
         except Exception as e:
             self.show_error(f"Erro ao carregar gráfico: {e}")
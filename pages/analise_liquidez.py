@@ -30,8 +30,7 @@ class AnaliseLiquidezPage(BasePage):
 
     def _render_radar_chart(self):
         try:
-            fig = self.analyzer.create_liquidez_radar()
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_chart('liquidez_radar')
         except Exception as e:
             self.show_error(f"Erro ao carregar radar: {e}")
 
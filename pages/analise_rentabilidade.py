@@ -38,8 +38,7 @@ class AnaliseRentabilidadePage(BasePage):
     def _render_main_chart(self):
         """Renderiza o gráfico principal de rentabilidade"""
         try:
-            fig = self.analyzer.create_rentabilidade_chart()
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_chart('rentabilidade')
         except Exception as e:
             self.show_error(f"Erro ao carregar gráfico de rentabilidade: {str(e)}")
     
@@ -28,6 +28,11 @@ class BasePage(ABC):
         """Renderiza informações na sidebar (comum a todas as páginas)"""
         pass  # Seção removida conforme solicitado
     
+    def render_chart(self, grafico):
+        """Exibe um gráfico do analyzer a partir da figura em cache (ver get_figura)"""
+        # go.Figure e não dict: o Streamlit só revalida a figura inteira quando recebe um dict
+        st.plotly_chart(self.analyzer.get_figura(grafico), use_container_width=True)
+    
     def show_loading(self, message="Carregando..."):
         """Exibe indicador de carregamento"""
         return st.spinner(message)
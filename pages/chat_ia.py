@@ -5,8 +5,12 @@ Refatorada: centraliza seleção de gráfico (dropdown + mini preview) e integra
 
 import streamlit as st
 from pages.base_page import BasePage
-from ai_analyzer import AIAnalyzer
-from datetime import datetime
+from ai_analyzer import ProgressoIA, obter_ai_analyzer
+from financial_analyzer import estatisticas_colunas
+from config.settings import AppConfig
+from utils.chat_history import formatar_data, historico_chat
+from utils.prompt_context import serializar
+import uuid
 import pandas as pd  # pode ser útil para checagens
 
 # Métricas disponíveis na base de dados (baseado nas colunas do CSV)
@@ -98,12 +102,202 @@ _METRICAS_FINANCEIRAS = [
     },
 ]
 
+
+def construir_registro_metricas(df):
+    """Métricas do catálogo cujas colunas existem no DataFrame: {id: nome, categoria, coluna, label}"""
+    registry = {}
+    for categoria_info in _METRICAS_FINANCEIRAS:
+        categoria = categoria_info["categoria"]
+        for metrica in categoria_info["metricas"]:
+            metrica_id = metrica["id"]
+            coluna = metrica["coluna"]
+            # Verificar se a coluna existe nos dados processados
+            if coluna in df.columns:
+                registry[metrica_id] = {
+                    "nome": metrica["nome"],
+                    "categoria": categoria,
+                    "coluna": coluna,
+                    "label": f"{categoria} • {metrica['nome']}"
+                }
+    return registry
+
+
+# Contexto de mercado anexado aos dados da métrica, pelo primeiro termo encontrado na categoria
+_CONTEXTO_POR_CATEGORIA = [
+    (("Patrimônio", "Estrutura"), {
+        "tipo": "estrutura_patrimonial",
+        "benchmark_mercado": "Imobilizado representa ativos de longo prazo como máquinas, equipamentos, imóveis",
+        "interpretação": "Valores altos indicam empresa intensiva em capital; baixos indicam operação mais leve"
+    }),
+    (("Rentabilidade",), {
+        "tipo": "rentabilidade",
+        "benchmark_mercado": "ROE > 15% excelente, 10-15% bom, < 10% preocupante",
+        "interpretação": "Valores maiores indicam melhor retorno aos acionistas"
+    }),
+    (("Liquidez",), {
+        "tipo": "liquidez", 
+        "benchmark_mercado": "LC > 1.5 ótima, 1.0-1.5 adequada, < 1.0 risco de liquidez",
+        "interpretação": "Valores maiores indicam maior capacidade de honrar compromissos"
+    }),
+    (("Endividamento",), {
+        "tipo": "endividamento",
+        "benchmark_mercado": "EG < 40% conservador, 40-60% moderado, > 60% alto risco",
+        "interpretação": "Valores menores indicam menor dependência de terceiros"
+    }),
+    (("Ciclos", "Prazo"), {
+        "tipo": "ciclos_prazos",
+        "benchmark_mercado": "Prazos menores geralmente melhores para capital de giro",
+        "interpretação": "Analise conjunto: PMRE + PMRV - PMPC = Ciclo Financeiro"
+    }),
+    (("Alavancagem",), {
+        "tipo": "alavancagem",
+        "benchmark_mercado": "GAF > 1 amplifica ganhos e perdas; quanto maior, maior o risco",
+        "interpretação": "Monitore em períodos de volatilidade de resultados"
+    }),
+]
+_CONTEXTO_OUTROS = {
+    "tipo": "outros",
+    "benchmark_mercado": "Compare com períodos anteriores e concorrentes do setor",
+    "interpretação": "Analise tendências e variações significativas"
+}
+
+
+def _contexto_categoria(categoria):
+    for termos, contexto in _CONTEXTO_POR_CATEGORIA:
+        if any(termo in categoria for termo in termos):
+            return dict(contexto)
+    return dict(_CONTEXTO_OUTROS)
+
+
+def _opcional(valor):
+    return None if pd.isna(valor) else float(valor)
+
+
+def _estatisticas_metrica(linha):
+    """Estatísticas da métrica no prompt, a partir da linha da tabela de estatísticas"""
+    return {
+        "valor_atual": _opcional(linha["valor_atual"]),
+        "valor_anterior": _opcional(linha["valor_anterior"]),
+        "média": float(linha["media"]),
+        "mínimo": float(linha["minimo"]),
+        "máximo": float(linha["maximo"]),
+        "tendência": str(linha["tendencia"]),
+        "variacao_percentual": _opcional(linha["variacao_percentual"]),
+    }
+
+
+def preparar_dados_metricas(df, registro, metric_ids=None, estatisticas=None):
+    """
+    Prepara os dados contextuais de várias métricas em uma passada sobre o DataFrame
+
+    As colunas das métricas são convertidas para número de uma vez e cada métrica
+    recebe apenas as linhas válidas (ano e valor preenchidos).
+
+    Args:
+        metric_ids: Métricas a preparar (padrão: todas do registro)
+        estatisticas: Tabela de FinancialAnalyzer.get_estatisticas_metricas (montada uma
+            vez por versão do dataset); colunas ausentes nela são calculadas na hora
+
+    Returns:
+        {metric_id: dados}; métricas sem dados válidos recebem {"erro": ...}
+    """
+    metric_ids = list(registro) if metric_ids is None else list(metric_ids)
+    resultado = {metric_id: {"erro": "métrica não encontrada"} for metric_id in metric_ids if metric_id not in registro}
+    validas = []
+    for metric_id in metric_ids:
+        if metric_id not in registro:
+            continue
+        coluna = registro[metric_id]["coluna"]
+        # Verifica se a coluna existe
+        if coluna not in df.columns:
+            resultado[metric_id] = {"erro": f"coluna '{coluna}' não encontrada nos dados"}
+        else:
+            validas.append(metric_id)
+    if not validas:
+        return resultado
+    
+    try:
+        colunas = list(dict.fromkeys(registro[metric_id]["coluna"] for metric_id in validas))
+        anos = df['Ano']
+        bloco = df[colunas]
+        # Garante que os valores sejam numéricos (texto inválido vira NaN) em uma única conversão
+        numeros = bloco.apply(pd.to_numeric, errors='coerce')
+        preenchidos = bloco.notna() & anos.notna().to_numpy()[:, None]
+        validos = numeros.notna() & anos.notna().to_numpy()[:, None]
+        tabela = estatisticas
+        faltantes = colunas if tabela is None else [coluna for coluna in colunas if coluna not in tabela.index]
+        if faltantes:
+            extras = estatisticas_colunas(df, faltantes)
+            tabela = extras if tabela is None else pd.concat([tabela, extras])
+        linhas = tabela.loc[colunas].to_dict('index')
+    except Exception as e:
+        return dict(resultado, **{metric_id: {"erro": f"erro ao processar dados: {str(e)}"} for metric_id in validas})
+    
+    for metric_id in validas:
+        meta = registro[metric_id]
+        coluna = meta["coluna"]
+        try:
+            if not preenchidos[coluna].any():
+                resultado[metric_id] = {"erro": f"não há dados válidos para a métrica '{meta['nome']}'"}
+                continue
+            mascara = validos[coluna].to_numpy()
+            if not mascara.any():
+                resultado[metric_id] = {"erro": f"todos os valores da métrica '{meta['nome']}' são inválidos"}
+                continue
+            df_metric = pd.DataFrame({'Ano': anos[mascara], coluna: numeros[coluna][mascara]})
+            
+            # Dados principais
+            resultado[metric_id] = {
+                "métrica": meta["nome"],
+                "categoria": meta["categoria"],  
+                "coluna": coluna,
+                "dados": serializar(df_metric),
+                "estatísticas": _estatisticas_metrica(linhas[coluna]),
+                # Adiciona contexto específico por categoria
+                "contexto": _contexto_categoria(meta["categoria"]),
+            }
+        except Exception as e:
+            resultado[metric_id] = {"erro": f"erro ao processar dados: {str(e)}"}
+    return resultado
+
+
+def preparar_dados_metrica(df, metric_id, registro, estatisticas=None):
+    """Prepara dados contextuais para uma métrica específica"""
+    return preparar_dados_metricas(df, registro, [metric_id], estatisticas)[metric_id]
+
+
+def _usuario_atual():
+    """
+    Usuário do histórico: e-mail do login do Streamlit, se houver. Sem login, cada sessão
+    tem um id próprio, e o histórico não é compartilhado com as demais sessões.
+    """
+    try:
+        email = st.user.get("email")
+    except Exception:
+        email = None
+    if email:
+        return email
+    if "ai_historico_sessao" not in st.session_state:
+        st.session_state.ai_historico_sessao = f"sessao:{uuid.uuid4().hex}"
+    return st.session_state.ai_historico_sessao
+
+
+def _mudar_pagina_historico(pagina):
+    st.session_state.ai_metric_history_page = max(0, pagina)
+
+
+def _usar_pergunta(pergunta):
+    """Callback das perguntas sugeridas: preenche o campo de pergunta"""
+    st.session_state.ai_metric_question = pergunta
+
+
 class ChatIAPage(BasePage):
     """Página de chat com IA contextual a métricas específicas"""
     
     def __init__(self, df, financial_analyzer):
         super().__init__(df, financial_analyzer)
-        self.ai_analyzer = AIAnalyzer()
+        # Cliente do modelo compartilhado pelo processo (não é recriado a cada rerun)
+        self.ai_analyzer = obter_ai_analyzer()
         # Usar o DataFrame já processado do analyzer para garantir dados numéricos
         self.processed_df = self.analyzer.df
         # Inicializa registro de métricas disponíveis
@@ -113,21 +307,7 @@ class ChatIAPage(BasePage):
     # Registro / Preparação de Métricas
     # --------------------------------------------------
     def _build_metrics_registry(self):
-        registry = {}
-        for categoria_info in _METRICAS_FINANCEIRAS:
-            categoria = categoria_info["categoria"]
-            for metrica in categoria_info["metricas"]:
-                metrica_id = metrica["id"]
-                coluna = metrica["coluna"]
-                # Verificar se a coluna existe nos dados processados
-                if coluna in self.processed_df.columns:
-                    registry[metrica_id] = {
-                        "nome": metrica["nome"],
-                        "categoria": categoria,
-                        "coluna": coluna,
-                        "label": f"{categoria} • {metrica['nome']}"
-                    }
-        return registry
+        return construir_registro_metricas(self.processed_df)
     
     def _get_metric_options(self):
         """Retorna lista de opções organizadas por categoria"""
@@ -142,6 +322,11 @@ class ChatIAPage(BasePage):
                 options.extend(categoria_metrics)
         return options
     
+    def _prepare_metric_data(self, metric_id):
+        """Prepara dados contextuais para uma métrica específica"""
+        return preparar_dados_metrica(self.processed_df, metric_id, self.metrics_registry,
+                                      self.analyzer.get_estatisticas_metricas())
+    
     def _resolve_metric_id(self, label):
         """Resolve o ID da métrica pelo label selecionado"""
         for metric_id, meta in self.metrics_registry.items():
@@ -163,6 +348,7 @@ class ChatIAPage(BasePage):
         
         self._render_metric_selector()
         self._render_chat_interface()
+        self._render_relatorio_lote()
         self.render_sidebar_info()
     
     # --------------------------------------------------
@@ -189,114 +375,9 @@ class ChatIAPage(BasePage):
         
         st.markdown("---")
     # --------------------------------------------------
-    # Preparação de Dados para IA (por métrica)
-    # --------------------------------------------------
-    def _prepare_metric_data(self, metric_id):
-        """Prepara dados contextuais para uma métrica específica"""
-        if metric_id not in self.metrics_registry:
-            return {"erro": "métrica não encontrada"}
-        
-        meta = self.metrics_registry[metric_id]
-        coluna = meta["coluna"]
-        
-        # Verifica se a coluna existe
-        if coluna not in self.processed_df.columns:
-            return {"erro": f"coluna '{coluna}' não encontrada nos dados"}
-        
-        # Prepara dados básicos da métrica
-        try:
-            df_metric = self.processed_df[['Ano', coluna]].copy()
-            # Remove valores nulos
-            df_metric = df_metric.dropna()
-            
-            if len(df_metric) == 0:
-                return {"erro": f"não há dados válidos para a métrica '{meta['nome']}'"}
-            
-            # Garante que os valores sejam numéricos
-            try:
-                df_metric[coluna] = pd.to_numeric(df_metric[coluna], errors='coerce')
-                df_metric = df_metric.dropna()  # Remove NaN após conversão
-            except Exception as conv_error:
-                return {"erro": f"erro na conversão dos dados para números: {str(conv_error)}"}
-            
-            if len(df_metric) == 0:
-                return {"erro": f"todos os valores da métrica '{meta['nome']}' são inválidos"}
-            
-            # Dados principais
-            data = {
-                "métrica": meta["nome"],
-                "categoria": meta["categoria"],  
-                "coluna": coluna,
-                "dados": df_metric.to_dict('records'),
-                "estatísticas": {
-                    "valor_atual": float(df_metric[coluna].iloc[-1]) if len(df_metric) > 0 else None,
-                    "valor_anterior": float(df_metric[coluna].iloc[-2]) if len(df_metric) > 1 else None,
-                    "média": float(df_metric[coluna].mean()),
-                    "mínimo": float(df_metric[coluna].min()),
-                    "máximo": float(df_metric[coluna].max()),
-                    "tendência": "crescente" if len(df_metric) > 1 and df_metric[coluna].iloc[-1] > df_metric[coluna].iloc[-2] else "decrescente" if len(df_metric) > 1 else "estável",
-                    "variacao_percentual": round(((df_metric[coluna].iloc[-1] / df_metric[coluna].iloc[-2]) - 1) * 100, 2) if len(df_metric) > 1 and df_metric[coluna].iloc[-2] != 0 else None
-                }
-            }
-            
-            # Adiciona contexto específico por categoria
-            if "Patrimônio" in meta["categoria"] or "Estrutura" in meta["categoria"]:
-                data["contexto"] = {
-                    "tipo": "estrutura_patrimonial",
-                    "benchmark_mercado": "Imobilizado representa ativos de longo prazo como máquinas, equipamentos, imóveis",
-                    "interpretação": "Valores altos indicam empresa intensiva em capital; baixos indicam operação mais leve"
-                }
-            elif "Rentabilidade" in meta["categoria"]:
-                data["contexto"] = {
-                    "tipo": "rentabilidade",
-                    "benchmark_mercado": "ROE > 15% excelente, 10-15% bom, < 10% preocupante",
-                    "interpretação": "Valores maiores indicam melhor retorno aos acionistas"
-                }
-            elif "Liquidez" in meta["categoria"]:
-                data["contexto"] = {
-                    "tipo": "liquidez", 
-                    "benchmark_mercado": "LC > 1.5 ótima, 1.0-1.5 adequada, < 1.0 risco de liquidez",
-                    "interpretação": "Valores maiores indicam maior capacidade de honrar compromissos"
-                }
-            elif "Endividamento" in meta["categoria"]:
-                data["contexto"] = {
-                    "tipo": "endividamento",
-                    "benchmark_mercado": "EG < 40% conservador, 40-60% moderado, > 60% alto risco",
-                    "interpretação": "Valores menores indicam menor dependência de terceiros"
-                }
-            elif "Ciclos" in meta["categoria"] or "Prazo" in meta["categoria"]:
-                data["contexto"] = {
-                    "tipo": "ciclos_prazos",
-                    "benchmark_mercado": "Prazos menores geralmente melhores para capital de giro",
-                    "interpretação": "Analise conjunto: PMRE + PMRV - PMPC = Ciclo Financeiro"
-                }
-            elif "Alavancagem" in meta["categoria"]:
-                data["contexto"] = {
-                    "tipo": "alavancagem",
-                    "benchmark_mercado": "GAF > 1 amplifica ganhos e perdas; quanto maior, maior o risco",
-                    "interpretação": "Monitore em períodos de volatilidade de resultados"
-                }
-            else:
-                data["contexto"] = {
-                    "tipo": "outros",
-                    "benchmark_mercado": "Compare com períodos anteriores e concorrentes do setor",
-                    "interpretação": "Analise tendências e variações significativas"
-                }
-            
-            return data
-            
-        except Exception as e:
-            return {"erro": f"erro ao processar dados: {str(e)}"}
-    
-    # --------------------------------------------------
     # Chat
     # --------------------------------------------------
-    def _init_chat_state(self):
-        if 'ai_metric_chat_history' not in st.session_state:
-            st.session_state.ai_metric_chat_history = []
-    
     def _render_chat_interface(self):
-        self._init_chat_state()
         st.subheader("2️⃣ Pergunte à IA sobre a Métrica")
         metric_id = st.session_state.get('selected_metric_id')
         if not metric_id:
@@ -304,6 +385,8 @@ class ChatIAPage(BasePage):
             return
         
         meta = self.metrics_registry.get(metric_id, {})
+        # Análise padrão e sugestões costumam vir do cache (pré-carregadas em segundo plano)
+        automatica = self._render_atalhos(metric_id)
         placeholder_ex = f"Ex: Como evoluiu {meta.get('nome', 'esta métrica')}? Quais os principais insights? Como está em relação ao benchmark?"
         pergunta = st.text_area(
             "Sua pergunta:",
@@ -314,60 +397,147 @@ class ChatIAPage(BasePage):
         col_a, col_b, col_c = st.columns([1,1,1])
         with col_a:
             analisar = st.button("🚀 Analisar", type="primary")
+        usuario = _usuario_atual()
+        total_usuario = historico_chat.contar(usuario)
         with col_b:
             if st.button("🧹 Limpar Histórico"):
-                st.session_state.ai_metric_chat_history = []
+                historico_chat.limpar(usuario)
+                st.session_state.ai_metric_history_page = 0
                 st.success("Histórico limpo")
                 st.rerun()
         with col_c:
-            st.download_button(
-                "⬇️ Exportar Histórico",
-                data=self._export_history_to_markdown(),
-                file_name="chat_ia_metricas.md",
-                mime="text/markdown",
-                disabled=not st.session_state.ai_metric_chat_history
-            )
+            # O markdown só é montado quando o usuário clica em exportar
+            if st.button("⬇️ Exportar Histórico", disabled=total_usuario == 0):
+                st.download_button(
+                    "💾 Baixar .md",
+                    data=historico_chat.exportar_markdown(usuario),
+                    file_name="chat_ia_metricas.md",
+                    mime="text/markdown"
+                )
         
-        if analisar:
+        if automatica:
+            self._responder(metric_id, meta, None)
+        elif analisar:
             if not pergunta.strip():
                 st.warning("Digite uma pergunta.")
             else:
-                with st.spinner("IA analisando..."):
-                    metric_data = self._prepare_metric_data(metric_id)
-                    resposta = self.ai_analyzer.generate_metric_insights(
-                        metric_data=metric_data,
-                        metric_id=metric_id,
-                        df_filtrado=self.processed_df,
-                        custom_question=pergunta
-                    )
-                    st.session_state.ai_metric_chat_history.append({
-                        "metric_id": metric_id,
-                        "metric_label": meta.get("nome", "Métrica"),
-                        "pergunta": pergunta,
-                        "resposta": resposta,
-                        "ts": datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-                    })
-                    st.success("Análise concluída")
+                self._responder(metric_id, meta, pergunta)
+        
+        # Recontado: a resposta gerada neste rerun já entra no histórico
+        if historico_chat.contar(usuario):
+            self._render_history(usuario, metric_id)
+    
+    def _render_atalhos(self, metric_id):
+        """Botões de análise automática e de perguntas sugeridas; retorna se a análise foi pedida"""
+        col_auto, col_sugestoes = st.columns(2)
+        with col_auto:
+            automatica = st.button("✨ Análise automática")
+        with col_sugestoes:
+            if st.button("💡 Sugerir perguntas"):
+                progresso = ProgressoIA()
+                progresso('contexto')
+                metric_data = self._prepare_metric_data(metric_id)
+                st.session_state.ai_metric_suggestions = {
+                    "metric_id": metric_id,
+                    "perguntas": self.ai_analyzer.suggest_questions(metric_data, progresso=progresso),
+                }
+                progresso.limpar()
         
-        self._render_history()
+        sugestoes = st.session_state.get('ai_metric_suggestions') or {}
+        if sugestoes.get("metric_id") == metric_id:
+            for indice, sugestao in enumerate(sugestoes["perguntas"]):
+                st.button(f"❓ {sugestao}", key=f"ai_metric_suggestion_{indice}",
+                          on_click=_usar_pergunta, args=(sugestao,))
+        return automatica
     
-    def _render_history(self):
-        if not st.session_state.ai_metric_chat_history:
+    def _responder(self, metric_id, meta, pergunta):
+        """Gera a resposta em stream e registra no histórico (pergunta None: análise padrão)"""
+        # Progresso dirigido pelas etapas reais (dados, prompt, requisição, stream)
+        progresso = ProgressoIA()
+        progresso('contexto')
+        metric_data = self._prepare_metric_data(metric_id)
+        # Resposta exibida à medida que a IA gera o texto; o histórico só
+        # recebe a entrada depois que o stream termina
+        area_resposta = st.empty()
+        with area_resposta.container():
+            st.markdown("**Resposta da IA:**")
+            resposta = st.write_stream(self.ai_analyzer.generate_metric_insights_stream(
+                metric_data=metric_data,
+                metric_id=metric_id,
+                df_filtrado=self.processed_df,
+                custom_question=pergunta,
+                progresso=progresso
+            ))
+        area_resposta.empty()
+        progresso.limpar()
+        historico_chat.registrar(
+            _usuario_atual(),
+            metric_id=metric_id,
+            metric_label=meta.get("nome", "Métrica"),
+            pergunta=pergunta or "Análise automática",
+            resposta=resposta
+        )
+        st.session_state.ai_metric_history_page = 0
+        st.success("Análise concluída")
+    
+    def _render_relatorio_lote(self):
+        """Análise de todas as métricas em um único relatório (métricas sem mudança vêm do cache)"""
+        st.markdown("---")
+        st.subheader("3️⃣ Relatório de Todas as Métricas")
+        st.caption("Análise padrão de cada métrica disponível, para o fechamento do período. "
+                   "Métricas cujos dados não mudaram são reaproveitadas do cache.")
+        if st.button("📚 Analisar todas as métricas"):
+            import ai_batch  # importado aqui: ai_batch depende deste módulo
+            barra = st.progress(0, text="📚 Preparando os dados das métricas...")
+            
+            def ao_concluir(concluidas, total, metric_id):
+                nome = self.metrics_registry.get(metric_id, {}).get("nome", "")
+                barra.progress(concluidas / max(total, 1), text=f"📚 {concluidas}/{total} métricas {nome}".rstrip())
+            
+            st.session_state.ai_batch_report = ai_batch.analisar_metricas(
+                self.ai_analyzer, self.processed_df, self.metrics_registry, ao_concluir=ao_concluir,
+                estatisticas=self.analyzer.get_estatisticas_metricas()
+            )
+            barra.empty()
+        
+        relatorio = st.session_state.get('ai_batch_report')
+        if not relatorio:
             return
+        st.success(f"{relatorio['total']} métricas em {relatorio['segundos']:.1f}s: "
+                   f"{relatorio['geradas']} geradas, {relatorio['cache']} do cache, {relatorio['falhas']} com falha")
+        st.download_button(
+            "⬇️ Baixar relatório",
+            data=relatorio["markdown"],
+            file_name="relatorio_metricas.md",
+            mime="text/markdown",
+            key="ai_batch_download"
+        )
+        with st.expander("📄 Ver relatório"):
+            st.markdown(relatorio["markdown"])
+    
+    def _render_history(self, usuario, metric_id):
+        """Histórico paginado: apenas as entradas da página atual são lidas e exibidas"""
+        por_pagina = AppConfig.IA_CONFIG["historico_por_pagina"]
         st.markdown("---")
         st.subheader("💬 Histórico")
-        for item in reversed(st.session_state.ai_metric_chat_history):
-            with st.expander(f"{item['ts']} • {item['metric_label']}"):
+        filtro = metric_id if st.toggle("Somente esta métrica", key="ai_metric_history_filter") else None
+        total = historico_chat.contar(usuario, filtro)
+        paginas = max(1, -(-total // por_pagina))
+        pagina = min(st.session_state.get('ai_metric_history_page', 0), paginas - 1)
+        
+        for item in historico_chat.pagina(usuario, pagina, por_pagina, filtro):
+            with st.expander(f"{formatar_data(item['criado'])} • {item['metric_label']}"):
                 st.markdown(f"**Pergunta:** {item['pergunta']}")
                 st.markdown("**Resposta da IA:**")
                 st.markdown(item['resposta'])
-    
-    def _export_history_to_markdown(self):
-        lines = ["# Histórico Chat IA (Métricas Financeiras)\n"]
-        for item in st.session_state.ai_metric_chat_history:
-            lines.append(f"## {item['ts']} - {item['metric_label']}")
-            lines.append(f"**Pergunta:** {item['pergunta']}")
-            lines.append("**Resposta:**")
-            lines.append(item['resposta'])
-            lines.append("\n---\n")
-        return "\n".join(lines)
+        
+        if paginas > 1:
+            col_ant, col_info, col_prox = st.columns([1, 2, 1])
+            with col_ant:
+                st.button("⬅️ Mais recentes", disabled=pagina == 0,
+                          on_click=_mudar_pagina_historico, args=(pagina - 1,))
+            with col_info:
+                st.caption(f"Página {pagina + 1} de {paginas} • {total} entradas")
+            with col_prox:
+                st.button("Mais antigas ➡️", disabled=pagina >= paginas - 1,
+                          on_click=_mudar_pagina_historico, args=(pagina + 1,))
@@ -29,7 +29,6 @@ class CicloFinanceiroPage(BasePage):
 
     def _render_charts(self):
         try:
-            fig = self.analyzer.create_ciclo_financeiro()
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_chart('ciclo_financeiro')
         except Exception as e:
             self.show_error(f"Erro ao carregar gráficos: {e}")
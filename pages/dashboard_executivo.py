@@ -78,8 +78,9 @@ class DashboardExecutivoPage(BasePage):
             st.error("Dados insuficientes para comparação")
             return
             
-        prev, cur = df.iloc[-2], df.iloc[-1]
-        ano_prev, ano_cur = int(prev['Ano']), int(cur['Ano'])
+        ano_prev, ano_cur = int(df['Ano'].iloc[-2]), int(df['Ano'].iloc[-1])
+        # Atual/anterior de todas as colunas, calculados uma vez por versão do dataset e filtro
+        estatisticas = self.analyzer.get_estatisticas_metricas()
         
         # Definir TODAS as métricas disponíveis organizadas por categoria
         metricas = {
@@ -143,18 +144,20 @@ class DashboardExecutivoPage(BasePage):
             cols = st.columns(cols_per_row)
             for j, (label, col_name) in enumerate(metrics_list[i:i+cols_per_row]):
                 with cols[j]:
-                    self._render_metric_card(label, col_name, prev, cur, ano_prev, ano_cur)
+                    self._render_metric_card(label, col_name, estatisticas, ano_prev, ano_cur)
     
-    def _render_metric_card(self, label, col_name, prev, cur, ano_prev, ano_cur):
+    def _render_metric_card(self, label, col_name, estatisticas, ano_prev, ano_cur):
         """Renderiza um card individual de métrica com estilo customizado"""
         try:
-            val_prev = prev[col_name]
-            val_cur = cur[col_name]
+            linha = estatisticas.loc[col_name]
             
-            # Verificar se os valores são válidos
-            if pd.isna(val_cur) or pd.isna(val_prev):
+            # Verificar se os valores são válidos: os dois últimos válidos devem ser os dos
+            # dois últimos anos (valor ausente em um deles deixa o card como N/A)
+            if linha['ano_atual'] != ano_cur or linha['ano_anterior'] != ano_prev:
                 self._render_na_card(label)
                 return
+            val_prev = linha['valor_anterior']
+            val_cur = linha['valor_atual']
             
             # Calcular variação percentual
             if val_prev != 0 and val_prev is not None:
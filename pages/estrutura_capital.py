@@ -28,7 +28,6 @@ class EstruturaCapitalPage(BasePage):
 
     def _render_main_chart(self):
         try:
-            fig = self.analyzer.create_estrutura_capital()
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_chart('estrutura_capital')
         except Exception as e:
             self.show_error(f"Erro ao carregar gráfico: {e}")
@@ -4,6 +4,7 @@ Página de Indicadores Gerais Consolidada
 
 import streamlit as st
 from pages.base_page import BasePage
+from utils.prompt_context import serializar
 import pandas as pd
 
 class IndicadoresGeraisPage(BasePage):
@@ -14,7 +15,12 @@ class IndicadoresGeraisPage(BasePage):
         st.caption("Visão tabular consolidada de todos os indicadores financeiros e operacionais com variação ano a ano.")
         st.markdown("---")
 
-        tabela = self.analyzer.get_indicadores_tabela()
+        n_anos = self.analyzer.df['Ano'].nunique() if 'Ano' in self.analyzer.df.columns else 0
+        periodos = 2
+        if n_anos > 2:
+            periodos = st.slider("Períodos analisados (anos)", 2, n_anos, 2,
+                                 help="Com mais de 2 anos, a tabela inclui CAGR desde o ano inicial e os deltas ano a ano.")
+        tabela = self.analyzer.get_indicadores_tabela(periodos)
         if tabela.empty:
             st.info("Necessário pelo menos 2 anos para calcular variações.")
             return
@@ -30,7 +36,7 @@ class IndicadoresGeraisPage(BasePage):
             return any(k in ind for k in percent_keywords)
 
         def fmt_val(indicador, v):
-            if v is None:
+            if v is None or pd.isna(v):
                 return '—'
             try:
                 if _is_percent(indicador):
@@ -40,18 +46,20 @@ class IndicadoresGeraisPage(BasePage):
                 return v
 
         # Aplicar formatação
-        df_display['Ano Anterior'] = df_display.apply(lambda r: fmt_val(r['Indicador'], r['Ano Anterior']), axis=1)
-        df_display['Ano Atual'] = df_display.apply(lambda r: fmt_val(r['Indicador'], r['Ano Atual']), axis=1)
-        df_display['Variação Abs'] = df_display.apply(lambda r: fmt_val(r['Indicador'], r['Variação Abs']), axis=1)
-        df_display['Variação %'] = df_display['Variação %'].apply(lambda v: '—' if v is None else f"{v:.1f}%")
+        colunas_valor = [c for c in df_display.columns
+                         if c in ('Ano Inicial', 'Ano Anterior', 'Ano Atual', 'Variação Abs') or c.startswith('Δ ')]
+        for coluna in colunas_valor:
+            df_display[coluna] = df_display.apply(lambda r: fmt_val(r['Indicador'], r[coluna]), axis=1)
+        for coluna in ('Variação %', 'CAGR %'):
+            df_display[coluna] = df_display[coluna].apply(lambda v: '—' if pd.isna(v) else f"{v:.1f}%")
 
         st.subheader("🧮 Tabela Consolidada")
         st.dataframe(df_display, use_container_width=True, hide_index=True)
 
         # Destaques automáticos
         st.markdown("### 🔎 Destaques Automáticos")
-        top_var = tabela.sort_values('Variação %', ascending=False).head(3)
-        worst_var = tabela.sort_values('Variação %', ascending=True).head(3)
+        top_var = tabela.dropna(subset=['Variação %']).sort_values('Variação %', ascending=False).head(3)
+        worst_var = tabela.dropna(subset=['Variação %']).sort_values('Variação %', ascending=True).head(3)
         col1, col2 = st.columns(2)
         with col1:
             st.write("**Maiores Altas (%):**")
@@ -69,7 +77,7 @@ class IndicadoresGeraisPage(BasePage):
             st.write("Gera contexto estruturado para perguntas no Chat com IA.")
             if st.button("📨 Enviar para Chat IA"):
                 # Armazena tabela serializada no session_state
-                st.session_state.ai_indicadores_context = tabela.to_dict('records')
+                st.session_state.ai_indicadores_context = serializar(tabela)
                 st.success("Contexto armazenado. Abra 'Chat com IA' e pergunte usando este conjunto.")
 
         self.render_sidebar_info()
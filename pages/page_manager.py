@@ -5,6 +5,10 @@ Gerenciador central de páginas
 from pages.dashboard_executivo import DashboardExecutivoPage
 from pages.chat_ia import ChatIAPage
 from pages.indicadores import IndicadoresPage
+from utils.instrumentation import obter_logger, span
+from utils import profiler
+
+log = obter_logger("page_manager")
 
 class PageManager:
     """Gerenciador central para todas as páginas"""
@@ -20,27 +24,20 @@ class PageManager:
             "ai_chat": ChatIAPage,
             "indicadores": IndicadoresPage,
         }
-        try:
-            print("[PageManager] Páginas registradas:", list(self.pages.keys()))
-        except Exception:
-            pass
+        log.debug("Páginas registradas: %s", list(self.pages))
     
     def get_page_class(self, page_key):
-        try:
-            print(f"[PageManager] get_page_class chamado para: {page_key}")
-        except Exception:
-            pass
+        log.debug("get_page_class chamado para: %s", page_key)
         return self.pages.get(page_key)
     
     def render_page(self, page_key, df, financial_analyzer):
         page_class = self.get_page_class(page_key)
         if page_class:
-            try:
-                print(f"[PageManager] Renderizando página: {page_key} -> {page_class.__name__}")
-            except Exception:
-                pass
-            page_instance = page_class(df, financial_analyzer)
-            page_instance.render()
+            log.debug("Renderizando página: %s -> %s", page_key, page_class.__name__)
+            with span(log, "render_page", pagina=page_key):
+                page_instance = page_class(df, financial_analyzer)
+                with profiler.etapa(f"{page_key}.render"):
+                    page_instance.render()
         else:
             import streamlit as st
             st.error(f"Página '{page_key}' não encontrada")
@@ -26,7 +26,6 @@ class VisaoGeralPage(BasePage):
 
     def _render_heatmap(self):
         try:
-            fig = self.analyzer.create_heatmap_indicadores()
-            st.plotly_chart(fig, use_container_width=True)
+            self.render_chart('heatmap_indicadores')
         except Exception as e:
             self.show_error(f"Erro ao carregar heatmap: {e}")
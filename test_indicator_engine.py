@@ -0,0 +1,126 @@
+"""
+Testes do motor de indicadores (indicator_engine.py)
+
+Confere as fórmulas contra os índices da planilha (contab_ia.csv) e o tratamento de
+lacunas na série e de denominadores zero.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.settings import AppConfig
+from indicator_engine import INDICADORES, IndicatorEngine, calcular_indicadores
+from utils.data_loader import preparar_dados_financeiros
+
+COLUNA = {ind['sigla']: ind['coluna'] for ind in INDICADORES}
+
+
+@pytest.fixture(scope="module")
+def planilha():
+    """contab_ia.csv limpo (2023 e 2024), sem passar pelo cache em disco"""
+    config = AppConfig.DATA_CONFIG
+    df = pd.read_csv(config["csv_file"], sep=config["separator"],
+                     decimal=config["decimal"], thousands=config["thousands"])
+    return preparar_dados_financeiros(df).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def recalculado(planilha):
+    return calcular_indicadores(planilha, sobrescrever=True)
+
+
+def _serie(df, sigla):
+    return df.set_index('Ano')[COLUNA[sigla]]
+
+
+def test_indices_de_periodo_iguais_a_planilha(planilha, recalculado):
+    """Índices que só usam saldos do próprio ano batem com a planilha nos dois anos"""
+    for sigla in ['EG', 'PCT', 'CE', 'ImPL', 'IRNC', 'LI', 'GAF']:
+        np.testing.assert_allclose(_serie(recalculado, sigla), _serie(planilha, sigla), rtol=1e-3, err_msg=sigla)
+
+
+def test_indices_arredondados_na_planilha(planilha, recalculado):
+    """ML, ROA, ROE e DuPont estão com 2 casas na planilha"""
+    for sigla in ['ML', 'ROA', 'ROE', 'DuPont']:
+        np.testing.assert_allclose(_serie(recalculado, sigla), _serie(planilha, sigla), atol=0.005, err_msg=sigla)
+
+
+def test_saldos_medios_no_segundo_ano(planilha, recalculado):
+    """Giro, MAF e prazos médios usam a média com o saldo do ano anterior"""
+    for sigla in ['GA', 'MAF']:
+        assert _serie(recalculado, sigla)[2024] == pytest.approx(_serie(planilha, sigla)[2024], rel=1e-3), sigla
+    # Prazos em dias, inteiros na planilha
+    for sigla in ['PMRE', 'PMRV']:
+        assert _serie(recalculado, sigla)[2024] == pytest.approx(_serie(planilha, sigla)[2024], abs=0.5), sigla
+
+    contas = planilha.set_index('Ano')
+    media_ativo = (contas.loc[2023, 'Ativo Total'] + contas.loc[2024, 'Ativo Total']) / 2
+    assert _serie(recalculado, 'GA')[2024] == pytest.approx(contas.loc[2024, 'Receita Líquida'] / media_ativo)
+
+
+def test_primeiro_ano_usa_o_proprio_saldo(planilha, recalculado):
+    contas = planilha.set_index('Ano')
+    assert _serie(recalculado, 'GA')[2023] == pytest.approx(
+        contas.loc[2023, 'Receita Líquida'] / contas.loc[2023, 'Ativo Total'])
+
+
+def test_alavancagem_operacional(planilha, recalculado):
+    """GAO/GAT dependem da variação anual: NaN no primeiro ano (a planilha registra 0)"""
+    assert _serie(planilha, 'GAO')[2023] == 0
+    assert np.isnan(_serie(recalculado, 'GAO')[2023])
+    assert np.isnan(_serie(recalculado, 'GAT')[2023])
+    assert _serie(recalculado, 'GAO')[2024] == pytest.approx(_serie(planilha, 'GAO')[2024], abs=0.005)
+    assert _serie(recalculado, 'GAT')[2024] == pytest.approx(_serie(planilha, 'GAT')[2024], rel=1e-3)
+
+
+def _contas(anos, **colunas):
+    base = {'Ano': anos, 'Ativo Total': 100.0, 'Patrimônio Líquido': 50.0, 'Receita Líquida': 200.0,
+            'Lucro Líquido': 10.0, 'Lucro Operacional': 20.0}
+    base.update(colunas)
+    return pd.DataFrame(base)
+
+
+def test_ano_com_lacuna_nao_usa_ano_distante():
+    """2021 → 2023: o 2023 fica sem ano anterior; 2024 usa 2023"""
+    df = _contas([2021, 2023, 2024], **{
+        'Ativo Total': [1000.0, 100.0, 300.0],
+        'Receita Líquida': [100.0, 200.0, 400.0],
+        'Lucro Operacional': [10.0, 20.0, 60.0],
+    })
+    resultado = calcular_indicadores(df, sobrescrever=True).set_index('Ano')
+    assert resultado.loc[2023, COLUNA['GA']] == pytest.approx(200.0 / 100.0)
+    assert resultado.loc[2024, COLUNA['GA']] == pytest.approx(400.0 / 200.0)
+    assert np.isnan(resultado.loc[2023, COLUNA['GAO']])
+    assert resultado.loc[2024, COLUNA['GAO']] == pytest.approx((60 / 20 - 1) / (400 / 200 - 1))
+
+
+def test_lacuna_por_empresa_em_painel():
+    """O ano anterior é buscado só na mesma empresa, mesmo com linhas intercaladas"""
+    df = pd.concat([
+        _contas([2023, 2024], **{'Ativo Total': [100.0, 300.0]}).assign(Empresa='A'),
+        _contas([2022, 2024], **{'Ativo Total': [10.0, 30.0]}).assign(Empresa='B'),
+    ]).sample(frac=1, random_state=0)
+    resultado = calcular_indicadores(df, sobrescrever=True).set_index(['Empresa', 'Ano'])
+    assert resultado.loc[('A', 2024), COLUNA['GA']] == pytest.approx(200.0 / 200.0)
+    assert resultado.loc[('B', 2024), COLUNA['GA']] == pytest.approx(200.0 / 30.0)
+
+
+def test_denominador_zero_vira_nan():
+    df = _contas([2023, 2024], **{
+        'Patrimônio Líquido': [0.0, 50.0],
+        'Receita Líquida': [0.0, 200.0],
+        'Lucro Operacional': [20.0, 40.0],
+    })
+    resultado = calcular_indicadores(df, sobrescrever=True).set_index('Ano')
+    roe = resultado[COLUNA['ROE']]
+    assert np.isnan(roe[2023]) and roe[2024] == pytest.approx(10.0 / 50.0)
+    assert np.isnan(resultado.loc[2023, COLUNA['ML']])
+    # Variação da receita a partir de zero não tem base: GAO NaN, sem inf
+    assert np.isnan(resultado.loc[2024, COLUNA['GAO']])
+    assert not np.isinf(resultado.select_dtypes('number').to_numpy()).any()
+
+
+def test_sem_sobrescrever_mantem_indices_existentes(planilha):
+    resultado = IndicatorEngine().calcular(planilha)
+    pd.testing.assert_series_equal(resultado[COLUNA['PMRE']], planilha[COLUNA['PMRE']])
@@ -0,0 +1,165 @@
+"""
+Histórico do Chat com IA em SQLite local (append-only)
+
+Cada pergunta/resposta vira uma linha que nunca é alterada, indexada por usuário,
+métrica e data. "Limpar histórico" grava um marco por usuário: as consultas só
+enxergam as entradas posteriores ao último marco. As páginas consultam apenas a
+fatia exibida (LIMIT/OFFSET) e a exportação é montada sob demanda. Entradas de
+sessões sem login (usuário "sessao:<id>", inalcançáveis quando a sessão termina) e
+entradas ocultas por uma limpeza são apagadas após o prazo de retenção.
+"""
+
+import sqlite3
+import time
+from datetime import datetime
+
+from config.settings import AppConfig
+from utils.instrumentation import obter_logger
+from utils.sqlite_store import ArmazenamentoSQLite
+
+log = obter_logger("chat_history")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS historico (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario TEXT NOT NULL,
+    metric_id TEXT NOT NULL,
+    metric_label TEXT NOT NULL,
+    pergunta TEXT NOT NULL,
+    resposta TEXT NOT NULL,
+    criado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_historico_usuario_criado ON historico(usuario, criado);
+CREATE INDEX IF NOT EXISTS idx_historico_usuario_metrica_criado ON historico(usuario, metric_id, criado);
+CREATE TABLE IF NOT EXISTS limpezas (
+    usuario TEXT NOT NULL,
+    criado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_limpezas_usuario_criado ON limpezas(usuario, criado);
+"""
+
+# Usuários de sessões sem login (ver pages.chat_ia._usuario_atual); ';' sucede ':' em ASCII,
+# então o intervalo [PREFIXO, FIM) cobre o prefixo e usa o índice por usuário
+_PREFIXO_SESSAO = "sessao:"
+_FIM_SESSAO = "sessao;"
+# Intervalo mínimo entre duas execuções da retenção no mesmo processo
+_INTERVALO_RETENCAO_SEGUNDOS = 3600
+
+_CAMPOS = ("id", "metric_id", "metric_label", "pergunta", "resposta", "criado")
+
+
+def formatar_data(criado):
+    return datetime.fromtimestamp(criado).strftime('%d/%m/%Y %H:%M:%S')
+
+
+class HistoricoChat(ArmazenamentoSQLite):
+    """Histórico de perguntas/respostas por usuário e métrica"""
+
+    def __init__(self, caminho, retencao_dias):
+        super().__init__(caminho, _SCHEMA)
+        self.retencao_segundos = retencao_dias * 86400
+        self._proxima_retencao = 0.0
+
+    @staticmethod
+    def _filtro(usuario, metric_id):
+        """WHERE comum: entradas do usuário após a última limpeza (opcionalmente de uma métrica)"""
+        condicao = ("usuario = ? AND criado > COALESCE("
+                    "(SELECT MAX(criado) FROM limpezas WHERE usuario = ?), 0)")
+        parametros = [usuario, usuario]
+        if metric_id is not None:
+            condicao += " AND metric_id = ?"
+            parametros.append(metric_id)
+        return condicao, parametros
+
+    def registrar(self, usuario, metric_id, metric_label, pergunta, resposta):
+        """Acrescenta uma entrada (e aplica a retenção); retorna False se o histórico estiver indisponível"""
+        agora = time.time()
+        try:
+            with self._conectar() as conexao:
+                conexao.execute(
+                    "INSERT INTO historico (usuario, metric_id, metric_label, pergunta, resposta, criado) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (usuario, metric_id, metric_label, pergunta, resposta, agora)
+                )
+                if agora >= self._proxima_retencao:
+                    self._proxima_retencao = agora + _INTERVALO_RETENCAO_SEGUNDOS
+                    self._despejar(conexao, agora)
+            return True
+        except (sqlite3.Error, OSError) as e:
+            log.warning("⚠️ Não foi possível gravar o histórico do chat: %s", e)
+            return False
+
+    def _despejar(self, conexao, agora):
+        limite = agora - self.retencao_segundos
+        sessoes = conexao.execute(
+            "DELETE FROM historico WHERE usuario >= ? AND usuario < ? AND criado < ?",
+            (_PREFIXO_SESSAO, _FIM_SESSAO, limite)
+        ).rowcount
+        # Entradas ocultas por uma limpeza feita antes do limite; depois disso os marcos
+        # antigos não escondem mais nada e também saem
+        ocultas = conexao.execute(
+            "DELETE FROM historico WHERE criado <= (SELECT MAX(l.criado) FROM limpezas l "
+            "WHERE l.usuario = historico.usuario AND l.criado < ?)",
+            (limite,)
+        ).rowcount
+        conexao.execute("DELETE FROM limpezas WHERE criado < ?", (limite,))
+        if sessoes or ocultas:
+            log.debug("Histórico do chat: %d entradas de sessões e %d ocultas removidas", sessoes, ocultas)
+
+    def limpar(self, usuario):
+        """Oculta as entradas atuais do usuário (apagadas do arquivo após a retenção)"""
+        try:
+            with self._conectar() as conexao:
+                conexao.execute("INSERT INTO limpezas (usuario, criado) VALUES (?, ?)", (usuario, time.time()))
+        except (sqlite3.Error, OSError) as e:
+            log.warning("⚠️ Não foi possível limpar o histórico do chat: %s", e)
+
+    def contar(self, usuario, metric_id=None):
+        condicao, parametros = self._filtro(usuario, metric_id)
+        try:
+            with self._conectar() as conexao:
+                return conexao.execute(f"SELECT COUNT(*) FROM historico WHERE {condicao}", parametros).fetchone()[0]
+        except (sqlite3.Error, OSError):
+            return 0
+
+    def pagina(self, usuario, pagina=0, por_pagina=10, metric_id=None):
+        """Entradas de uma página, da mais recente para a mais antiga"""
+        condicao, parametros = self._filtro(usuario, metric_id)
+        try:
+            with self._conectar() as conexao:
+                linhas = conexao.execute(
+                    f"SELECT {', '.join(_CAMPOS)} FROM historico WHERE {condicao} "
+                    "ORDER BY criado DESC, id DESC LIMIT ? OFFSET ?",
+                    parametros + [por_pagina, pagina * por_pagina]
+                ).fetchall()
+            return [dict(zip(_CAMPOS, linha)) for linha in linhas]
+        except (sqlite3.Error, OSError) as e:
+            log.warning("⚠️ Histórico do chat indisponível: %s", e)
+            return []
+
+    def exportar_markdown(self, usuario, metric_id=None):
+        """Markdown com todo o histórico visível do usuário, em ordem cronológica"""
+        condicao, parametros = self._filtro(usuario, metric_id)
+        lines = ["# Histórico Chat IA (Métricas Financeiras)\n"]
+        try:
+            with self._conectar() as conexao:
+                cursor = conexao.execute(
+                    f"SELECT metric_label, pergunta, resposta, criado FROM historico WHERE {condicao} "
+                    "ORDER BY criado, id",
+                    parametros
+                )
+                for metric_label, pergunta, resposta, criado in cursor:
+                    lines.append(f"## {formatar_data(criado)} - {metric_label}")
+                    lines.append(f"**Pergunta:** {pergunta}")
+                    lines.append("**Resposta:**")
+                    lines.append(resposta)
+                    lines.append("\n---\n")
+        except (sqlite3.Error, OSError) as e:
+            log.warning("⚠️ Não foi possível exportar o histórico do chat: %s", e)
+        return "\n".join(lines)
+
+
+historico_chat = HistoricoChat(
+    AppConfig.IA_CONFIG["historico_arquivo"],
+    retencao_dias=AppConfig.IA_CONFIG["historico_retencao_dias"],
+)
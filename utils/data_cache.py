@@ -0,0 +1,114 @@
+"""
+Cache em disco dos dados financeiros já limpos (formato Arrow IPC / Feather)
+
+A chave é um hash do conteúdo do CSV de origem e de AppConfig.DATA_CONFIG, de modo
+que qualquer alteração no arquivo ou na configuração de leitura invalida o cache.
+Os arquivos são lidos com memory-map, então um cold start não precisa reprocessar o CSV.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from config.settings import AppConfig
+from utils.instrumentation import obter_logger
+
+log = obter_logger("data_cache")
+
+# Incrementar quando a lógica de limpeza mudar, para invalidar caches antigos
+_VERSAO_FORMATO = 2
+_PREFIXO = "dados_"
+
+_hashes_arquivo = {}
+_lock = threading.Lock()
+
+
+def hash_arquivo(caminho):
+    """
+    Retorna o SHA-256 do conteúdo do arquivo (memoizado por tamanho e mtime)
+    """
+    info = os.stat(caminho)
+    assinatura = (os.path.abspath(caminho), info.st_size, info.st_mtime_ns)
+    with _lock:
+        if assinatura in _hashes_arquivo:
+            return _hashes_arquivo[assinatura]
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+            sha.update(bloco)
+    digest = sha.hexdigest()
+    with _lock:
+        _hashes_arquivo[assinatura] = digest
+    return digest
+
+
+def versao_dados():
+    """
+    Identificador da versão do dataset: hash do CSV + configuração de leitura
+    """
+    config = AppConfig.DATA_CONFIG
+    sha = hashlib.sha256()
+    sha.update(hash_arquivo(config["csv_file"]).encode())
+    sha.update(json.dumps(config, sort_keys=True).encode())
+    sha.update(str(_VERSAO_FORMATO).encode())
+    return sha.hexdigest()[:16]
+
+
+def _diretorio_cache():
+    return Path(AppConfig.CACHE_CONFIG["diretorio"])
+
+
+def _caminho_cache(versao):
+    return _diretorio_cache() / f"{_PREFIXO}{versao}.arrow"
+
+
+def ler_cache_dados(versao):
+    """
+    Lê o DataFrame limpo do cache (memory-mapped); retorna None se não existir
+    """
+    caminho = _caminho_cache(versao)
+    if not caminho.exists():
+        return None
+    try:
+        tabela = feather.read_table(caminho, memory_map=True)
+        return tabela.to_pandas(split_blocks=True)
+    except (OSError, pa.ArrowException) as e:
+        log.warning("⚠️ Cache de dados inválido (%s): %s", caminho.name, e)
+        return None
+
+
+def gravar_cache_dados(versao, df):
+    """
+    Grava o DataFrame limpo no cache de forma atômica e remove versões antigas
+    """
+    diretorio = _diretorio_cache()
+    caminho = _caminho_cache(versao)
+    temporario = caminho.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        diretorio.mkdir(parents=True, exist_ok=True)
+        # Sem compressão para permitir leitura via memory-map
+        feather.write_feather(df, temporario, compression="uncompressed")
+        os.replace(temporario, caminho)
+    except (OSError, pa.ArrowException) as e:
+        log.warning("⚠️ Não foi possível gravar cache de dados: %s", e)
+        temporario.unlink(missing_ok=True)
+        return
+    _limpar_versoes_antigas(diretorio)
+
+
+def _limpar_versoes_antigas(diretorio):
+    arquivos = sorted(
+        diretorio.glob(f"{_PREFIXO}*.arrow"),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True
+    )
+    for antigo in arquivos[AppConfig.CACHE_CONFIG["max_arquivos_dados"]:]:
+        try:
+            antigo.unlink()
+        except OSError:
+            pass
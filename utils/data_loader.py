@@ -3,23 +3,106 @@ Módulo para carregar e gerar dados
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
+from pandas.api.types import is_numeric_dtype
 from datetime import datetime, timedelta
 import random
 from config.settings import AppConfig
+from utils.data_cache import versao_dados, ler_cache_dados, gravar_cache_dados
 
-def carregar_dados_financeiros():
+# Colunas que identificam cada linha do painel (empresa, ano, período); nunca são numéricas convertidas
+COLUNAS_IDENTIFICADORAS = ['Empresa', 'Ano', 'Periodo']
+
+def converter_numeros_br(df, colunas=None):
     """
-    Carrega os dados financeiros do arquivo CSV
+    Converte colunas no formato brasileiro (1.234.567,89) para float em uma única passada.
+
+    As células texto de todas as colunas selecionadas são concatenadas em um único
+    array Arrow e limpas com uma só cadeia de kernels vetorizados (sem loop por coluna).
+    Valores vazios ou inválidos viram 0, como no tratamento original por coluna.
+
+    Args:
+        df: DataFrame com os dados brutos
+        colunas: Colunas a converter (padrão: todas exceto as identificadoras)
+
+    Returns:
+        Novo DataFrame com as colunas convertidas (o original não é alterado)
     """
-    try:
-        config = AppConfig.DATA_CONFIG
-        df = pd.read_csv(
-            config["csv_file"], 
-            sep=config["separator"], 
-            decimal=config["decimal"]
+    if colunas is None:
+        colunas = [col for col in df.columns if col not in COLUNAS_IDENTIFICADORAS]
+    texto = [col for col in colunas if not is_numeric_dtype(df[col])]
+    numericas = [col for col in colunas if col not in texto]
+
+    resultado = df.copy(deep=False)
+    if texto:
+        celulas = pa.chunked_array(
+            [pa.array(df[col].astype('string[pyarrow]')).cast(pa.large_string()) for col in texto],
+            type=pa.large_string()
         )
+        celulas = pc.utf8_trim_whitespace(celulas)
+        celulas = pc.replace_substring(celulas, '.', '')   # Remove separador de milhares
+        celulas = pc.replace_substring(celulas, ',', '.')  # Vírgula decimal -> ponto
+        celulas = pc.if_else(pc.equal(celulas, ''), pa.scalar(None, pa.large_string()), celulas)
+        try:
+            valores = pc.cast(celulas, pa.float64()).to_numpy(zero_copy_only=False)
+        except pa.ArrowInvalid:
+            # Alguma célula fora do padrão: converte célula a célula com coerção para NaN
+            valores = pd.to_numeric(celulas.to_pandas(), errors='coerce').to_numpy(dtype=float)
+        # Cada coluna ocupa um bloco contíguo do array concatenado
+        valores = valores.reshape(len(texto), len(df)).T
+        resultado[texto] = pd.DataFrame(valores, index=df.index, columns=texto).fillna(0)
+    if numericas:
+        resultado[numericas] = df[numericas].fillna(0)
+    return resultado
+
+def preparar_dados_financeiros(df):
+    """
+    Limpa os dados financeiros: números brasileiros para float, 'Ano' inteiro e ordenação por ano.
+    
+    Em dados de painel (várias empresas/períodos) a ordenação é por empresa e período e
+    depois por ano, de modo que a série de cada entidade fique contígua.
+    """
+    df = converter_numeros_br(df)
+    try:
+        df['Ano'] = df['Ano'].astype(int)
+    except (ValueError, TypeError):
+        # Se falhar, tentar limpeza primeiro
+        df['Ano'] = pd.to_numeric(df['Ano'], errors='coerce').fillna(2024).astype(int)
+    chaves = [col for col in COLUNAS_IDENTIFICADORAS if col != 'Ano' and col in df.columns] + ['Ano']
+    return df.sort_values(chaves, kind='stable')
+
+def ler_dados_financeiros():
+    """
+    Lê os dados financeiros do arquivo CSV, propagando qualquer erro de leitura.
+
+    O DataFrame já limpo fica em cache colunar em disco, compartilhado entre sessões
+    e processos; o CSV só é lido e convertido de novo quando ele ou a configuração mudam.
+    """
+    config = AppConfig.DATA_CONFIG
+    versao = versao_dados()
+    df = ler_cache_dados(versao)
+    if df is not None:
         return df
+    df = pd.read_csv(
+        config["csv_file"], 
+        sep=config["separator"], 
+        decimal=config["decimal"],
+        thousands=config["thousands"]
+    )
+    # O parser C já trata milhares/decimal; células fora do padrão são convertidas aqui
+    df = preparar_dados_financeiros(df)
+    gravar_cache_dados(versao, df)
+    return df
+
+def carregar_dados_financeiros():
+    """
+    Carrega os dados financeiros do arquivo CSV (ver ler_dados_financeiros).
+    Em caso de erro, exibe a mensagem e retorna dados de exemplo.
+    """
+    try:
+        return ler_dados_financeiros()
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
         # Retorna dados de exemplo se houver erro
@@ -0,0 +1,85 @@
+"""
+Cache em memória das figuras Plotly já montadas (go.Figure)
+
+As figuras são indexadas por (versão do dataset, filtro, id do gráfico). Um rerun do
+Streamlit com os mesmos dados e filtros recebe a go.Figure pronta, sem montar nem
+validar novamente os objetos go.Figure/make_subplots: st.plotly_chart só revalida
+quando recebe um dict, então a figura é guardada como objeto e não como JSON. As
+figuras são compartilhadas entre sessões e não devem ser alteradas por quem as recebe.
+O cache é único por processo, com despejo LRU limitado por quantidade de itens e pelo
+tamanho total das figuras (medido pelo JSON, uma vez, ao gerar).
+"""
+
+import threading
+from collections import OrderedDict
+
+from config.settings import AppConfig
+
+
+class CacheFiguras:
+    """Cache LRU de figuras, limitado por itens e por bytes"""
+
+    def __init__(self, max_bytes, max_itens):
+        self.max_bytes = max_bytes
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obter(self, chave, gerar):
+        """
+        Retorna a figura para a chave, gerando-a com gerar() em caso de miss
+
+        Args:
+            chave: Tupla hashable (versão, filtro, id do gráfico)
+            gerar: Função sem argumentos que retorna a go.Figure
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+
+        # Gera fora do lock: figuras diferentes podem ser montadas em paralelo
+        figura = gerar()
+        tamanho = len(figura.to_json())
+        if tamanho > self.max_bytes:
+            return figura
+
+        with self._lock:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+            self._itens[chave] = (figura, tamanho)
+            self._bytes += tamanho
+            while self._itens and (self._bytes > self.max_bytes or len(self._itens) > self.max_itens):
+                _, (_, removido) = self._itens.popitem(last=False)
+                self._bytes -= removido
+        return figura
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        """Resumo do uso do cache (itens, memória e taxa de acerto)"""
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                'itens': len(self._itens),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'taxa_acerto': self.hits / consultas if consultas else 0.0,
+            }
+
+
+cache_figuras = CacheFiguras(
+    max_bytes=AppConfig.CACHE_CONFIG["figuras_max_mb"] * 1024 * 1024,
+    max_itens=AppConfig.CACHE_CONFIG["figuras_max_itens"],
+)
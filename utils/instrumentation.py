@@ -0,0 +1,78 @@
+"""
+Logging e instrumentação do dashboard
+
+Substitui os print() de diagnóstico por logging com níveis. O nível vem da variável
+de ambiente LOG_LEVEL (padrão WARNING). Spans de tempo (`span`) são emitidos em
+DEBUG; com esse nível desligado, `span` devolve um context manager nulo
+compartilhado e o custo é de uma única checagem de nível.
+"""
+
+import logging
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RAIZ = "contab"
+_FORMATO = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+_SPAN_NULO = nullcontext()
+
+
+def _configurar():
+    raiz = logging.getLogger(RAIZ)
+    if raiz.handlers:
+        return raiz
+    nivel = os.getenv("LOG_LEVEL", "WARNING").upper()
+    raiz.setLevel(getattr(logging, nivel, logging.WARNING))
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(_FORMATO))
+    raiz.addHandler(handler)
+    raiz.propagate = False
+    return raiz
+
+
+_configurar()
+
+
+def obter_logger(nome):
+    """
+    Logger do módulo, filho de 'contab' (ex.: obter_logger('financial_analyzer'))
+    """
+    return logging.getLogger(f"{RAIZ}.{nome}")
+
+
+class _Span:
+    __slots__ = ("logger", "nome", "campos", "inicio")
+
+    def __init__(self, logger, nome, campos):
+        self.logger = logger
+        self.nome = nome
+        self.campos = campos
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traceback):
+        duracao_ms = (time.perf_counter() - self.inicio) * 1000
+        extras = " ".join(f"{chave}={v}" for chave, v in self.campos.items())
+        status = "erro" if tipo is not None else "ok"
+        self.logger.debug("⏱️ %s %.1f ms %s %s", self.nome, duracao_ms, status, extras)
+        return False
+
+
+def span(logger, nome, **campos):
+    """
+    Mede o tempo de um estágio e registra em DEBUG ao final do bloco
+
+    Uso:
+        with span(log, "prepare_data", linhas=len(df)):
+            ...
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return _SPAN_NULO
+    return _Span(logger, nome, campos)
@@ -0,0 +1,176 @@
+"""
+Backends de modelo de linguagem usados pelo AIAnalyzer
+
+O backend é escolhido pela variável LLM_BACKEND:
+- gemini (padrão): Google Gemini via google.generativeai (requer GOOGLE_GEMINI_API_KEY);
+- fake: modelo local determinístico, sem rede, com latência, velocidade de geração e
+  taxa de erros configuráveis (LLM_FAKE_*), para testes de carga e benchmarks.
+"""
+
+import hashlib
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+
+try:
+    import google.generativeai as genai
+except ImportError:  # ambiente sem o SDK (ex.: staging sem acesso à rede)
+    genai = None
+
+
+class BackendLLM(ABC):
+    """Interface dos backends: geração completa e em stream de um prompt"""
+
+    nome = "base"
+
+    def __init__(self, modelo, max_tokens, temperatura):
+        self.modelo = modelo
+        self.max_tokens = max_tokens
+        self.temperatura = temperatura
+
+    def disponivel(self):
+        """Se o backend está pronto para receber chamadas"""
+        return True
+
+    @abstractmethod
+    def gerar(self, prompt):
+        """Retorna o texto completo da resposta"""
+
+    def gerar_stream(self, prompt):
+        """Produz a resposta em partes de texto (padrão: uma única parte)"""
+        yield self.gerar(prompt)
+
+
+class BackendGemini(BackendLLM):
+    """Google Gemini (google.generativeai)"""
+
+    nome = "gemini"
+
+    def __init__(self, modelo, max_tokens, temperatura, api_key=None):
+        super().__init__(modelo, max_tokens, temperatura)
+        self._modelo = None
+        if api_key and genai is not None:
+            genai.configure(api_key=api_key)
+            self._modelo = genai.GenerativeModel(
+                model_name=modelo,
+                generation_config=genai.types.GenerationConfig(
+                    max_output_tokens=max_tokens,
+                    temperature=temperatura
+                )
+            )
+
+    def disponivel(self):
+        return self._modelo is not None
+
+    def gerar(self, prompt):
+        return self._modelo.generate_content(prompt).text
+
+    def gerar_stream(self, prompt):
+        for chunk in self._modelo.generate_content(prompt, stream=True):
+            try:
+                texto = chunk.text
+            except ValueError:
+                # Parte sem texto (ex.: apenas metadados de finalização)
+                continue
+            yield texto
+
+
+class ErroBackendSimulado(ConnectionError):
+    """Falha transitória injetada pelo backend fake (tratada como retentável)"""
+
+
+_VOCABULARIO = (
+    "receita margem liquidez endividamento rentabilidade patrimônio ativo passivo "
+    "crescimento queda estabilidade tendência indicador período ano anterior variação "
+    "capital giro custo lucro caixa risco oportunidade eficiência estrutura"
+).split()
+
+
+class BackendFake(BackendLLM):
+    """
+    Modelo local determinístico (mesmo prompt, mesma resposta), sem acesso à rede
+
+    Configuração pelo ambiente:
+        LLM_FAKE_LATENCIA_MS: tempo até o primeiro token (padrão 300)
+        LLM_FAKE_TOKENS_POR_SEGUNDO: velocidade de geração; 0 = instantâneo (padrão 200)
+        LLM_FAKE_TOKENS_RESPOSTA: tamanho da resposta, limitado a max_tokens (padrão 400)
+        LLM_FAKE_TAXA_ERRO: fração de chamadas que falham antes de responder (padrão 0)
+        LLM_FAKE_SEED: semente da injeção de erros (padrão 42)
+    """
+
+    nome = "fake"
+
+    def __init__(self, modelo, max_tokens, temperatura, **_):
+        super().__init__("fake-local", max_tokens, temperatura)
+        self.latencia = float(os.getenv("LLM_FAKE_LATENCIA_MS", 300)) / 1000
+        self.tokens_por_segundo = float(os.getenv("LLM_FAKE_TOKENS_POR_SEGUNDO", 200))
+        self.tokens_resposta = min(int(os.getenv("LLM_FAKE_TOKENS_RESPOSTA", 400)), max_tokens)
+        self.taxa_erro = float(os.getenv("LLM_FAKE_TAXA_ERRO", 0))
+        self._rng = random.Random(int(os.getenv("LLM_FAKE_SEED", 42)))
+        self._lock = threading.Lock()
+        self.chamadas = 0
+        self.erros = 0
+
+    def _iniciar(self):
+        """Conta a chamada, injeta a falha sorteada e aguarda a latência inicial"""
+        with self._lock:
+            self.chamadas += 1
+            falhar = self._rng.random() < self.taxa_erro
+            if falhar:
+                self.erros += 1
+        time.sleep(self.latencia)
+        if falhar:
+            raise ErroBackendSimulado("503 Falha simulada pelo backend fake")
+
+    def _partes(self, prompt):
+        """Resposta em markdown derivada do hash do prompt, em partes de ~8 tokens"""
+        semente = int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "big")
+        rng = random.Random(semente)
+        palavras = ["**Resposta simulada (backend local)**\n\n1."]
+        item = 1
+        # ~1,3 palavra por token de 4 caracteres
+        for posicao in range(1, int(self.tokens_resposta / 1.3)):
+            if posicao % 30 == 0 and item < 5:
+                item += 1
+                palavras.append(f".\n{item}.")
+            palavras.append(rng.choice(_VOCABULARIO))
+        palavras.append(".")
+        for inicio in range(0, len(palavras), 6):
+            yield " ".join(palavras[inicio:inicio + 6]) + " "
+
+    def _aguardar_geracao(self, texto):
+        if self.tokens_por_segundo > 0:
+            time.sleep(len(texto) / 4 / self.tokens_por_segundo)
+
+    def gerar(self, prompt):
+        self._iniciar()
+        texto = "".join(self._partes(prompt))
+        self._aguardar_geracao(texto)
+        return texto
+
+    def gerar_stream(self, prompt):
+        self._iniciar()
+        for parte in self._partes(prompt):
+            self._aguardar_geracao(parte)
+            yield parte
+
+
+BACKENDS = {
+    BackendGemini.nome: BackendGemini,
+    BackendFake.nome: BackendFake,
+}
+
+
+def criar_backend(nome, modelo, max_tokens, temperatura, api_key=None):
+    """
+    Instancia o backend pelo nome (LLM_BACKEND)
+
+    Raises:
+        ValueError: Se o nome não corresponder a um backend registrado
+    """
+    classe = BACKENDS.get((nome or BackendGemini.nome).lower())
+    if classe is None:
+        raise ValueError(f"LLM_BACKEND desconhecido: {nome!r} (opções: {', '.join(BACKENDS)})")
+    return classe(modelo, max_tokens, temperatura, api_key=api_key)
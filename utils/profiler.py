@@ -0,0 +1,184 @@
+"""
+Profiler das etapas de cada rerun do Streamlit
+
+Registra tempo de parede e memória (RSS) de cada etapa de app.main, agrupa os reruns
+por página para calcular p50/p95 e grava os traces em JSON Lines para análise offline.
+Ativado com a variável de ambiente PROFILER=1; desativado, `etapa` devolve um context
+manager nulo e nada é medido.
+"""
+
+import json
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+import pandas as pd
+
+from config.settings import AppConfig
+from utils.instrumentation import obter_logger
+
+log = obter_logger("profiler")
+
+ATIVO = os.getenv("PROFILER", "0") == "1"
+
+_ETAPA_NULA = nullcontext()
+_local = threading.local()
+_lock = threading.Lock()
+_historico = defaultdict(lambda: deque(maxlen=AppConfig.PROFILER_CONFIG["max_reruns_por_pagina"]))
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# ru_maxrss vem em bytes no macOS e em KB nos demais sistemas
+_MAXRSS_POR_MB = 1024 ** 2 if sys.platform == "darwin" else 1024
+_sequencia = itertools.count(1)
+_exportados = {}  # arquivo -> número do último rerun já gravado nele
+
+
+def _rss_mb():
+    """Memória residente atual do processo em MB (pico fora do Linux; 0 se indisponível)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGINA / 1024 ** 2
+    except OSError:
+        if resource is None:
+            return 0.0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / _MAXRSS_POR_MB
+
+
+class _Etapa:
+    __slots__ = ("trace", "nome", "inicio", "rss_inicio")
+
+    def __init__(self, trace, nome):
+        self.trace = trace
+        self.nome = nome
+
+    def __enter__(self):
+        self.rss_inicio = _rss_mb()
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traceback):
+        duracao_ms = (time.perf_counter() - self.inicio) * 1000
+        rss = _rss_mb()
+        self.trace["etapas"].append({
+            "etapa": self.nome,
+            "ms": round(duracao_ms, 3),
+            "rss_mb": round(rss, 2),
+            "delta_rss_mb": round(rss - self.rss_inicio, 2),
+        })
+        return False
+
+
+def iniciar_rerun():
+    """Abre o trace do rerun atual (um por thread de script do Streamlit)"""
+    if not ATIVO:
+        return
+    _local.trace = {"inicio": time.time(), "t0": time.perf_counter(), "etapas": []}
+
+
+def etapa(nome):
+    """
+    Mede uma etapa do rerun atual
+
+    Uso:
+        with etapa("criar_sidebar"):
+            ...
+    """
+    trace = getattr(_local, "trace", None) if ATIVO else None
+    if trace is None:
+        return _ETAPA_NULA
+    return _Etapa(trace, nome)
+
+
+def finalizar_rerun(page_key):
+    """Fecha o trace do rerun e guarda no histórico da página (e no arquivo, se configurado)"""
+    trace = getattr(_local, "trace", None) if ATIVO else None
+    if trace is None:
+        return None
+    _local.trace = None
+    registro = {
+        "rerun": next(_sequencia),
+        "pagina": page_key,
+        "inicio": trace["inicio"],
+        "total_ms": round((time.perf_counter() - trace["t0"]) * 1000, 3),
+        "etapas": trace["etapas"],
+    }
+    with _lock:
+        _historico[page_key].append(registro)
+    if AppConfig.PROFILER_CONFIG["gravar_cada_rerun"]:
+        _anexar(Path(AppConfig.PROFILER_CONFIG["arquivo_traces"]), [registro])
+    return registro
+
+
+def _anexar(caminho, registros):
+    """Acrescenta ao arquivo os reruns ainda não gravados nele; retorna quantos foram gravados"""
+    chave = str(caminho.resolve())
+    try:
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        with _lock:
+            ultimo = _exportados.get(chave, 0)
+            novos = [registro for registro in registros if registro["rerun"] > ultimo]
+            if not novos:
+                return 0
+            with open(caminho, "a", encoding="utf-8") as saida:
+                for registro in novos:
+                    saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            _exportados[chave] = novos[-1]["rerun"]
+        return len(novos)
+    except OSError as e:
+        log.warning("⚠️ Não foi possível gravar traces: %s", e)
+        return 0
+
+
+def resumo_por_pagina():
+    """
+    p50/p95 de tempo por página e etapa, a partir dos reruns em memória
+
+    Returns:
+        DataFrame com Página, Etapa, Reruns, p50 (ms), p95 (ms) e Δ RSS médio (MB)
+    """
+    with _lock:
+        historico = {pagina: list(reruns) for pagina, reruns in _historico.items()}
+    linhas = []
+    for pagina, reruns in historico.items():
+        tempos = defaultdict(list)
+        memoria = defaultdict(list)
+        for rerun in reruns:
+            tempos["total"].append(rerun["total_ms"])
+            for item in rerun["etapas"]:
+                tempos[item["etapa"]].append(item["ms"])
+                memoria[item["etapa"]].append(item["delta_rss_mb"])
+        for nome, valores in tempos.items():
+            p50, p95 = np.percentile(valores, [50, 95])
+            linhas.append({
+                "Página": pagina,
+                "Etapa": nome,
+                "Reruns": len(valores),
+                "p50 (ms)": round(p50, 1),
+                "p95 (ms)": round(p95, 1),
+                "Δ RSS médio (MB)": round(float(np.mean(memoria[nome])), 2) if memoria[nome] else None,
+            })
+    return pd.DataFrame(linhas)
+
+
+def exportar_traces(caminho=None):
+    """
+    Grava em um arquivo JSON Lines os reruns em memória que ainda não estão nele
+
+    Exportações repetidas (ou combinadas com gravar_cada_rerun) não duplicam traces.
+    Retorna a quantidade gravada nesta chamada.
+    """
+    caminho = caminho or AppConfig.PROFILER_CONFIG["arquivo_traces"]
+    with _lock:
+        registros = sorted((rerun for reruns in _historico.values() for rerun in reruns),
+                           key=lambda rerun: rerun["rerun"])
+    return _anexar(Path(caminho), registros)
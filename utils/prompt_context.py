@@ -0,0 +1,261 @@
+"""
+Contexto dos prompts da IA com orçamento de tokens
+
+Estima o tamanho em tokens do contexto serializado e o reduz até caber no orçamento
+do nível de detalhe: primeiro arredonda números, depois resume e por fim remove os
+campos de menor valor analítico. O JSON gerado é compacto (sem indentação). Cada
+prompt enviado tem seu tamanho registrado para acompanhamento.
+
+`serializar` converte DataFrames/Series por coluna (datas, NaN e tipos NumPy em lote)
+em vez de percorrer cada célula de `to_dict('records')`.
+"""
+
+import copy
+import json
+import math
+import threading
+from collections import deque
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import obter_logger
+
+log = obter_logger("prompt_context")
+
+# ~4 caracteres por token (aproximação usual para texto em português/JSON)
+CARACTERES_POR_TOKEN = 4
+
+# Orçamento de tokens do contexto por nível de detalhe (LLM_DETAIL_LEVEL)
+ORCAMENTO_CONTEXTO = {
+    'curto': 1000,
+    'balanced': 2000,
+    'detalhado': 4000,
+}
+
+# Campos do contexto em ordem crescente de valor: os primeiros são resumidos/removidos antes.
+# KPIs e alertas executivos nunca são removidos.
+PRIORIDADE_REMOCAO = [
+    ('dados_gerais', 'categorias_receitas'),
+    ('dados_gerais', 'categorias_despesas'),
+    ('dados_filtrados', 'ranking_mensal'),
+    ('dados_filtrados', 'analise_temporal'),
+    ('dados_filtrados', 'distribuicao_categorias'),
+    ('dados_filtrados', 'resumo_estatistico'),
+    ('dados_filtrados', 'analise_tendencias'),
+    ('dados_filtrados', 'top_receitas'),
+    ('dados_filtrados', 'top_despesas'),
+    ('executive_narrative',),
+]
+
+# Itens mantidos em listas/dicionários resumidos
+ITENS_RESUMO = 3
+
+
+def estimar_tokens(texto):
+    """Estimativa de tokens de um texto (sem depender do tokenizer do modelo)"""
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def json_compacto(obj):
+    """JSON sem indentação nem espaços após separadores"""
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def _serializar_valor(obj):
+    """Conversão de um valor isolado (mesmas regras aplicadas às colunas)"""
+    if obj is None or isinstance(obj, (str, bool, int)):
+        return obj
+    if isinstance(obj, float):
+        return None if math.isnan(obj) else float(obj)
+    if isinstance(obj, (dict, list, tuple, pd.DataFrame, pd.Series, pd.Index, np.ndarray)):
+        return serializar(obj)
+    try:
+        if pd.isna(obj):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(obj, pd.Period):
+        return obj.strftime('%m/%Y')
+    if isinstance(obj, np.datetime64):
+        obj = pd.Timestamp(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.strftime('%d/%m/%Y')
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, (np.integer, np.floating)):
+        return float(obj)
+    if hasattr(obj, 'to_dict'):
+        return serializar(obj.to_dict())
+    if hasattr(obj, 'tolist'):
+        return serializar(obj.tolist())
+    return str(obj)
+
+
+def _sem_nulos(serie):
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def _serializar_coluna(serie):
+    """Converte uma Series inteira em lista de valores JSON (NaN/NaT -> None)"""
+    dtype = serie.dtype
+    if isinstance(dtype, pd.PeriodDtype):
+        return _sem_nulos(serie.dt.strftime('%m/%Y'))
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return _sem_nulos(serie.dt.strftime('%d/%m/%Y'))
+    if isinstance(dtype, pd.StringDtype):
+        return _sem_nulos(serie)
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biu':
+        return serie.tolist()
+    if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        valores = serie.tolist()
+        for posicao in np.flatnonzero(np.isnan(serie.to_numpy())):
+            valores[posicao] = None
+        return valores
+    # object, category e extensões (Int64, boolean...): valor a valor
+    return [_serializar_valor(valor) for valor in serie.tolist()]
+
+
+_CHAVES_JSON = (str, int, float, bool, type(None))
+
+
+def _serializar_rotulos(rotulos):
+    """Rótulos de colunas/índice como chaves JSON (datas formatadas, demais via str)"""
+    chaves = []
+    for rotulo in rotulos.tolist():
+        if not isinstance(rotulo, _CHAVES_JSON):
+            convertido = _serializar_valor(rotulo)
+            rotulo = convertido if isinstance(convertido, _CHAVES_JSON) else str(rotulo)
+        chaves.append(rotulo)
+    return chaves
+
+
+def serializar(obj):
+    """
+    Converte objetos para formatos JSON-serializáveis
+
+    DataFrame vira lista de registros e Series vira dicionário, convertidos por coluna.
+    Datas saem como dd/mm/aaaa, períodos como mm/aaaa e NaN/NaT como None.
+    """
+    if isinstance(obj, pd.DataFrame):
+        colunas = [_serializar_coluna(obj.iloc[:, posicao]) for posicao in range(obj.shape[1])]
+        rotulos = _serializar_rotulos(obj.columns)
+        return [dict(zip(rotulos, linha)) for linha in zip(*colunas)] if colunas else [{} for _ in range(len(obj))]
+    if isinstance(obj, pd.Series):
+        return dict(zip(_serializar_rotulos(obj.index), _serializar_coluna(obj)))
+    if isinstance(obj, (pd.Index, np.ndarray)):
+        if obj.ndim != 1:
+            return serializar(obj.tolist())
+        return _serializar_coluna(pd.Series(obj, copy=False))
+    if isinstance(obj, dict):
+        return {chave: _serializar_valor(valor) for chave, valor in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_serializar_valor(valor) for valor in obj]
+    return _serializar_valor(obj)
+
+
+def _arredondar(obj, casas=2):
+    if isinstance(obj, float):
+        return round(obj, casas) if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {chave: _arredondar(valor, casas) for chave, valor in obj.items()}
+    if isinstance(obj, list):
+        return [_arredondar(valor, casas) for valor in obj]
+    return obj
+
+
+def _resumir(valor):
+    """Mantém os primeiros itens de listas/dicionários e informa quantos foram omitidos"""
+    if isinstance(valor, list) and len(valor) > ITENS_RESUMO:
+        return valor[:ITENS_RESUMO] + [f"... +{len(valor) - ITENS_RESUMO} itens omitidos"]
+    if isinstance(valor, dict) and len(valor) > ITENS_RESUMO:
+        itens = list(valor.items())
+        resumo = dict(itens[:ITENS_RESUMO])
+        resumo['_omitidos'] = len(itens) - ITENS_RESUMO
+        return resumo
+    return valor
+
+
+def _pai(contexto, caminho):
+    alvo = contexto
+    for chave in caminho[:-1]:
+        alvo = alvo.get(chave) if isinstance(alvo, dict) else None
+    return alvo if isinstance(alvo, dict) and caminho[-1] in alvo else None
+
+
+def compactar_contexto(contexto, orcamento_tokens, prioridade=PRIORIDADE_REMOCAO):
+    """
+    Reduz o contexto até caber no orçamento de tokens (sem alterar o original)
+
+    Etapas, parando assim que o JSON compacto couber no orçamento:
+      1. arredonda números para 2 casas;
+      2. para cada campo de `prioridade` (menor valor primeiro), resume listas/dicionários;
+      3. na mesma ordem, remove os campos.
+
+    Returns:
+        (contexto reduzido, info) com tokens antes/depois e campos resumidos/removidos
+    """
+    original = estimar_tokens(json_compacto(contexto))
+    info = {'tokens_original': original, 'tokens': original, 'orcamento': orcamento_tokens,
+            'resumidos': [], 'removidos': []}
+    if original <= orcamento_tokens:
+        return contexto, info
+
+    ctx = _arredondar(copy.deepcopy(contexto))
+    tokens = estimar_tokens(json_compacto(ctx))
+
+    for acao in ('resumidos', 'removidos'):
+        for caminho in prioridade:
+            if tokens <= orcamento_tokens:
+                break
+            pai = _pai(ctx, caminho)
+            if pai is None:
+                continue
+            if acao == 'resumidos':
+                resumido = _resumir(pai[caminho[-1]])
+                if resumido is pai[caminho[-1]]:
+                    continue
+                pai[caminho[-1]] = resumido
+            else:
+                del pai[caminho[-1]]
+            info[acao].append('.'.join(caminho))
+            tokens = estimar_tokens(json_compacto(ctx))
+
+    info['tokens'] = tokens
+    if tokens > orcamento_tokens:
+        log.info("Contexto acima do orçamento após compactação: %d > %d tokens", tokens, orcamento_tokens)
+    return ctx, info
+
+
+class MetricasPrompt:
+    """Tamanho estimado de cada prompt enviado à IA (últimas N chamadas)"""
+
+    def __init__(self, max_registros=500):
+        self._registros = deque(maxlen=max_registros)
+        self._lock = threading.Lock()
+
+    def registrar(self, origem, prompt, cache=False):
+        tokens = estimar_tokens(prompt)
+        with self._lock:
+            self._registros.append({'origem': origem, 'tokens': tokens, 'caracteres': len(prompt), 'cache': cache})
+        log.debug("Prompt %s: ~%d tokens (%d caracteres)%s", origem, tokens, len(prompt), " [cache]" if cache else "")
+        return tokens
+
+    def resumo(self):
+        """Por origem: chamadas, tokens médios/máximos e acertos de cache"""
+        with self._lock:
+            registros = list(self._registros)
+        por_origem = {}
+        for registro in registros:
+            atual = por_origem.setdefault(registro['origem'], {'chamadas': 0, 'tokens_total': 0, 'tokens_max': 0, 'cache': 0})
+            atual['chamadas'] += 1
+            atual['tokens_total'] += registro['tokens']
+            atual['tokens_max'] = max(atual['tokens_max'], registro['tokens'])
+            atual['cache'] += int(registro['cache'])
+        for atual in por_origem.values():
+            atual['tokens_medio'] = atual['tokens_total'] / atual['chamadas']
+        return por_origem
+
+
+metricas_prompt = MetricasPrompt()
@@ -0,0 +1,296 @@
+"""
+Templates dos prompts da IA, compilados uma vez por nível de detalhe
+
+Cada template é quebrado, na primeira utilização, em trechos fixos e campos. Os
+campos que dependem só do nível de detalhe (nível, quantidade de bullets) já entram
+nos trechos fixos; a cada chamada apenas o contexto dinâmico (dados, alertas,
+pergunta) é intercalado. O texto gerado é idêntico ao das f-strings anteriores,
+preservando as chaves do cache de respostas. O filtro de perguntas financeiras usa
+uma única expressão regular pré-compilada em vez de percorrer a lista de palavras.
+"""
+
+import re
+from functools import lru_cache
+from string import Formatter
+
+# Quantidade de bullets por seção em cada nível de detalhe (LLM_DETAIL_LEVEL)
+DETALHES_POR_NIVEL = {
+    'curto': {'bullets_destaques': 3, 'bullets_riscos': 2, 'bullets_acoes': 2, 'max_sections': 5},
+    'balanced': {'bullets_destaques': 5, 'bullets_riscos': 3, 'bullets_acoes': 3, 'max_sections': 6},
+    'detalhado': {'bullets_destaques': 8, 'bullets_riscos': 5, 'bullets_acoes': 5, 'max_sections': 7},
+}
+
+TEMPLATES = {
+    'insights': """
+Você é um analista financeiro sênior. Gere análise EXECUTIVA com profundidade equilibrada.
+LÍNGUA: Português brasileiro.
+FORMATO: Markdown estruturado.
+NÍVEL DE DETALHE: {nivel}.
+
+DADOS (JSON resumido):
+{dados}
+
+INSTRUÇÕES GERAIS:
+1. Se existirem executive_alerts, iniciar explicando-os em ordem de criticidade.
+2. Usar executive_narrative como base, mas expandir com números objetivos (não inventar).
+3. Citar métricas com valores e variações (pp ou %), sempre indicar unidade (% / vezes / R$ se aplicável).
+4. Não repetir exatamente o mesmo valor em seções diferentes sem nova interpretação.
+5. Se algum dado essencial estiver ausente, declarar 'dado não disponível'.
+6. Evitar floreios; foco em implicações.
+
+ESTRUTURA (não adicionar seções extras):
+## 📌 Resumo Executivo (3-4 frases)
+## 🔔 Alertas Críticos (se houver)
+## 📊 Destaques Quantitativos (até {bullets_destaques} bullets)
+## ⚠️ Riscos / Pressões (até {bullets_riscos} bullets)
+## 🚀 Oportunidades / Eficiências (2-3 bullets)
+## 🎯 Ações Prioritárias (até {bullets_acoes} bullets com verbo inicial)
+## 🧪 Observações / Limitações (1-2 bullets se necessário)
+
+REGRAS DE NUMERAIS:
+- Percentuais: 1 casa (ex: 12,3%).
+- Diferença percentual absoluta: usar 'pp' quando for diferença de margens/ROE.
+- Valores monetários: se houver (R$), sem casas decimais, milhar com ponto.
+
+RESPONDA APENAS COM A ANÁLISE.
+""",
+    'pergunta': """
+Você é um analista financeiro sênior. Responda a PERGUNTA específica de forma objetiva porém com substância.
+LÍNGUA: Português brasileiro.
+NÍVEL DE DETALHE: {nivel}.
+
+PERGUNTA:
+{pergunta}
+
+DADOS (JSON resumido):
+{dados}
+
+INSTRUÇÕES:
+1. Se a pergunta se relacionar a métricas presentes em executive_alerts, priorize riscos primeiro.
+2. Limitar a resposta a 3-5 parágrafos curtos OU uma combinação de parágrafos + lista (máx {bullets_destaques} bullets totais).
+3. Sempre que citar variação, qualificar (ex: 'ROE caiu 3,2 pp vs ano anterior').
+4. Se a pergunta pedir comparação temporal e só houver 2 anos, explicitar limitação.
+5. Encerrar (última linha) com '➡️ Próximo passo:' e uma recomendação acionável.
+6. Não inventar métricas inexistentes; se não encontrado, dizer explicitamente.
+
+FORMATO:
+- Parágrafo inicial direto respondendo.
+- Lista (se pertinente) com evidências numéricas.
+- Conclusão estratégica + próximo passo.
+
+RESPONDA APENAS COM O CONTEÚDO SOLICITADO.
+""",
+    'grafico_pergunta': """
+Você é um ANALISTA FINANCEIRO ESPECIALISTA. Responda APENAS perguntas relacionadas à análise financeira, métricas contábeis e indicadores empresariais.
+
+CONTEXTO DA VISUALIZAÇÃO: {tipo}
+ALERTAS EXECUTIVOS: {alertas}
+DADOS DA VISUALIZAÇÃO:
+{dados}
+
+PERGUNTA DO USUÁRIO: {pergunta}
+
+FORMATO DE RESPOSTA:
+
+## 📊 ANÁLISE DOS DADOS
+[Análise baseada nos dados da visualização]
+
+## 📈 INTERPRETAÇÃO TÉCNICA  
+[Significado dos indicadores no contexto empresarial]
+
+## ⚠️ ALERTAS E RECOMENDAÇÕES
+[Principais achados e ações recomendadas]
+
+Seja preciso, use números específicos dos dados, e mantenha foco exclusivamente em análise financeira.
+""",
+    'grafico_analise': """
+Você é um analista financeiro sênior. Gere uma análise executiva da visualização.
+
+TIPO DE VISUALIZAÇÃO: {tipo}
+ALERTAS EXECUTIVOS: {alertas}
+NARRATIVA EXECUTIVA (se houver): {narrativa}
+DADOS DA VISUALIZAÇÃO (JSON):
+{dados}
+
+Produza:
+- Resumo objetivo (1 frase)
+- 2-4 destaques quantitativos
+- Riscos / atenções (se houver)
+- Próxima ação recomendada
+Responda em português brasileiro.
+""",
+    'metrica_pergunta': """
+Você é um ANALISTA FINANCEIRO ESPECIALISTA. Responda APENAS perguntas relacionadas à análise financeira, métricas contábeis e indicadores empresariais.
+
+CONTEXTO DA MÉTRICA:
+• Nome: {nome}
+• Categoria: {categoria}
+• Valores: {estatisticas}
+
+ALERTAS EXECUTIVOS: {alertas}
+DADOS COMPLETOS:
+```json
+{dados}
+```
+
+PERGUNTA DO USUÁRIO: {pergunta}
+
+FORMATO DE RESPOSTA:
+
+## 📊 ANÁLISE DA MÉTRICA
+[Análise dos valores e evolução baseada nos dados fornecidos]
+
+## 📈 INTERPRETAÇÃO TÉCNICA  
+[Significado dos números no contexto empresarial]
+
+## 🎯 BENCHMARKS E COMPARAÇÃO
+[Comparação com padrões de mercado e situação da empresa]
+
+## ⚠️ INSIGHTS E RECOMENDAÇÕES
+[Principais achados e ações recomendadas]
+
+Seja preciso, use números específicos dos dados, e mantenha foco exclusivamente em análise financeira.
+""",
+    'metrica_analise': """
+Você é um ANALISTA FINANCEIRO ESPECIALISTA. Forneça uma análise executiva estruturada desta métrica financeira.
+
+CONTEXTO DA MÉTRICA:
+• Nome: {nome}
+• Categoria: {categoria}
+• Valor Atual: {valor_atual}
+• Valor Anterior: {valor_anterior}
+• Tendência: {tendencia}
+• Variação %: {variacao}%
+
+ALERTAS EXECUTIVOS: {alertas}
+
+DADOS COMPLETOS:
+```json
+{dados}
+```
+
+FORNEÇA ANÁLISE NO FORMATO:
+
+## 📊 SITUAÇÃO ATUAL DA MÉTRICA
+• **Valor Atual:** [valor] ([variação] vs período anterior)
+• **Classificação:** [Excelente/Bom/Adequado/Preocupante/Crítico]
+• **Tendência:** [crescente/decrescente/estável] - [explicação]
+
+## 📈 INTERPRETAÇÃO EXECUTIVA
+• **Significado:** [o que esta métrica representa para o negócio]
+• **Contexto Setorial:** [comparação com benchmarks de mercado]
+• **Impacto no Desempenho:** [como afeta outros indicadores]
+
+## 🎯 ANÁLISE COMPARATIVA
+• **vs Período Anterior:** [análise da evolução]
+• **vs Benchmarks:** [posicionamento em relação ao mercado]
+• **Contexto Histórico:** [padrões identificados nos dados]
+
+## ⚠️ RISCOS E OPORTUNIDADES
+• **Riscos Identificados:** [pontos de atenção baseados nos dados]
+• **Oportunidades:** [potenciais melhorias]
+• **Ações Recomendadas:** [próximos passos específicos]
+
+## 💡 RESUMO EXECUTIVO
+[Conclusão de 2-3 frases sobre a situação desta métrica e próximos passos]
+
+Use APENAS os dados fornecidos. Seja específico com números e percentuais.
+""",
+}
+
+# Palavras que caracterizam uma pergunta de análise financeira (busca por substring)
+PALAVRAS_FINANCEIRAS = (
+    'financeira', 'contábil', 'receita', 'lucro', 'prejuízo', 'ativo', 'passivo', 'patrimônio',
+    'liquidez', 'rentabilidade', 'endividamento', 'roa', 'roe', 'margem', 'giro', 'ciclo',
+    'capital', 'investimento', 'fluxo', 'caixa', 'despesa', 'custo', 'resultado', 'balanço',
+    'dre', 'indicador', 'índice', 'ratio', 'análise', 'performance', 'desempenho', 'benchmark',
+    'métrica', 'alavancagem', 'solvência', 'imobilizado', 'circulante', 'estoque', 'fornecedor',
+    'cliente', 'prazo', 'pmre', 'pmrv', 'pmpc', 'dupont', 'ebitda', 'variação', 'crescimento',
+    'queda', 'aumento', 'diminuição', 'evolução', 'tendência', 'risco', 'oportunidade'
+)
+# Aceitas adicionalmente nas perguntas sobre gráficos/tabelas
+PALAVRAS_VISUALIZACAO = ('gráfico', 'visualização', 'dados', 'valores', 'comparação')
+
+
+def _expressao_palavras(palavras):
+    """
+    Regex que encontra qualquer uma das palavras, com os prefixos comuns fatorados
+    ("ativo|alavancagem|análise" -> "a(?:tivo|lavancagem|nálise)"): em cada posição do
+    texto o motor testa um ramo por letra inicial em vez de uma alternativa por palavra
+    """
+    arvore = {}
+    for palavra in palavras:
+        no = arvore
+        for letra in palavra:
+            no = no.setdefault(letra, {})
+        no[''] = {}
+
+    def montar(no):
+        ramos = [re.escape(letra) + montar(filho) for letra, filho in sorted(no.items()) if letra]
+        if not ramos:
+            return ''
+        expressao = ramos[0] if len(ramos) == 1 else '(?:' + '|'.join(ramos) + ')'
+        # Palavra que termina aqui e também é prefixo de outra: o restante é opcional
+        return f'(?:{expressao})?' if '' in no else expressao
+
+    return re.compile(montar(arvore))
+
+
+_RE_FINANCEIRA = _expressao_palavras(PALAVRAS_FINANCEIRAS)
+_RE_FINANCEIRA_VISUALIZACAO = _expressao_palavras(PALAVRAS_FINANCEIRAS + PALAVRAS_VISUALIZACAO)
+
+
+def pergunta_financeira(pergunta, visualizacao=False):
+    """Se a pergunta contém alguma palavra de análise financeira (e de visualização, se pedido)"""
+    expressao = _RE_FINANCEIRA_VISUALIZACAO if visualizacao else _RE_FINANCEIRA
+    return expressao.search(pergunta.lower()) is not None
+
+
+class TemplatePrompt:
+    """Template pré-compilado: trechos fixos intercalados com os campos dinâmicos"""
+
+    def __init__(self, nome, texto, fixos):
+        self.nome = nome
+        self._partes = []
+        self._campos = []
+        fixo = []
+        for literal, campo, _, _ in Formatter().parse(texto):
+            fixo.append(literal)
+            if campo is None:
+                continue
+            if campo in fixos:
+                fixo.append(format(fixos[campo]))
+                continue
+            self._partes.append("".join(fixo))
+            self._campos.append((len(self._partes), campo))
+            self._partes.append(None)
+            fixo = []
+        self._partes.append("".join(fixo))
+
+    def renderizar(self, **valores):
+        """Texto do prompt; o conteúdo dos campos é inserido literalmente (chaves não são interpretadas)"""
+        partes = list(self._partes)
+        for posicao, campo in self._campos:
+            partes[posicao] = format(valores[campo])
+        return "".join(partes)
+
+
+def detalhes_nivel(nivel):
+    """Configuração de bullets do nível de detalhe (balanced para níveis desconhecidos)"""
+    return DETALHES_POR_NIVEL.get(nivel, DETALHES_POR_NIVEL['balanced'])
+
+
+@lru_cache(maxsize=None)
+def compilar(template, nivel):
+    """
+    Template `template` com as partes do nível de detalhe já resolvidas (compilado uma vez)
+
+    Raises:
+        KeyError: Se o template não existir
+    """
+    return TemplatePrompt(template, TEMPLATES[template], dict(detalhes_nivel(nivel), nivel=nivel))
+
+
+def renderizar(template, nivel, **valores):
+    """Atalho: compila (ou reaproveita) o template e insere os valores dinâmicos"""
+    return compilar(template, nivel).renderizar(**valores)
@@ -0,0 +1,136 @@
+"""
+Reaproveitamento de respostas para perguntas quase iguais
+
+Índice TF-IDF local (sem dependências externas) sobre as perguntas já respondidas,
+separado por escopo: modelo, nível de detalhe, métrica e impressão digital dos
+dados. "Como evoluiu o ROE?" e "evolução do ROE" viram os mesmos termos após
+remover acentos e stopwords e truncar as palavras no radical; acima do limiar de
+similaridade do cosseno, a resposta guardada é devolvida sem chamar o modelo.
+O índice vive em memória (por processo) e é limitado por escopo e no total.
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+
+from config.settings import AppConfig
+from utils.instrumentation import obter_logger
+
+log = obter_logger("question_index")
+
+_PALAVRAS = re.compile(r"\w+")
+
+# Radical aproximado: prefixo da palavra (evoluiu/evolução -> "evolu")
+TAMANHO_RADICAL = 5
+
+STOPWORDS = frozenset("""
+a ao aos as com como da das de do dos e ela ele em entre esta este esse essa isso
+foi ha na nas no nos o os ou para pela pelo por qual quais que quem se ser sobre
+sua seu tem um uma me meu minha nossa nosso voce pode poderia favor explique diga
+""".split())
+
+
+def termos(texto):
+    """Termos normalizados: minúsculas, sem acentos, sem stopwords, truncados no radical"""
+    sem_acentos = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode("ascii")
+    resultado = []
+    for palavra in _PALAVRAS.findall(sem_acentos):
+        if palavra in STOPWORDS:
+            continue
+        # Números (anos, percentuais) diferenciam perguntas: mantidos inteiros
+        resultado.append(palavra if palavra.isdigit() else palavra[:TAMANHO_RADICAL])
+    return resultado
+
+
+class IndicePerguntas:
+    """Índice TF-IDF de perguntas respondidas, por escopo"""
+
+    def __init__(self, limiar, max_por_escopo=200, max_escopos=256):
+        self.limiar = limiar
+        self.max_por_escopo = max_por_escopo
+        self.max_escopos = max_escopos
+        self._escopos = OrderedDict()
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.acertos = 0
+
+    @staticmethod
+    def _similaridade(consulta, documentos):
+        """Cosseno TF-IDF (IDF suavizado sobre o escopo) entre a consulta e cada documento"""
+        total = len(documentos) + 1
+        frequencia = Counter()
+        for contagem in documentos:
+            frequencia.update(contagem.keys())
+        frequencia.update(consulta.keys())
+        idf = {termo: math.log(total / frequencia[termo]) + 1 for termo in frequencia}
+
+        def vetor(contagem):
+            pesos = {termo: quantidade * idf[termo] for termo, quantidade in contagem.items()}
+            return pesos, math.sqrt(sum(peso * peso for peso in pesos.values()))
+
+        vetor_consulta, norma_consulta = vetor(consulta)
+        for contagem in documentos:
+            pesos, norma = vetor(contagem)
+            if not norma or not norma_consulta:
+                yield 0.0
+                continue
+            produto = sum(peso * pesos.get(termo, 0.0) for termo, peso in vetor_consulta.items())
+            yield produto / (norma * norma_consulta)
+
+    def buscar(self, escopo, pergunta):
+        """
+        Resposta de uma pergunta semelhante já respondida no mesmo escopo
+
+        Returns:
+            (pergunta original, resposta, similaridade) ou None
+        """
+        consulta = Counter(termos(pergunta))
+        with self._lock:
+            self.consultas += 1
+            entradas = list(self._escopos.get(escopo, ()))
+        melhor = None
+        if consulta and entradas:
+            similaridades = self._similaridade(consulta, [contagem for contagem, _, _ in entradas])
+            for (_, original, resposta), similaridade in zip(entradas, similaridades):
+                if similaridade >= self.limiar and (melhor is None or similaridade > melhor[2]):
+                    melhor = (original, resposta, similaridade)
+        if melhor is not None:
+            with self._lock:
+                self.acertos += 1
+            log.debug("Pergunta semelhante (%.2f): %r ~ %r", melhor[2], pergunta, melhor[0])
+        return melhor
+
+    def registrar(self, escopo, pergunta, resposta):
+        contagem = Counter(termos(pergunta))
+        if not contagem:
+            return
+        with self._lock:
+            entradas = self._escopos.pop(escopo, None) or []
+            entradas.append((contagem, pergunta, resposta))
+            del entradas[:-self.max_por_escopo]
+            self._escopos[escopo] = entradas
+            while len(self._escopos) > self.max_escopos:
+                self._escopos.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._escopos.clear()
+
+    def estatisticas(self):
+        """Consultas, acertos, taxa de acerto e tamanho do índice"""
+        with self._lock:
+            return {
+                'consultas': self.consultas,
+                'acertos': self.acertos,
+                'taxa_acerto': self.acertos / self.consultas if self.consultas else 0.0,
+                'escopos': len(self._escopos),
+                'perguntas': sum(len(entradas) for entradas in self._escopos.values()),
+            }
+
+
+indice_perguntas = IndicePerguntas(
+    limiar=AppConfig.IA_CONFIG["reuso_similaridade_min"],
+    max_por_escopo=AppConfig.IA_CONFIG["reuso_max_por_metrica"],
+)
@@ -0,0 +1,175 @@
+"""
+Limite de taxa e retentativas das chamadas à API Gemini
+
+Um token bucket único por processo (todas as sessões do Streamlit e as threads do
+map-reduce) espaça as requisições para ficar dentro da cota. Erros transitórios
+(429, 5xx, timeout) são repetidos com backoff exponencial e jitter, e um 429 esvazia
+o bucket para que as demais chamadas também desacelerem. A fila de espera é limitada:
+acima dela a chamada falha na hora com FilaCheiaError em vez de acumular threads
+bloqueadas. Configuração pelas variáveis GEMINI_* do .env.
+"""
+
+import os
+import random
+import threading
+import time
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:
+    google_exceptions = None
+
+from utils.instrumentation import obter_logger
+
+log = obter_logger("rate_limiter")
+
+# Requisições por minuto (0 desativa o limite), tamanho da rajada e da fila de espera
+REQUISICOES_POR_MINUTO = float(os.getenv("GEMINI_RPM", 15))
+RAJADA = int(os.getenv("GEMINI_RAJADA", 3))
+MAX_FILA = int(os.getenv("GEMINI_MAX_FILA", 16))
+MAX_ESPERA_SEGUNDOS = float(os.getenv("GEMINI_MAX_ESPERA", 120))
+
+# Retentativas com backoff exponencial: base * 2^(tentativa-1), limitado a BACKOFF_MAX
+MAX_TENTATIVAS = int(os.getenv("GEMINI_MAX_TENTATIVAS", 4))
+BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", 1.0))
+BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", 30))
+
+
+class FilaCheiaError(RuntimeError):
+    """Requisição recusada: fila de espera do limitador cheia ou espera longa demais"""
+
+
+class LimitadorTaxa:
+    """Token bucket thread-safe com fila de espera limitada"""
+
+    def __init__(self, requisicoes_por_minuto, rajada=1, max_fila=16, max_espera=60.0):
+        self.taxa = requisicoes_por_minuto / 60.0  # tokens por segundo
+        self.capacidade = max(1, rajada)
+        self.max_fila = max_fila
+        self.max_espera = max_espera
+        self._tokens = float(self.capacidade)
+        self._atualizado = time.monotonic()
+        self._aguardando = 0
+        self._lock = threading.Lock()
+        self.esperas = 0
+        self.rejeitadas = 0
+
+    def _repor(self, agora):
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado) * self.taxa)
+        self._atualizado = agora
+
+    def adquirir(self, ao_esperar=None):
+        """
+        Consome um token, aguardando na fila se necessário
+
+        Args:
+            ao_esperar: Callback opcional ao_esperar(segundos, 'espera'), chamado uma vez
+                quando a requisição precisa aguardar
+
+        Returns:
+            Segundos aguardados
+        """
+        if self.taxa <= 0:
+            return 0.0
+        inicio = time.monotonic()
+        with self._lock:
+            self._repor(inicio)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            if self._aguardando >= self.max_fila:
+                self.rejeitadas += 1
+                raise FilaCheiaError("Muitas requisições à IA em espera. Tente novamente em instantes.")
+            self._aguardando += 1
+            self.esperas += 1
+
+        notificado = False
+        try:
+            while True:
+                with self._lock:
+                    agora = time.monotonic()
+                    self._repor(agora)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return agora - inicio
+                    falta = (1 - self._tokens) / self.taxa
+                if agora - inicio + falta > self.max_espera:
+                    with self._lock:
+                        self.rejeitadas += 1
+                    raise FilaCheiaError("Limite de requisições à IA atingido. Tente novamente em instantes.")
+                if ao_esperar is not None and not notificado:
+                    ao_esperar(falta, 'espera')
+                    notificado = True
+                time.sleep(min(falta, 1.0))
+        finally:
+            with self._lock:
+                self._aguardando -= 1
+
+    def penalizar(self):
+        """Esvazia o bucket (ex.: após um 429), desacelerando todas as chamadas"""
+        with self._lock:
+            self._repor(time.monotonic())
+            self._tokens = min(self._tokens, 0.0)
+
+    def estatisticas(self):
+        with self._lock:
+            self._repor(time.monotonic())
+            return {
+                'tokens': round(self._tokens, 2),
+                'aguardando': self._aguardando,
+                'esperas': self.esperas,
+                'rejeitadas': self.rejeitadas,
+            }
+
+
+def erro_retentavel(erro):
+    """Cota excedida (429), indisponibilidade/erro interno (5xx) e timeouts"""
+    if google_exceptions is not None and isinstance(erro, (
+            google_exceptions.TooManyRequests,
+            google_exceptions.InternalServerError,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded)):
+        return True
+    return isinstance(erro, (ConnectionError, TimeoutError))
+
+
+def _cota_excedida(erro):
+    return google_exceptions is not None and isinstance(erro, google_exceptions.TooManyRequests)
+
+
+def executar(funcao, limitador=None, ao_esperar=None, tentativas=None):
+    """
+    Executa funcao() respeitando o limite de taxa, repetindo erros transitórios
+
+    Args:
+        funcao: Chamada à API, sem argumentos
+        limitador: LimitadorTaxa (padrão: limitador_gemini do processo)
+        ao_esperar: Callback opcional ao_esperar(segundos, motivo), motivo 'espera'
+            (fila do limitador) ou 'retentativa' (backoff após erro)
+        tentativas: Total de tentativas (padrão: GEMINI_MAX_TENTATIVAS)
+    """
+    limitador = limitador or limitador_gemini
+    tentativas = max(1, tentativas or MAX_TENTATIVAS)
+    for tentativa in range(1, tentativas + 1):
+        limitador.adquirir(ao_esperar)
+        try:
+            return funcao()
+        except Exception as e:
+            if tentativa == tentativas or not erro_retentavel(e):
+                raise
+            if _cota_excedida(e):
+                limitador.penalizar()
+            espera = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (tentativa - 1)) * random.uniform(0.5, 1.0)
+            log.warning("⚠️ Chamada à IA falhou (tentativa %d/%d): %s. Nova tentativa em %.1fs",
+                        tentativa, tentativas, e, espera)
+            if ao_esperar is not None:
+                ao_esperar(espera, 'retentativa')
+            time.sleep(espera)
+
+
+limitador_gemini = LimitadorTaxa(
+    requisicoes_por_minuto=REQUISICOES_POR_MINUTO,
+    rajada=RAJADA,
+    max_fila=MAX_FILA,
+    max_espera=MAX_ESPERA_SEGUNDOS,
+)
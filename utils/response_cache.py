@@ -0,0 +1,154 @@
+"""
+Cache persistente das respostas da IA (SQLite local)
+
+A chave combina modelo, parâmetros de geração, o prompt normalizado e o hash do
+contexto serializado. Perguntas repetidas (mesma métrica, mesmos dados) voltam do
+disco em milissegundos, sem consumir cota da API. Entradas expiram por TTL e as
+menos acessadas são removidas quando o cache passa do limite de itens ou de tamanho.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from config.settings import AppConfig
+from utils.instrumentation import obter_logger
+from utils.sqlite_store import ArmazenamentoSQLite
+
+log = obter_logger("response_cache")
+
+_ESPACOS = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS respostas (
+    chave TEXT PRIMARY KEY,
+    modelo TEXT NOT NULL,
+    resposta TEXT NOT NULL,
+    tamanho INTEGER NOT NULL,
+    criado REAL NOT NULL,
+    acessado REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_respostas_acessado ON respostas(acessado);
+CREATE INDEX IF NOT EXISTS idx_respostas_criado ON respostas(criado);
+"""
+
+
+def normalizar_prompt(prompt):
+    """Remove diferenças irrelevantes de espaçamento/indentação do prompt"""
+    return _ESPACOS.sub(" ", prompt).strip()
+
+
+def hash_contexto(contexto):
+    """Hash estável do contexto (string já serializada ou objeto JSON-serializável)"""
+    if contexto is None:
+        return ""
+    if not isinstance(contexto, str):
+        contexto = json.dumps(contexto, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contexto.encode("utf-8")).hexdigest()
+
+
+class CacheRespostas(ArmazenamentoSQLite):
+    """Cache de respostas em SQLite com TTL e despejo por itens/tamanho"""
+
+    def __init__(self, caminho, ttl_segundos, max_itens, max_bytes):
+        super().__init__(caminho, _SCHEMA)
+        self.ttl_segundos = ttl_segundos
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def chave(modelo, parametros, prompt, contexto=None):
+        """
+        Chave da resposta: modelo + parâmetros de geração + prompt normalizado + hash do contexto
+        """
+        partes = json.dumps({
+            "modelo": modelo,
+            "parametros": parametros,
+            "prompt": normalizar_prompt(prompt),
+            "contexto": hash_contexto(contexto),
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(partes.encode("utf-8")).hexdigest()
+
+    def obter(self, chave):
+        """Retorna a resposta em cache ou None (ausente, expirada ou cache indisponível)"""
+        agora = time.time()
+        try:
+            with self._conectar() as conexao:
+                linha = conexao.execute(
+                    "SELECT resposta FROM respostas WHERE chave = ? AND criado >= ?",
+                    (chave, agora - self.ttl_segundos)
+                ).fetchone()
+                if linha is None:
+                    return None
+                conexao.execute(
+                    "UPDATE respostas SET acessado = ?, hits = hits + 1 WHERE chave = ?",
+                    (agora, chave)
+                )
+                return linha[0]
+        except (sqlite3.Error, OSError) as e:
+            log.warning("⚠️ Cache de respostas indisponível: %s", e)
+            return None
+
+    def gravar(self, chave, modelo, resposta):
+        """Grava a resposta e aplica TTL e limites de itens/tamanho (respostas vazias são ignoradas)"""
+        if not resposta or not resposta.strip():
+            log.debug("Resposta vazia não gravada no cache (%s)", chave[:12])
+            return
+        agora = time.time()
+        tamanho = len(resposta.encode("utf-8"))
+        try:
+            with self._conectar() as conexao:
+                conexao.execute(
+                    "INSERT OR REPLACE INTO respostas (chave, modelo, resposta, tamanho, criado, acessado) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (chave, modelo, resposta, tamanho, agora, agora)
+                )
+                self._despejar(conexao, agora)
+        except (sqlite3.Error, OSError) as e:
+            log.warning("⚠️ Não foi possível gravar no cache de respostas: %s", e)
+
+    def _despejar(self, conexao, agora):
+        conexao.execute("DELETE FROM respostas WHERE criado < ?", (agora - self.ttl_segundos,))
+        itens, total = conexao.execute("SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()
+        if itens <= self.max_itens and total <= self.max_bytes:
+            return
+        # Remove as menos acessadas até voltar aos limites
+        removidas = 0
+        for chave, tamanho in conexao.execute("SELECT chave, tamanho FROM respostas ORDER BY acessado").fetchall():
+            if itens <= self.max_itens and total <= self.max_bytes:
+                break
+            conexao.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+            itens -= 1
+            total -= tamanho
+            removidas += 1
+        log.debug("Cache de respostas: %d entradas removidas", removidas)
+
+    def limpar(self):
+        try:
+            with self._conectar() as conexao:
+                conexao.execute("DELETE FROM respostas")
+        except (sqlite3.Error, OSError) as e:
+            log.warning("⚠️ Não foi possível limpar o cache de respostas: %s", e)
+
+    def estatisticas(self):
+        """Itens, tamanho total (bytes) e hits acumulados das entradas atuais"""
+        try:
+            with self._conectar() as conexao:
+                itens, total, hits = conexao.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(tamanho), 0), COALESCE(SUM(hits), 0) FROM respostas"
+                ).fetchone()
+            return {"itens": itens, "bytes": total, "hits": hits}
+        except (sqlite3.Error, OSError):
+            return {"itens": 0, "bytes": 0, "hits": 0}
+
+
+cache_respostas = CacheRespostas(
+    caminho=Path(AppConfig.CACHE_CONFIG["diretorio"]) / "respostas_ia.sqlite",
+    ttl_segundos=AppConfig.CACHE_CONFIG["respostas_ia_ttl_horas"] * 3600,
+    max_itens=AppConfig.CACHE_CONFIG["respostas_ia_max_itens"],
+    max_bytes=AppConfig.CACHE_CONFIG["respostas_ia_max_mb"] * 1024 * 1024,
+)
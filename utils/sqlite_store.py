@@ -0,0 +1,41 @@
+"""
+Base dos armazenamentos em SQLite local (cache de respostas da IA e histórico do chat)
+
+O arquivo e o schema são criados na primeira conexão, com journal em modo WAL para
+que leituras não bloqueiem a gravação de outra sessão. Cada operação abre uma
+conexão curta e faz commit ao final.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class ArmazenamentoSQLite:
+    """Arquivo SQLite com schema criado sob demanda"""
+
+    def __init__(self, caminho, schema):
+        self.caminho = Path(caminho)
+        self._schema = schema
+        self._lock = threading.Lock()
+        self._pronto = False
+
+    @contextmanager
+    def _conectar(self):
+        """Conexão curta por operação (commit ao final), segura entre threads do Streamlit"""
+        if not self._pronto:
+            with self._lock:
+                if not self._pronto:
+                    self.caminho.parent.mkdir(parents=True, exist_ok=True)
+                    with sqlite3.connect(self.caminho, timeout=5) as conexao:
+                        conexao.execute("PRAGMA journal_mode=WAL")
+                        conexao.executescript(self._schema)
+                    conexao.close()
+                    self._pronto = True
+        conexao = sqlite3.connect(self.caminho, timeout=5)
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()